@@ -0,0 +1,140 @@
+"""
+Times ForgeAppAsync against a local MockForge.
+
+Measures get_projects, get_users, a recursive Project.get_contents and
+Version.transfer of every version of a few items to another project,
+and reports how many requests each API family received and how many
+were answered 429.
+
+    python benchmarks/bench_forge.py --latency 0.05 --throttle 0.02
+
+The client side rate limits are lifted unless --client-limits is given,
+so the numbers reflect the client and the mock server.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from mock_forge import HUB_ID, MockForge
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _lift(semaphores):
+    for sema in set(semaphores.values()):
+        sema.max = 10**6
+        sema._set_calls(sema.max)
+
+
+async def _timed(results, name, coro):
+    start = time.perf_counter()
+    value = await coro
+    results.append((name, time.perf_counter() - start))
+    return value
+
+
+async def run(args, mock):
+    from forge import ForgeAppAsync
+
+    results = []
+    async with ForgeAppAsync(hub_id=HUB_ID, log_level="warning") as app:
+        if not args.client_limits:
+            _lift(app.api.dm.semaphores)
+            _lift(app.api.hq.semaphores)
+
+        await _timed(results, "get_projects", app.get_projects())
+        await _timed(results, "get_users", app.get_users())
+
+        source, target = app.projects[0], app.projects[1]
+        await _timed(results, "get_contents", source.get_contents())
+        items = [
+            content
+            for content in source._indexes["id"].values()
+            if content.type == "items"
+        ]
+
+        await target.get_top_folders()
+        target_host = await target.project_files.add_sub_folder("transfer")
+        sizes = 0
+        start = time.perf_counter()
+        for item in items[: args.transfers]:
+            target_item = None
+            for version in sorted(
+                await item.get_versions(), key=lambda v: v.number
+            ):
+                target_item = await version.transfer(
+                    target_host,
+                    target_item=target_item,
+                    chunk_size=args.chunk_size,
+                )
+                sizes += version.storage_size or 0
+        seconds = time.perf_counter() - start
+        results.append(("transfer", seconds))
+
+    print("{:>14}  {:>8}".format("", "seconds"))
+    for name, seconds in results:
+        print("{:>14}  {:8.3f}".format(name, seconds))
+    print(
+        "{} items crawled, {:.1f} MB transferred ({:.1f} MB/s)".format(
+            len(items), sizes / 1024**2, sizes / 1024**2 / seconds
+        )
+    )
+    print(
+        ", ".join(
+            "{}: {}".format(key, value)
+            for key, value in sorted(mock.stats.items())
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--projects", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--folders", type=int, default=3)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=2)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--object-size", type=int, default=16 * 1024**2)
+    parser.add_argument("--chunk-size", type=int, default=5 * 1024**2)
+    parser.add_argument("--transfers", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=None)
+    parser.add_argument("--throttle", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=0)
+    parser.add_argument("--client-limits", action="store_true")
+    args = parser.parse_args()
+
+    mock = MockForge(
+        projects=max(2, args.projects),
+        depth=args.depth,
+        folders=args.folders,
+        items=args.items,
+        versions=args.versions,
+        users=args.users,
+        object_size=args.object_size,
+        latency=args.latency,
+        rate=args.rate,
+        throttle=args.throttle,
+        retry_after=args.retry_after,
+    )
+    # forge reads these when it is imported
+    os.environ["FORGE_BASE_URL"] = mock.start()
+    os.environ.setdefault("FORGE_CLIENT_ID", "mock-client-id")
+    os.environ.setdefault("FORGE_CLIENT_SECRET", "mock-client-secret")
+    # keep the mock tokens away from the tokens of the real servers
+    os.environ["FORGE_TOKEN_STORE"] = os.path.join(
+        tempfile.mkdtemp(), "tokens.json"
+    )
+    try:
+        asyncio.run(run(args, mock))
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Import time of the forge package.
+
+Times each statement in fresh interpreters and reports the median, and
+which of the heavy dependencies the statement loaded.
+
+    python benchmarks/bench_import.py --repeat 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import forge",
+    "from forge import ForgeApp",
+    "from forge import ForgeAppAsync",
+    "from forge.auth import ForgeAuth",
+]
+HEAVY = [
+    "requests",
+    "aiohttp",
+    "selenium",
+    "chromedriver_autoinstaller",
+    "tqdm",
+]
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [m for m in {!r} if m in sys.modules]]))
+"""
+
+
+def measure(statement, repeat):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    times = []
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, "-c", SCRIPT.format(statement, HEAVY)], env=env
+        )
+        seconds, loaded = json.loads(output)
+        times.append(seconds)
+    return statistics.median(times), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for statement in STATEMENTS:
+        seconds, loaded = measure(statement, args.repeat)
+        print(
+            "{:>34}  {:8.1f} ms  {}".format(
+                statement, seconds * 1000, ", ".join(loaded) or "-"
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
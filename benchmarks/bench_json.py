@@ -0,0 +1,65 @@
+"""
+Decoding speed of the installed JSON decoders.
+
+Decodes recorded response bodies (files holding one JSON document each)
+with every decoder in forge.utils.decoder.DECODERS. Without files, it
+uses synthetic folder contents pages of 200 items.
+
+    python benchmarks/bench_json.py recorded/*.json --repeat 20
+"""
+
+import argparse
+import json
+import time
+
+from bench_memory import _payload
+
+from forge.utils.decoder import DECODERS
+
+
+def _pages(count):
+    return [
+        json.dumps(
+            {
+                "data": [
+                    _payload("items", "urn:item:{}:{}".format(p, i), "f.rvt")
+                    for i in range(200)
+                ],
+                "links": {"next": None},
+            }
+        ).encode("utf-8")
+        for p in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("paths", nargs="*", help="recorded JSON bodies")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.paths:
+        bodies = []
+        for path in args.paths:
+            with open(path, "rb") as fp:
+                bodies.append(fp.read())
+    else:
+        bodies = _pages(50)
+    size = sum(len(body) for body in bodies) * args.repeat
+
+    print("{:.1f} MB decoded per run".format(size / 1024**2))
+    for name, loads in sorted(DECODERS.items()):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for body in bodies:
+                loads(body)
+        seconds = time.perf_counter() - start
+        print(
+            "{:>8}  {:8.3f} s  {:8.1f} MB/s".format(
+                name, seconds, size / 1024**2 / seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
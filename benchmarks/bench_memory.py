@@ -0,0 +1,171 @@
+"""
+Memory held by a crawled project tree.
+
+Builds the same synthetic tree twice, with the forge_async node classes
+and with plain classes laid out like the nodes used to be (a __dict__
+per node, the payload kept as a dict, the path stored as a string), and
+reports the bytes tracemalloc attributes to each, for every
+Project.retain mode. The slotted tree is measured with the indexes its
+Project builds for find().
+
+    python benchmarks/bench_memory.py --items 100000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "tests")]
+
+from conftest import make_project  # noqa: E402
+from forge.forge_async import Folder, Item, Project  # noqa: E402
+
+ITEMS_PER_FOLDER = 100
+
+
+def _payload(kind, content_id, name):
+    return {
+        "type": kind,
+        "id": content_id,
+        "attributes": {
+            "displayName" if kind == "items" else "name": name,
+            "createTime": "2020-06-01T12:00:00.0000000Z",
+            "createUserId": "ABCDEFGHIJKL",
+            "createUserName": "Jane Doe",
+            "lastModifiedTime": "2020-06-02T12:00:00.0000000Z",
+            "lastModifiedUserId": "ABCDEFGHIJKL",
+            "lastModifiedUserName": "Jane Doe",
+            "hidden": False,
+            "reserved": False,
+            "extension": {
+                "type": "{}:autodesk.bim360:{}".format(
+                    kind, "File" if kind == "items" else "Folder"
+                ),
+                "version": "1.0",
+                "schema": {
+                    "href": "https://developer.api.autodesk.com/schema/v1/versions/{}:autodesk.bim360:File-1.0".format(  # noqa: E501
+                        kind
+                    )
+                },
+                "data": {},
+            },
+        },
+        "links": {
+            "self": {
+                "href": "https://developer.api.autodesk.com/data/v1/projects/b.project/{}/{}".format(  # noqa: E501
+                    kind, content_id
+                )
+            }
+        },
+        "relationships": {
+            "parent": {
+                "data": {"type": "folders", "id": "urn:adsk.wipprod:fs.folder"}
+            }
+        },
+    }
+
+
+class _Node(object):
+    def __init__(self, name, content_id, extension_type, data, host=None):
+        self.name = name
+        self.id = content_id
+        self._extension_type = extension_type
+        self.deleted = False
+        self.data = data
+        self.path = "{}/{}".format(host.path if host else "", name)
+        self._project = None
+        self._host = host
+
+
+class _Folder(_Node):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.type = "folders"
+        self.contents = []
+
+
+class _Item(_Node):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.type = "items"
+        self.versions = []
+        self.storage_id = None
+
+
+def build(items, compact, retain="full"):
+    project = make_project()
+    project.retain = retain
+    root = (
+        Folder("root", "root", project=project)
+        if compact
+        else _Folder("root", "root", None, None)
+    )
+    for f in range(-(-items // ITEMS_PER_FOLDER)):
+        name = "folder-{}".format(f)
+        data = _payload("folders", "urn:folder:{}".format(f), name)
+        extension_type = data["attributes"]["extension"]["type"]
+        if compact:
+            folder = Folder(
+                name,
+                data["id"],
+                extension_type=extension_type,
+                data=data,
+                project=project,
+                host=root,
+            )
+        else:
+            folder = _Folder(name, data["id"], extension_type, data, root)
+        root.contents.append(folder)
+
+        for i in range(ITEMS_PER_FOLDER):
+            name = "file-{}-{}.rvt".format(f, i)
+            data = _payload("items", "urn:item:{}:{}".format(f, i), name)
+            extension_type = data["attributes"]["extension"]["type"]
+            if compact:
+                item = Item(
+                    name,
+                    data["id"],
+                    extension_type=extension_type,
+                    data=data,
+                    project=project,
+                    host=folder,
+                )
+            else:
+                item = _Item(name, data["id"], extension_type, data, folder)
+            folder.contents.append(item)
+    return project, root
+
+
+def measure(items, compact, retain="full"):
+    gc.collect()
+    tracemalloc.start()
+    tree = build(items, compact, retain=retain)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+
+    before = measure(args.items, compact=False)
+    print("{:>10} items".format(args.items))
+    print("{:>10.1f} MB  dict nodes".format(before / 1024**2))
+    for retain in Project.RETAIN:
+        after = measure(args.items, compact=True, retain=retain)
+        print(
+            "{:>10.1f} MB  slotted nodes, retain={!r} ({:.1f}x smaller)".format(
+                after / 1024**2, retain, before / after
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
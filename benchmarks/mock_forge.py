@@ -0,0 +1,842 @@
+"""
+Local stand-in for the Forge APIs used by this package.
+
+MockForge serves a synthetic BIM 360 hub: Data Management projects,
+folders, items and versions, BIM 360 (HQ) projects and users, and OSS
+objects with ranged downloads and resumable uploads. Latency, a rate
+limit per API family and randomly injected 429s are configurable.
+
+Point the package at it with the FORGE_BASE_URL environment variable,
+set before forge is imported:
+
+    python benchmarks/mock_forge.py --port 8080 --latency 0.05
+    FORGE_BASE_URL=http://127.0.0.1:8080 python my_script.py
+
+Real responses can be recorded by proxying them from --upstream into a
+directory with --record, and served back with --replay; requests without
+a recording fall back to the synthetic hub.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+
+from collections import Counter
+from time import monotonic
+from uuid import uuid4
+
+from aiohttp import ClientSession, web
+
+HUB_ID = "b.mock-account"
+TOKEN = "mock-token"
+UPSTREAM = "https://developer.api.autodesk.com"
+TIME = "2020-06-01T12:00:00.0000000Z"
+
+DM_TYPE = "application/vnd.api+json"
+
+
+def _folder_payload(project_id, folder_id, name, parent_id=None):
+    data = {
+        "type": "folders",
+        "id": folder_id,
+        "attributes": {
+            "name": name,
+            "displayName": name,
+            "createTime": TIME,
+            "lastModifiedTime": TIME,
+            "hidden": False,
+            "extension": {
+                "type": "folders:autodesk.bim360:Folder",
+                "version": "1.0",
+            },
+        },
+        "relationships": {},
+    }
+    if parent_id:
+        data["relationships"]["parent"] = {
+            "data": {"type": "folders", "id": parent_id}
+        }
+    return data
+
+
+def _item_payload(item_id, name, folder_id, tip_id):
+    return {
+        "type": "items",
+        "id": item_id,
+        "attributes": {
+            "displayName": name,
+            "createTime": TIME,
+            "lastModifiedTime": TIME,
+            "hidden": False,
+            "reserved": False,
+            "extension": {
+                "type": "items:autodesk.bim360:File",
+                "version": "1.0",
+            },
+        },
+        "relationships": {
+            "tip": {"data": {"type": "versions", "id": tip_id}},
+            "parent": {"data": {"type": "folders", "id": folder_id}},
+        },
+    }
+
+
+def _version_payload(version_id, number, name, item_id, storage_id, size):
+    return {
+        "type": "versions",
+        "id": version_id,
+        "attributes": {
+            "name": name,
+            "displayName": name,
+            "versionNumber": number,
+            "storageSize": size,
+            "createTime": TIME,
+            "lastModifiedTime": TIME,
+            "extension": {
+                "type": "versions:autodesk.bim360:File",
+                "version": "1.0",
+            },
+        },
+        "relationships": {
+            "item": {"data": {"type": "items", "id": item_id}},
+            "storage": {"data": {"type": "objects", "id": storage_id}},
+        },
+    }
+
+
+def _storage_id(object_name):
+    return "urn:adsk.objects:os.object:wip.dm.prod/{}".format(object_name)
+
+
+class MockForge(object):
+    """
+    aiohttp application serving a synthetic hub. MockForge.stats counts
+    requests and 429s by API family ('data', 'project', 'hq', 'oss').
+    """
+
+    def __init__(
+        self,
+        projects=2,
+        depth=2,
+        folders=3,
+        items=20,
+        versions=2,
+        users=300,
+        object_size=1024 * 1024,
+        page_limit=200,
+        latency=0.0,
+        rate=None,
+        burst=10,
+        throttle=0.0,
+        retry_after=1,
+        replay=None,
+        record=None,
+        upstream=UPSTREAM,
+        seed=0,
+    ):
+        """
+        Kwargs:
+            projects (``int``, default=2): Number of projects in the hub.
+            depth (``int``, default=2): Levels of sub folders below 'Project Files'.
+            folders (``int``, default=3): Sub folders in each folder above the deepest level.
+            items (``int``, default=20): Items in each folder.
+            versions (``int``, default=2): Versions of each item.
+            users (``int``, default=300): Users of the account.
+            object_size (``int``, default=1048576): Size of every synthetic object in bytes.
+            page_limit (``int``, default=200): Largest DM page served, whatever page[limit] asks for.
+            latency (``float``, default=0.0): Seconds every response is delayed by.
+            rate (``float``, default=None): Requests per second allowed per API family before answering 429. None is unlimited.
+            burst (``int``, default=10): Requests allowed at once above rate.
+            throttle (``float``, default=0.0): Fraction of requests answered 429 at random.
+            retry_after (``int``, default=1): Retry-After of the injected 429s.
+            replay (``str``, default=None): Directory of recorded responses to serve first.
+            record (``str``, default=None): Directory to record the responses of upstream in. Every request is proxied.
+            upstream (``str``, default="https://developer.api.autodesk.com"): Where recorded requests are sent.
+            seed (``int``, default=0): Seed of the random 429s.
+        """  # noqa: E501
+        self.page_limit = page_limit
+        self.latency = latency
+        self.rate = rate
+        self.burst = burst
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.replay = replay
+        self.record = record
+        self.upstream = upstream.rstrip("/")
+        self.random = random.Random(seed)
+        self.stats = Counter()
+        self._buckets = {}
+        self._client = None
+
+        # every synthetic version points to an object with this content
+        self.blob = os.urandom(object_size)
+        self.objects = {}
+        self.sessions = {}
+        self.folders = {}
+        self.contents = {}
+        self.items = {}
+        self.versions = {}
+        self.version_ids = {}
+        self.top_folders = {}
+        self.projects = []
+        self.hq_projects = []
+        self.users = [
+            {
+                "id": "user-{}".format(i),
+                "uid": "UID{}".format(i),
+                "email": "user{}@example.com".format(i),
+                "name": "User {}".format(i),
+                "company_id": "company-{}".format(i % 10),
+                "role": "account_admin" if i == 0 else "account_user",
+                "status": "active",
+            }
+            for i in range(users)
+        ]
+        self.companies = [
+            {"id": "company-{}".format(i), "name": "Company {}".format(i)}
+            for i in range(10)
+        ]
+        for p in range(projects):
+            self._add_project(
+                "project-{}".format(p), depth, folders, items, versions
+            )
+
+    # Synthetic hub
+
+    def _add_project(self, project_id, depth, folders, items, versions):
+        name = "Project {}".format(project_id.split("-")[-1])
+        self.projects.append(
+            {
+                "type": "projects",
+                "id": "b.{}".format(project_id),
+                "attributes": {
+                    "name": name,
+                    "extension": {
+                        "type": "projects:autodesk.bim360:Project",
+                        "version": "1.0",
+                    },
+                },
+            }
+        )
+        self.hq_projects.append(
+            {
+                "id": project_id,
+                "account_id": HUB_ID[2:],
+                "name": name,
+                "status": "active",
+                "start_date": "2020-01-01",
+                "end_date": "2030-01-01",
+                "project_type": "Office",
+                "value": None,
+                "currency": "USD",
+            }
+        )
+        tops = []
+        for top_name in ("Project Files", "Plans"):
+            folder_id = self._folder_id()
+            self._add_folder(project_id, folder_id, top_name)
+            tops.append(self.folders[folder_id])
+        self.top_folders[project_id] = tops
+
+        level = [tops[0]["id"]]
+        for d in range(depth + 1):
+            next_level = []
+            for folder_id in level:
+                for i in range(items):
+                    self._add_item(
+                        folder_id,
+                        "file-{}-{}.rvt".format(folder_id[-6:], i),
+                        versions,
+                    )
+                if d == depth:
+                    continue
+                for i in range(folders):
+                    sub_id = self._folder_id()
+                    self._add_folder(
+                        project_id, sub_id, "folder-{}".format(i), folder_id
+                    )
+                    next_level.append(sub_id)
+            level = next_level
+
+    @staticmethod
+    def _folder_id():
+        return "urn:adsk.wipprod:fs.folder:co.{}".format(uuid4().hex[:22])
+
+    def _add_folder(self, project_id, folder_id, name, parent_id=None):
+        folder = _folder_payload(project_id, folder_id, name, parent_id)
+        self.folders[folder_id] = folder
+        self.contents[folder_id] = []
+        if parent_id:
+            self.contents[parent_id].append(folder)
+        return folder
+
+    def _add_item(self, folder_id, name, versions, object_name=None):
+        item_id = "urn:adsk.wipprod:dm.lineage:{}".format(uuid4().hex[:22])
+        self.versions[item_id] = []
+        item = _item_payload(item_id, name, folder_id, None)
+        self.items[item_id] = item
+        self.contents[folder_id].append(item)
+        for _ in range(versions):
+            self._add_version(item_id, name, object_name)
+        return item
+
+    def _add_version(self, item_id, name, object_name=None):
+        number = len(self.versions[item_id]) + 1
+        version_id = "urn:adsk.wipprod:fs.file:vf.{}?version={}".format(
+            item_id.split(":")[-1], number
+        )
+        if object_name is None:
+            object_name = "{}.rvt".format(uuid4())
+            self.objects[object_name] = self.blob
+        size = len(self.objects.get(object_name, b""))
+        version = _version_payload(
+            version_id, number, name, item_id, _storage_id(object_name), size
+        )
+        # newest first, like Forge
+        self.versions[item_id].insert(0, version)
+        self.version_ids[version_id] = version
+        self.items[item_id]["relationships"]["tip"]["data"]["id"] = version_id
+        return version
+
+    # Server
+
+    def app(self):
+        app = web.Application(
+            middlewares=[self._middleware], client_max_size=1024**3
+        )
+        app.on_startup.append(self._startup)
+        app.on_cleanup.append(self._cleanup)
+        get, post, put = (
+            app.router.add_get,
+            app.router.add_post,
+            app.router.add_put,
+        )
+        auth = "/authentication/v1"
+        post(auth + "/authenticate", self.authenticate)
+        post(auth + "/gettoken", self.authenticate)
+        post(auth + "/refreshtoken", self.authenticate)
+
+        hubs = "/project/v1/hubs"
+        get(hubs, self.get_hubs)
+        get(hubs + "/{hub}/projects", self.get_projects)
+        get(hubs + "/{hub}/projects/{project}", self.get_project)
+        get(
+            hubs + "/{hub}/projects/{project}/topFolders", self.get_top_folders
+        )
+
+        data = "/data/v1/projects/{project}"
+        get(data + "/folders/{folder}", self.get_folder)
+        get(data + "/folders/{folder}/contents", self.get_folder_contents)
+        get(data + "/items/{item}", self.get_item)
+        get(data + "/items/{item}/versions", self.get_item_versions)
+        get(data + "/versions/{version}", self.get_version)
+        post(data + "/storage", self.post_storage)
+        post(data + "/items", self.post_item)
+        post(data + "/versions", self.post_version)
+        post(data + "/folders", self.post_folder)
+
+        hq = "/hq/v1/accounts/{account}"
+        get(hq + "/projects", self.hq_get_projects)
+        get(hq + "/projects/{project}", self.hq_get_project)
+        get(hq + "/users", self.hq_get_users)
+        get(hq + "/users/search", self.hq_get_users)
+        get(hq + "/users/{user}", self.hq_get_user)
+        get(hq + "/companies", self.hq_get_companies)
+
+        oss = "/oss/v2/buckets/{bucket}/objects/{object}"
+        get(oss, self.get_object)
+        get(oss + "/details", self.get_object_details)
+        put(oss, self.put_object)
+        put(oss + "/resumable", self.put_object_resumable)
+        return app
+
+    async def _startup(self, app):
+        if self.record:
+            os.makedirs(self.record, exist_ok=True)
+            self._client = ClientSession(auto_decompress=False)
+
+    async def _cleanup(self, app):
+        if self._client:
+            await self._client.close()
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        family = request.path.strip("/").split("/")[0]
+        self.stats[family] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.record:
+            return await self._proxy(request)
+        recorded = self._recorded(request)
+        if recorded is not None:
+            return recorded
+
+        if family != "authentication":
+            if request.headers.get("Authorization") != "Bearer " + TOKEN:
+                return web.json_response(
+                    {
+                        "developerMessage": "The Authorization header is invalid"
+                    },
+                    status=401,
+                )
+            retry_after = self._admit(family)
+            if retry_after is not None:
+                self.stats[family + ".429"] += 1
+                return web.json_response(
+                    {"developerMessage": "Too many requests"},
+                    status=429,
+                    headers={"Retry-After": str(retry_after)},
+                )
+        return await handler(request)
+
+    def _admit(self, family):
+        """Returns the Retry-After of a 429, or None to serve the request."""
+        if self.throttle and self.random.random() < self.throttle:
+            return self.retry_after
+        if not self.rate:
+            return
+        now = monotonic()
+        tokens, last = self._buckets.get(family, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self._buckets[family] = (tokens, now)
+            return max(1, math.ceil((1 - tokens) / self.rate))
+        self._buckets[family] = (tokens - 1, now)
+
+    # Record / replay
+
+    @staticmethod
+    def _key(method, path_qs):
+        return hashlib.sha1(
+            "{} {}".format(method, path_qs).encode("utf-8")
+        ).hexdigest()
+
+    def _recorded(self, request):
+        if not self.replay:
+            return
+        path = os.path.join(
+            self.replay,
+            self._key(request.method, request.rel_url.path_qs) + ".json",
+        )
+        if not os.path.exists(path):
+            return
+        with open(path) as fp:
+            recording = json.load(fp)
+        return web.Response(
+            status=recording["status"],
+            text=recording["body"],
+            headers={"Content-Type": recording["content_type"]},
+        )
+
+    async def _proxy(self, request):
+        headers = {
+            key: value
+            for key, value in request.headers.items()
+            if key.lower() not in ("host", "content-length")
+        }
+        async with self._client.request(
+            request.method,
+            self.upstream + request.rel_url.path_qs,
+            headers=headers,
+            data=await request.read(),
+        ) as res:
+            body = await res.read()
+            content_type = res.headers.get("Content-Type", "")
+            headers = {
+                key: value
+                for key, value in res.headers.items()
+                if key.lower()
+                in ("content-type", "content-range", "etag", "retry-after")
+            }
+        if request.method == "GET" and "json" in content_type:
+            path = os.path.join(
+                self.record,
+                self._key(request.method, request.rel_url.path_qs) + ".json",
+            )
+            with open(path, "w") as fp:
+                json.dump(
+                    {
+                        "method": request.method,
+                        "url": str(request.rel_url),
+                        "status": res.status,
+                        "content_type": content_type,
+                        "body": body.decode("utf-8"),
+                    },
+                    fp,
+                )
+        return web.Response(status=res.status, body=body, headers=headers)
+
+    # Responses
+
+    @staticmethod
+    def _json(request, data, status=200, content_type=DM_TYPE):
+        body = json.dumps(data).encode("utf-8")
+        headers = {"Content-Type": content_type}
+        if request.method == "GET" and status == 200:
+            etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            headers["ETag"] = etag
+        return web.Response(status=status, body=body, headers=headers)
+
+    @staticmethod
+    def _not_found(request):
+        return web.json_response(
+            {"errors": [{"status": "404", "detail": "Not found"}]}, status=404
+        )
+
+    def _page(self, request, results):
+        """DM pagination with page[number] and page[limit]."""
+        number = int(request.query.get("page[number]", 0))
+        limit = min(
+            int(request.query.get("page[limit]", 200)), self.page_limit
+        )
+        page = results[number * limit : (number + 1) * limit]
+        links = {"self": {"href": str(request.url)}}
+        if (number + 1) * limit < len(results):
+            links["next"] = {
+                "href": str(
+                    request.url.update_query({"page[number]": number + 1})
+                )
+            }
+        return self._json(request, {"data": page, "links": links})
+
+    def _offset(self, request, results):
+        """HQ pagination with limit and offset."""
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", 10))
+        return self._json(
+            request,
+            results[offset : offset + limit],
+            content_type="application/json",
+        )
+
+    async def authenticate(self, request):
+        return web.json_response(
+            {
+                "access_token": TOKEN,
+                "token_type": "Bearer",
+                "expires_in": 3599,
+                "refresh_token": "mock-refresh-token",
+            }
+        )
+
+    async def get_hubs(self, request):
+        hub = {
+            "type": "hubs",
+            "id": HUB_ID,
+            "attributes": {
+                "name": "Mock Hub",
+                "extension": {"type": "hubs:autodesk.bim360:Account"},
+            },
+        }
+        return self._json(request, {"data": [hub]})
+
+    async def get_projects(self, request):
+        return self._page(request, self.projects)
+
+    async def get_project(self, request):
+        for project in self.projects:
+            if project["id"] == request.match_info["project"]:
+                return self._json(request, {"data": project})
+        return self._not_found(request)
+
+    async def get_top_folders(self, request):
+        project_id = request.match_info["project"][2:]
+        if project_id not in self.top_folders:
+            return self._not_found(request)
+        return self._json(request, {"data": self.top_folders[project_id]})
+
+    async def get_folder(self, request):
+        folder = self.folders.get(request.match_info["folder"])
+        if not folder:
+            return self._not_found(request)
+        return self._json(request, {"data": folder})
+
+    async def get_folder_contents(self, request):
+        contents = self.contents.get(request.match_info["folder"])
+        if contents is None:
+            return self._not_found(request)
+        return self._page(request, contents)
+
+    async def get_item(self, request):
+        item = self.items.get(request.match_info["item"])
+        if not item:
+            return self._not_found(request)
+        tip = self.versions[item["id"]][:1]
+        return self._json(request, {"data": item, "included": tip})
+
+    async def get_item_versions(self, request):
+        versions = self.versions.get(request.match_info["item"])
+        if versions is None:
+            return self._not_found(request)
+        return self._page(request, versions)
+
+    async def get_version(self, request):
+        version = self.version_ids.get(request.match_info["version"])
+        if not version:
+            return self._not_found(request)
+        return self._json(request, {"data": version})
+
+    async def post_storage(self, request):
+        data = (await request.json())["data"]
+        object_name = "{}{}".format(
+            uuid4(), os.path.splitext(data["attributes"]["name"])[1]
+        )
+        storage = {"type": "objects", "id": _storage_id(object_name)}
+        return self._json(request, {"data": storage}, status=201)
+
+    @staticmethod
+    def _object_name(storage_id):
+        return storage_id.split("/")[-1]
+
+    async def post_item(self, request):
+        body = await request.json()
+        data, version = body["data"], body["included"][0]
+        folder_id = data["relationships"]["parent"]["data"]["id"]
+        if folder_id not in self.contents:
+            return self._not_found(request)
+        storage_id = version["relationships"]["storage"]["data"]["id"]
+        item = self._add_item(
+            folder_id,
+            data["attributes"]["displayName"],
+            1,
+            object_name=self._object_name(storage_id),
+        )
+        tip = self.versions[item["id"]][:1]
+        return self._json(request, {"data": item, "included": tip}, status=201)
+
+    async def post_version(self, request):
+        data = (await request.json())["data"]
+        item_id = data["relationships"]["item"]["data"]["id"]
+        if item_id not in self.items:
+            return self._not_found(request)
+        storage_id = data["relationships"]["storage"]["data"]["id"]
+        version = self._add_version(
+            item_id,
+            data["attributes"]["name"],
+            object_name=self._object_name(storage_id),
+        )
+        return self._json(request, {"data": version}, status=201)
+
+    async def post_folder(self, request):
+        data = (await request.json())["data"]
+        parent_id = data["relationships"]["parent"]["data"]["id"]
+        if parent_id not in self.contents:
+            return self._not_found(request)
+        folder = self._add_folder(
+            request.match_info["project"][2:],
+            self._folder_id(),
+            data["attributes"]["name"],
+            parent_id,
+        )
+        return self._json(request, {"data": folder}, status=201)
+
+    async def hq_get_projects(self, request):
+        return self._offset(request, self.hq_projects)
+
+    async def hq_get_project(self, request):
+        for project in self.hq_projects:
+            if project["id"] == request.match_info["project"]:
+                return self._json(
+                    request, project, content_type="application/json"
+                )
+        return self._not_found(request)
+
+    async def hq_get_users(self, request):
+        users = self.users
+        for key in ("name", "email"):
+            if request.query.get(key):
+                users = [u for u in users if u[key] == request.query[key]]
+        return self._offset(request, users)
+
+    async def hq_get_user(self, request):
+        for user in self.users:
+            if user["id"] == request.match_info["user"]:
+                return self._json(
+                    request, user, content_type="application/json"
+                )
+        return self._not_found(request)
+
+    async def hq_get_companies(self, request):
+        return self._offset(request, self.companies)
+
+    async def get_object(self, request):
+        body = self.objects.get(request.match_info["object"])
+        if body is None:
+            return self._not_found(request)
+        match = re.match(
+            r"bytes=(\d+)-(\d*)", request.headers.get("Range", "")
+        )
+        if not match:
+            return web.Response(
+                body=body, content_type="application/octet-stream"
+            )
+        lower = int(match.group(1))
+        upper = int(match.group(2) or len(body) - 1)
+        return web.Response(
+            status=206,
+            body=body[lower : upper + 1],
+            headers={
+                "Content-Type": "application/octet-stream",
+                "Content-Range": "bytes {}-{}/{}".format(
+                    lower, upper, len(body)
+                ),
+            },
+        )
+
+    def _object(self, request, size):
+        bucket_key = request.match_info["bucket"]
+        object_name = request.match_info["object"]
+        return {
+            "bucketKey": bucket_key,
+            "objectId": "urn:adsk.objects:os.object:{}/{}".format(
+                bucket_key, object_name
+            ),
+            "objectKey": object_name,
+            "size": size,
+            "location": "{}/oss/v2/buckets/{}/objects/{}".format(
+                request.url.origin(), bucket_key, object_name
+            ),
+        }
+
+    async def get_object_details(self, request):
+        body = self.objects.get(request.match_info["object"])
+        if body is None:
+            return self._not_found(request)
+        return self._json(
+            request,
+            self._object(request, len(body)),
+            content_type="application/json",
+        )
+
+    async def put_object(self, request):
+        body = await request.read()
+        self.objects[request.match_info["object"]] = body
+        return self._json(
+            request,
+            self._object(request, len(body)),
+            content_type="application/json",
+        )
+
+    async def put_object_resumable(self, request):
+        match = re.match(
+            r"bytes (\d+)-(\d+)/(\d+)",
+            request.headers.get("Content-Range", ""),
+        )
+        if not match or not request.headers.get("Session-Id"):
+            return web.json_response(
+                {"reason": "Content-Range and Session-Id are required"},
+                status=400,
+            )
+        lower, upper, total = (int(group) for group in match.groups())
+        object_name = request.match_info["object"]
+        session = self.sessions.setdefault(
+            (object_name, request.headers["Session-Id"]),
+            {"total": total, "chunks": {}},
+        )
+        session["chunks"][lower] = await request.read()
+
+        received = sum(len(chunk) for chunk in session["chunks"].values())
+        if received < session["total"]:
+            return web.Response(
+                status=202,
+                headers={"Range": "bytes=0-{}".format(received - 1)},
+            )
+        self.objects[object_name] = b"".join(
+            session["chunks"][key] for key in sorted(session["chunks"])
+        )
+        del self.sessions[(object_name, request.headers["Session-Id"])]
+        return self._json(
+            request,
+            self._object(request, total),
+            content_type="application/json",
+        )
+
+    # Running
+
+    def start(self, host="127.0.0.1", port=0):
+        """
+        Serves from a background thread, so synchronous code such as
+        ForgeAuth can reach it, and returns the base url.
+        """
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            self._runner = web.AppRunner(self.app())
+            loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, host, port)
+            loop.run_until_complete(site.start())
+            self.url = "http://{}:{}".format(*self._runner.addresses[0][:2])
+            started.set()
+            loop.run_forever()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.url
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(
+            self._runner.cleanup(), self._loop
+        ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--projects", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--folders", type=int, default=3)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=2)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--object-size", type=int, default=1024 * 1024)
+    parser.add_argument("--page-limit", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=None)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--throttle", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--replay", default=None)
+    parser.add_argument("--record", default=None)
+    parser.add_argument("--upstream", default=UPSTREAM)
+    args = parser.parse_args()
+
+    mock = MockForge(
+        projects=args.projects,
+        depth=args.depth,
+        folders=args.folders,
+        items=args.items,
+        versions=args.versions,
+        users=args.users,
+        object_size=args.object_size,
+        page_limit=args.page_limit,
+        latency=args.latency,
+        rate=args.rate,
+        burst=args.burst,
+        throttle=args.throttle,
+        retry_after=args.retry_after,
+        replay=args.replay,
+        record=args.record,
+        upstream=args.upstream,
+    )
+    print("Hub ID: {}".format(HUB_ID))
+    web.run_app(mock.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import asyncio
+
+from forge import ForgeAppAsync, ProjectMigrator
+from forge.utils import TransferJournal
+
+
+async def main():
+    # Only three-legged authentication works for BIM 360 Teams
+    async with ForgeAppAsync(
+        hub_id="<BIM 360 Team Hub ID>", three_legged=True
+    ) as app_hub_1, ForgeAppAsync(hub_id="<BIM 360 Doc Hub ID>") as app_hub_2:
+        await asyncio.gather(
+            app_hub_1.get_projects(), app_hub_2.get_projects()
+        )
+        source_pj = await app_hub_1.find_project("<Project Name>")
+        source_pj.include_hidden = True
+
+        await app_hub_2.get_users()
+        admin = await app_hub_2.find_user("<admin@email.com>")
+        target_pj = await app_hub_2.find_project("<New Project Name>")
+        target_pj.x_user_id = admin["uid"]
+
+        migrator = ProjectMigrator(
+            source_pj,
+            target_pj,
+            max_in_flight=8,
+            bytes_per_second=50 * 1024**2,
+            journal=TransferJournal("migration.db"),
+            publish=True,
+        )
+        await migrator.run()
+        print(migrator.report())
+        migrator.write_csv("migration.csv")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
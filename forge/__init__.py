@@ -2,7 +2,28 @@ from __future__ import absolute_import
 
 import sys
 
-from .forge import ForgeApp  # noqa: F401
-
 if sys.version_info >= (3, 7):
-    from .forge_async import ForgeAppAsync  # noqa: F401
+    from importlib import import_module
+
+    # imported on first access, so 'import forge' does not load aiohttp,
+    # requests or tqdm until an app is used
+    _LAZY = {
+        "ForgeApp": ".forge",
+        "ForgeAppAsync": ".forge_async",
+        "ProjectMigrator": ".migrate",
+    }
+
+    def __getattr__(name):
+        if name not in _LAZY:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            )
+        value = getattr(import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY))
+
+else:
+    from .forge import ForgeApp  # noqa: F401
@@ -4,18 +4,54 @@
 
 from __future__ import absolute_import
 
+import asyncio
+import inspect
+import os
+
+from contextvars import ContextVar
 from functools import wraps
+from uuid import uuid4
+
+from aiohttp import ClientError
 
 from ..base import ForgeBase, Logger, semaphore
 from ..decorators import _async_validate_token
-from ..utils import HTTPSemaphore
+from ..utils import HTTPSemaphore, limited, project_limiter
 from ..urls import DATA_V1_URL, PROJECT_V1_URL, OSS_V2_URL
 
 logger = Logger.start(__name__)
 
+# urls of the pages that failed in the listing being cached
+_failed_pages = ContextVar("failed_pages", default=None)
+
+
+class _OffsetWriter(object):
+    """Writes sequentially into a file object starting at offset."""
+
+    def __init__(self, fp, offset):
+        self.fp = fp
+        self.offset = offset
+
+    def write(self, data):
+        self.fp.seek(self.offset)
+        self.fp.write(data)
+        self.offset += len(data)
+
 
 class ADM(ForgeBase):
     logger = logger
+    # JSON:API page size and number of pages requested ahead in parallel
+    PAGE_LIMIT = 200
+    PREFETCH_PAGES = 4
+    # byte range size of chunked OSS downloads
+    DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    # size of the blocks read from a streamed response body
+    STREAM_CHUNK_SIZE = 1024 * 1024
+    # chunk size of resumable OSS uploads (OSS requires at least 2 MB)
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    # calls per minute allowed for each project, None to not limit them
+    PROJECT_MAX_CALLS = None
+    project_semaphores = {}
 
     def __init__(self, app, *args, **kwargs):
         self.app = app
@@ -26,77 +62,227 @@ class ADM(ForgeBase):
     def _set_rate_limits(cls):
         if getattr(cls, "semaphores", None):
             return
-        oss_sem = HTTPSemaphore(value=50, interval=60, max_calls=1000)
+        oss_sem = HTTPSemaphore(
+            value=50, interval=60, max_calls=1000, burst=100, name="oss"
+        )
         cls.semaphores = {
             ADM.get_hubs.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_hubs",
             ),  # noqa: E501 # fmt: off
             ADM.get_project.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_project",
             ),  # noqa: E501 # fmt: off
             ADM.get_projects.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_projects",
             ),  # noqa: E501 # fmt: off
             ADM.get_top_folders.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.get_top_folders",
             ),  # noqa: E501 # fmt: off
             ADM.get_folder.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.get_folder",
             ),  # noqa: E501 # fmt: off
             ADM.get_folder_contents.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_folder_contents",
             ),  # noqa: E501 # fmt: off
             ADM.get_item.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.get_item",
             ),  # noqa: E501 # fmt: off
             ADM.get_item_parent.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_item_parent",
             ),  # noqa: E501 # fmt: off
             ADM.get_item_versions.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=800
+                value=50,
+                interval=60,
+                max_calls=800,
+                burst=80,
+                name="dm.get_item_versions",
             ),  # noqa: E501 # fmt: off
             ADM.get_version.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.get_version",
             ),  # noqa: E501 # fmt: off
             ADM.get_version_download_formats.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_version_download_formats",
             ),  # noqa: E501 # fmt: off
             ADM.get_version_downloads.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.get_version_downloads",
             ),  # noqa: E501 # fmt: off
             ADM.post_item.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.post_item",
             ),  # noqa: E501 # fmt: off
             ADM.post_item_version.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.post_item_version",
             ),  # noqa: E501 # fmt: off
             ADM.post_storage.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.post_storage",
             ),  # noqa: E501 # fmt: off
             ADM.post_folder.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=50
+                value=50,
+                interval=60,
+                max_calls=50,
+                burst=5,
+                name="dm.post_folder",
             ),  # noqa: E501 # fmt: off
             ADM.post_command.__name__: HTTPSemaphore(
-                value=50, interval=60, max_calls=300
+                value=50,
+                interval=60,
+                max_calls=300,
+                burst=30,
+                name="dm.post_command",
             ),  # noqa: E501 # fmt: off
             ADM.get_object_details.__name__: oss_sem,
             ADM.get_object.__name__: oss_sem,
+            ADM.stream_object.__name__: oss_sem,
             ADM.put_object.__name__: oss_sem,
             ADM.put_object_resumable.__name__: oss_sem,
+            ADM._put_object_chunk.__name__: oss_sem,
             ADM.put_object_copy.__name__: oss_sem,
         }
 
+    @classmethod
+    def _project_semaphore(cls, project_id):
+        return project_limiter(
+            cls.project_semaphores, "dm", project_id, cls.PROJECT_MAX_CALLS
+        )
+
+    def _limited(self, sema, project_id=None):
+        return limited(
+            sema, ADM._project_semaphore(project_id), semaphore, self.logger
+        )
+
     def _throttle(func):
-        """ """
+        """
+        Runs func inside the limiters of its endpoint, of the project it
+        is called for (when ADM.PROJECT_MAX_CALLS is set) and the global
+        connection semaphore.
+        """
+        signature = inspect.signature(func)
+        by_project = "project_id" in signature.parameters
 
         @wraps(func)
         @_async_validate_token
         async def inner(self, *args, **kwargs):
-            async with ADM.semaphores[func.__name__] and semaphore:
+            project_id = None
+            if by_project and ADM.PROJECT_MAX_CALLS:
+                bound = signature.bind(self, *args, **kwargs)
+                project_id = bound.arguments.get("project_id")
+            async with self._limited(
+                ADM.semaphores[func.__name__], project_id=project_id
+            ):
+                return await func(self, *args, **kwargs)
+
+        return inner
+
+    def _cached(func):
+        """
+        Serves func from app.cache when the app has one. The key is the
+        function name followed by its arguments in signature order, so
+        resources can be invalidated by the '<name>/<project>/<id>/'
+        prefix. Only successful payloads are stored, including empty
+        listings whose every page was answered. Lookups and writes run in
+        the default executor.
+        """
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def inner(self, *args, **kwargs):
+            cache = getattr(self.app, "cache", None)
+            if not cache:
                 return await func(self, *args, **kwargs)
 
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = cache.key(func.__name__, *list(bound.arguments.values())[1:])
+            loop = asyncio.get_event_loop()
+            data = await loop.run_in_executor(None, cache.get, key)
+            if data is not None:
+                return data
+
+            failed = []
+            token = _failed_pages.set(failed)
+            try:
+                data = await func(self, *args, **kwargs)
+            finally:
+                _failed_pages.reset(token)
+            if (
+                isinstance(data, dict)
+                and "data" in data
+                and "errors" not in data
+            ) or (isinstance(data, list) and not failed):
+                await loop.run_in_executor(None, cache.set, key, data)
+            return data
+
         return inner
 
+    async def _invalidate(self, name, project_id, resource_id=None):
+        """
+        Drops the cached payloads of name for one resource, or for the
+        whole project when resource_id is None.
+        """
+        cache = getattr(self.app, "cache", None)
+        if cache:
+            parts = [name, project_id]
+            if resource_id is not None:
+                parts.append(resource_id)
+            await asyncio.get_event_loop().run_in_executor(
+                None, cache.invalidate, cache.key(*parts, "")
+            )
+
     def _set_headers(self, x_user_id=None):
         headers = {}
         if x_user_id:
@@ -105,44 +291,135 @@ class ADM(ForgeBase):
 
     # Pagination Methods
 
-    async def _get_iter(self, sema, url, params={}, x_user_id=None):
-        params.update({"page[number]": 0, "page[limit]": 200})
-        headers = self._set_headers(x_user_id)
+    async def _get_page(
+        self, sema, url, params, headers, page_number, project_id=None
+    ):
+        """
+        Returns the records of one page and the url of the next page, or
+        None on the last page. A page_number of None requests url as is.
+        """
+        if page_number is not None:
+            params = dict(params)
+            params.update(
+                {"page[number]": page_number, "page[limit]": ADM.PAGE_LIMIT}
+            )
+        async with self._limited(sema, project_id=project_id):
+            res = await self.app._request(
+                method="GET", url=url, headers=headers, params=params
+            )
+            data = await self.app._get_data(res)
 
-        res = await self.app._request(
-            method="GET", url=url, headers=headers, params=params
-        )
-        data = await self.app._get_data(res)
+        failed = _failed_pages.get()
+        if failed is not None and (
+            not 200 <= res.status < 300
+            or not isinstance(data, dict)
+            or "errors" in data
+        ):
+            failed.append(url)
 
         try:
             results = data.get("data") or []
         except (AttributeError, KeyError, TypeError):
             results = []
 
-        if results:
-            try:
-                next_url = data["links"].get("next")["href"]
-            except (AttributeError, KeyError, TypeError):
-                return results
+        try:
+            next_url = data["links"].get("next")["href"] or None
+        except (AttributeError, KeyError, TypeError):
+            next_url = None
+
+        return results, next_url
+
+    async def _aiter_pages(
+        self, sema, url, params=None, x_user_id=None, project_id=None
+    ):
+        """
+        Yields pages in order until one has no next link. While pages come
+        back full, the next PREFETCH_PAGES page numbers are requested in
+        parallel; a prefetched page that fails is requested again. If the
+        server returns shorter pages, the next links are followed instead.
+        Every page acquires the limiters on its own, so a long listing
+        does not hold them between pages.
+        """
+        params = params or {}
+        headers = self._set_headers(x_user_id)
+
+        page, next_url = await self._get_page(
+            sema, url, params, headers, 0, project_id=project_id
+        )
+        yield page
 
+        if len(page) < ADM.PAGE_LIMIT:
             while next_url:
-                async with sema:
-                    res = await self.app._request(
-                        method="GET", url=next_url, headers=headers
-                    )
-                    data = await self.app._get_data(res)
-                    try:
-                        results.extend(data.get("data") or [])
-                    except (AttributeError, KeyError, TypeError):
-                        pass
+                page, next_url = await self._get_page(
+                    sema, next_url, None, headers, None, project_id=project_id
+                )
+                yield page
+            return
 
-                    try:
-                        next_url = data["links"].get("next")["href"]
-                    except (AttributeError, KeyError, TypeError):
-                        break
+        page_number = 1
+        while next_url:
+            pages = await asyncio.gather(
+                *[
+                    self._get_page(
+                        sema,
+                        url,
+                        params,
+                        headers,
+                        page_number + i,
+                        project_id=project_id,
+                    )
+                    for i in range(ADM.PREFETCH_PAGES)
+                ],
+                return_exceptions=True,
+            )
+            for i, result in enumerate(pages):
+                if isinstance(result, BaseException):
+                    self.logger.debug(
+                        "Requesting page {} of {} again: {}".format(
+                            page_number + i, url, result
+                        )
+                    )
+                    result = await self._get_page(
+                        sema,
+                        url,
+                        params,
+                        headers,
+                        page_number + i,
+                        project_id=project_id,
+                    )
+                page, next_url = result
+                yield page
+                if not next_url:
+                    break
+            page_number += ADM.PREFETCH_PAGES
 
+    async def _get_iter(
+        self, sema, url, params=None, x_user_id=None, project_id=None
+    ):
+        results = []
+        async for page in self._aiter_pages(
+            sema,
+            url,
+            params=params,
+            x_user_id=x_user_id,
+            project_id=project_id,
+        ):
+            results.extend(page)
         return results
 
+    async def _aiter(
+        self, sema, url, params=None, x_user_id=None, project_id=None
+    ):
+        async for page in self._aiter_pages(
+            sema,
+            url,
+            params=params,
+            x_user_id=x_user_id,
+            project_id=project_id,
+        ):
+            for record in page:
+                yield record
+
     # PROJECT_V1
 
     @_throttle
@@ -161,7 +438,7 @@ class ADM(ForgeBase):
         res = await self.app._request(method="GET", url=url, headers=headers)
         return await self.app._get_data(res)
 
-    @_throttle
+    @_async_validate_token
     async def get_projects(self, x_user_id=None):
         sema = ADM.semaphores["get_projects"]
         url = "{}/hubs/{}/projects".format(PROJECT_V1_URL, self.hub_id)
@@ -175,6 +452,14 @@ class ADM(ForgeBase):
 
         return projects
 
+    @_async_validate_token
+    async def aiter_projects(self, x_user_id=None):
+        """Yields projects as each page arrives"""
+        sema = ADM.semaphores["get_projects"]
+        url = "{}/hubs/{}/projects".format(PROJECT_V1_URL, self.hub_id)
+        async for project in self._aiter(sema, url, x_user_id=x_user_id):
+            yield project
+
     @_throttle
     async def get_top_folders(self, project_id, x_user_id=None):
         url = "{}/hubs/{}/projects/{}/topFolders".format(
@@ -195,7 +480,8 @@ class ADM(ForgeBase):
         res = await self.app._request(method="GET", url=url, headers=headers)
         return await self.app._get_data(res)
 
-    @_throttle
+    @_cached
+    @_async_validate_token
     async def get_folder_contents(
         self, project_id, folder_id, include_hidden=False, x_user_id=None
     ):
@@ -207,7 +493,11 @@ class ADM(ForgeBase):
             "includeHidden": int(include_hidden),
         }
         contents = await self._get_iter(
-            sema, url, params=params, x_user_id=x_user_id
+            sema,
+            url,
+            params=params,
+            x_user_id=x_user_id,
+            project_id=project_id,
         )
         if contents:
             self.logger.debug(
@@ -218,6 +508,28 @@ class ADM(ForgeBase):
 
         return contents
 
+    @_async_validate_token
+    async def aiter_folder_contents(
+        self, project_id, folder_id, include_hidden=False, x_user_id=None
+    ):
+        """Yields folder contents as each page arrives"""
+        sema = ADM.semaphores["get_folder_contents"]
+        url = "{}/projects/{}/folders/{}/contents".format(
+            DATA_V1_URL, project_id, folder_id
+        )
+        params = {
+            "includeHidden": int(include_hidden),
+        }
+        async for content in self._aiter(
+            sema,
+            url,
+            params=params,
+            x_user_id=x_user_id,
+            project_id=project_id,
+        ):
+            yield content
+
+    @_cached
     @_throttle
     async def get_item(self, project_id, item_id, x_user_id=None):
         url = "{}/projects/{}/items/{}".format(
@@ -236,13 +548,16 @@ class ADM(ForgeBase):
         res = await self.app._request(method="GET", url=url, headers=headers)
         return await self.app._get_data(res)
 
-    @_throttle
+    @_cached
+    @_async_validate_token
     async def get_item_versions(self, project_id, item_id, x_user_id=None):
         sema = ADM.semaphores["get_item_versions"]
         url = "{}/projects/{}/items/{}/versions".format(
             DATA_V1_URL, project_id, item_id
         )
-        versions = await self._get_iter(sema, url, x_user_id=x_user_id)
+        versions = await self._get_iter(
+            sema, url, x_user_id=x_user_id, project_id=project_id
+        )
         if versions:
             self.logger.debug(
                 "Fetched {} versions from item: {} in project: {}".format(
@@ -252,6 +567,19 @@ class ADM(ForgeBase):
 
         return versions
 
+    @_async_validate_token
+    async def aiter_item_versions(self, project_id, item_id, x_user_id=None):
+        """Yields item versions as each page arrives"""
+        sema = ADM.semaphores["get_item_versions"]
+        url = "{}/projects/{}/items/{}/versions".format(
+            DATA_V1_URL, project_id, item_id
+        )
+        async for version in self._aiter(
+            sema, url, x_user_id=x_user_id, project_id=project_id
+        ):
+            yield version
+
+    @_cached
     @_throttle
     async def get_version(self, project_id, version_id, x_user_id=None):
         url = "{}/projects/{}/versions/{}".format(
@@ -361,6 +689,7 @@ class ADM(ForgeBase):
             headers=headers,
             json=json_data,
         )
+        await self._invalidate("get_folder_contents", project_id, folder_id)
         return await self.app._get_data(res)
 
     @_throttle
@@ -373,7 +702,12 @@ class ADM(ForgeBase):
         version_extension_type=None,
         copy_from_id=None,
         x_user_id=None,
+        folder_id=None,
     ):
+        """
+        folder_id is the folder of the item, whose cached contents are
+        dropped. Without it every cached folder listing of the project is.
+        """
         url = "{}/projects/{}/versions".format(DATA_V1_URL, project_id)
         headers = self._set_headers(x_user_id=x_user_id)
         headers.update({"Content-Type": "application/vnd.api+json"})
@@ -413,6 +747,9 @@ class ADM(ForgeBase):
             headers=headers,
             json=json_data,
         )
+        await self._invalidate("get_item", project_id, item_id)
+        await self._invalidate("get_item_versions", project_id, item_id)
+        await self._invalidate("get_folder_contents", project_id, folder_id)
         return await self.app._get_data(res)
 
     @_throttle
@@ -491,6 +828,9 @@ class ADM(ForgeBase):
             json=json_data,
         )
         data = await self.app._get_data(res)
+        await self._invalidate(
+            "get_folder_contents", project_id, parent_folder_id
+        )
 
         if res.status >= 200 and res.status < 300:
             self.logger.info(
@@ -579,6 +919,144 @@ class ADM(ForgeBase):
         res = await self.app._request(method="GET", url=url, headers=headers)
         return await self.app._get_data(res)
 
+    @_throttle
+    async def stream_object(
+        self,
+        bucket_key,
+        object_name,
+        writable,
+        byte_range=None,
+        chunk_size=None,
+        progress=None,
+    ):
+        """
+        Streams an OSS object (or a byte range of it) into writable block
+        by block, so only one block is held in memory.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            writable (``object``): Any object with a write(bytes) method.
+
+        Kwargs:
+            byte_range (``tuple``, default=None): Inclusive (first, last) byte positions.
+            chunk_size (``int``, default=ADM.STREAM_CHUNK_SIZE): Size of the blocks read from the response.
+            progress (``callable``, default=None): Called with the size of every block written.
+
+        Returns:
+            written (``int``): Number of bytes written.
+        """  # noqa: E501
+        url = "{}/buckets/{}/objects/{}".format(
+            OSS_V2_URL, bucket_key, object_name
+        )
+        headers = {}
+        if byte_range:
+            headers.update({"Range": "bytes={}-{}".format(*byte_range)})
+        res = await self.app._request(method="GET", url=url, headers=headers)
+        if res.status not in (200, 206):
+            data = await self.app._get_data(res)
+            raise ValueError(
+                "Failed to download '{}' - {}: {}".format(
+                    object_name, res.status, data
+                )
+            )
+
+        written = 0
+        try:
+            async for chunk in res.content.iter_chunked(
+                chunk_size or ADM.STREAM_CHUNK_SIZE
+            ):
+                writable.write(chunk)
+                written += len(chunk)
+                if progress:
+                    progress(len(chunk))
+        finally:
+            res.release()
+        return written
+
+    async def download_object(
+        self,
+        bucket_key,
+        object_name,
+        filepath,
+        size=None,
+        chunk_size=None,
+        max_in_flight=None,
+        progress=None,
+    ):
+        """
+        Downloads an OSS object to filepath by streaming byte ranges
+        concurrently, each one written from its offset in a preallocated
+        file as it arrives. The file is removed if the download fails.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            filepath (``str``): Path of the file to write.
+
+        Kwargs:
+            size (``int``, default=None): Object size in bytes. Fetched from the object details if not given.
+            chunk_size (``int``, default=ADM.DOWNLOAD_CHUNK_SIZE): Size of each byte range.
+            max_in_flight (``int``, default=None): Maximum number of ranges downloading at once. Defaults to the OSS semaphore value.
+            progress (``callable``, default=None): Called with the size of every block written.
+
+        Returns:
+            filepath (``str``): Path of the written file.
+        """  # noqa: E501
+        if size is None:
+            details = await self.get_object_details(bucket_key, object_name)
+            size = details["size"]
+        chunk_size = chunk_size or ADM.DOWNLOAD_CHUNK_SIZE
+        max_in_flight = (
+            max_in_flight or ADM.semaphores[ADM.get_object.__name__].value
+        )
+        ranges = iter(
+            [
+                (lower, min(lower + chunk_size, size) - 1)
+                for lower in range(0, size, chunk_size)
+            ]
+        )
+
+        with open(filepath, "wb") as fp:
+            fp.truncate(size)
+
+        try:
+            with open(filepath, "r+b") as fp:
+
+                async def worker():
+                    for byte_range in ranges:
+                        written = await self.stream_object(
+                            bucket_key,
+                            object_name,
+                            _OffsetWriter(fp, byte_range[0]),
+                            byte_range=byte_range,
+                            progress=progress,
+                        )
+                        if written != byte_range[1] - byte_range[0] + 1:
+                            raise ValueError(
+                                "Incomplete bytes {}-{} of '{}'".format(
+                                    *byte_range, object_name
+                                )
+                            )
+
+                workers = [
+                    asyncio.create_task(worker())
+                    for _ in range(min(max_in_flight, -(-size // chunk_size)))
+                ]
+                try:
+                    await asyncio.gather(*workers)
+                except BaseException:
+                    for task in workers:
+                        task.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+                    raise
+        except BaseException:
+            # a preallocated file would pass for a complete one
+            os.remove(filepath)
+            raise
+
+        return filepath
+
     @_throttle
     async def put_object(self, bucket_key, object_name, object_bytes):
         url = "{}/buckets/{}/objects/{}".format(
@@ -587,6 +1065,16 @@ class ADM(ForgeBase):
         res = await self.app._request(method="PUT", url=url, data=object_bytes)
         return await self.app._get_data(res)
 
+    @staticmethod
+    def _resumable_headers(byte_range, total_size, session_id):
+        return {
+            "Content-Length": str(byte_range[1] - byte_range[0] + 1),
+            "Session-Id": session_id,
+            "Content-Range": "bytes {}-{}/{}".format(
+                byte_range[0], byte_range[1], total_size
+            ),
+        }
+
     @_throttle
     async def put_object_resumable(
         self,
@@ -595,14 +1083,19 @@ class ADM(ForgeBase):
         object_bytes,
         total_size,
         byte_range,
-        session_id="-811577637",
+        session_id=None,
     ):
+        """
+        Uploads bytes byte_range of an object of total_size bytes. Pass
+        the same session_id for every chunk of the object; without one a
+        new upload session is started.
+        """
         url = "{}/buckets/{}/objects/{}/resumable".format(
             OSS_V2_URL, bucket_key, object_name
         )
         headers = {
             "Content-Length": str(total_size),
-            "Session-Id": session_id,
+            "Session-Id": session_id or uuid4().hex,
             "Content-Range": "bytes {}-{}/{}".format(
                 byte_range[0], byte_range[1], total_size
             ),
@@ -612,6 +1105,173 @@ class ADM(ForgeBase):
         )
         return await self.app._get_data(res)
 
+    @_throttle
+    async def _put_object_chunk(
+        self,
+        bucket_key,
+        object_name,
+        object_bytes,
+        total_size,
+        byte_range,
+        session_id,
+    ):
+        """
+        Uploads one chunk of a resumable upload.
+
+        Returns:
+            status (``int``): 202 for an accepted chunk, 200 once every chunk of the object has been received.
+            data (``dict``): Body of the response.
+        """  # noqa: E501
+        url = "{}/buckets/{}/objects/{}/resumable".format(
+            OSS_V2_URL, bucket_key, object_name
+        )
+        res = await self.app._request(
+            method="PUT",
+            url=url,
+            headers=self._resumable_headers(
+                byte_range, total_size, session_id
+            ),
+            data=object_bytes,
+        )
+        return res.status, await self.app._get_data(res)
+
+    async def put_object_chunk(
+        self,
+        bucket_key,
+        object_name,
+        object_bytes,
+        total_size,
+        byte_range,
+        session_id,
+        retries=3,
+    ):
+        """
+        Uploads one chunk of a resumable upload, sending it again up to
+        retries times if it is not accepted.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            object_bytes (``bytes``): Content of the chunk.
+            total_size (``int``): Size of the whole object in bytes.
+            byte_range (``tuple``): Inclusive (first, last) byte positions of the chunk.
+            session_id (``str``): Id shared by every chunk of the upload.
+
+        Kwargs:
+            retries (``int``, default=3): Number of times a failed chunk is sent again.
+
+        Returns:
+            data (``dict``): Body of the response, the object details once every chunk has been received.
+        """  # noqa: E501
+        for attempt in range(retries + 1):
+            try:
+                status, data = await self._put_object_chunk(
+                    bucket_key,
+                    object_name,
+                    object_bytes,
+                    total_size,
+                    byte_range,
+                    session_id,
+                )
+            except (ClientError, asyncio.TimeoutError) as e:
+                status, data = None, e
+            if status in (200, 202):
+                return data
+            self.logger.debug(
+                "Chunk {}-{} of '{}' failed ({}): {}".format(
+                    *byte_range, object_name, status, data
+                )
+            )
+            if attempt < retries:
+                await asyncio.sleep(0.1 * (attempt + 1) ** 2)
+        raise ValueError(
+            "Failed to upload bytes {}-{} of '{}'".format(
+                *byte_range, object_name
+            )
+        )
+
+    async def upload_object(
+        self,
+        bucket_key,
+        object_name,
+        filepath,
+        chunk_size=None,
+        max_in_flight=None,
+        retries=3,
+    ):
+        """
+        Uploads a local file to OSS with a resumable upload: the file is
+        read chunk by chunk and the chunks are sent concurrently under one
+        Session-Id, each one retried on its own. The last chunk is sent
+        once every other chunk has been accepted so its response carries
+        the object details.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            filepath (``str``): Path of the file to upload.
+
+        Kwargs:
+            chunk_size (``int``, default=ADM.UPLOAD_CHUNK_SIZE): Size of each chunk.
+            max_in_flight (``int``, default=None): Maximum number of chunks uploading at once. Defaults to the OSS semaphore value.
+            retries (``int``, default=3): Number of times a failed chunk is sent again.
+
+        Returns:
+            data (``dict``): Object details returned by OSS.
+        """  # noqa: E501
+        total_size = os.path.getsize(filepath)
+        if not total_size:
+            return await self.put_object(bucket_key, object_name, b"")
+
+        chunk_size = chunk_size or ADM.UPLOAD_CHUNK_SIZE
+        max_in_flight = (
+            max_in_flight
+            or ADM.semaphores[ADM._put_object_chunk.__name__].value
+        )
+        session_id = uuid4().hex
+        byte_ranges = [
+            (lower, min(lower + chunk_size, total_size) - 1)
+            for lower in range(0, total_size, chunk_size)
+        ]
+        loop = asyncio.get_running_loop()
+
+        def read(byte_range):
+            with open(filepath, "rb") as fp:
+                fp.seek(byte_range[0])
+                return fp.read(byte_range[1] - byte_range[0] + 1)
+
+        async def send(byte_range):
+            object_bytes = await loop.run_in_executor(None, read, byte_range)
+            return await self.put_object_chunk(
+                bucket_key,
+                object_name,
+                object_bytes,
+                total_size,
+                byte_range,
+                session_id,
+                retries=retries,
+            )
+
+        pending = iter(byte_ranges[:-1])
+
+        async def worker():
+            for byte_range in pending:
+                await send(byte_range)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(max_in_flight, len(byte_ranges) - 1))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+
+        return await send(byte_ranges[-1])
+
     @_throttle
     async def put_object_copy(self, bucket_key, object_name, new_object_name):
         url = "{}/buckets/{}/objects/{}/copyto/{}".format(
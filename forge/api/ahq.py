@@ -5,12 +5,13 @@
 from __future__ import absolute_import
 
 import asyncio
+import inspect
 
 from functools import wraps
 
 from ..base import ForgeBase, Logger, semaphore
 from ..decorators import _async_validate_token
-from ..utils import HTTPSemaphore
+from ..utils import HTTPSemaphore, limited, project_limiter
 from ..urls import BIM_360_ADMIN_V1_URL, HQ_V1_URL, HQ_V2_URL
 
 logger = Logger.start(__name__)
@@ -18,6 +19,12 @@ logger = Logger.start(__name__)
 
 class AHQ(ForgeBase):
     logger = logger
+    # offset page size and number of pages requested ahead in parallel
+    PAGE_LIMIT = 100
+    PREFETCH_PAGES = 4
+    # calls per minute allowed for each project, None to not limit them
+    PROJECT_MAX_CALLS = None
+    project_semaphores = {}
 
     def __init__(self, app, *args, **kwargs):
         self.app = app
@@ -28,8 +35,12 @@ class AHQ(ForgeBase):
     def _set_rate_limits(cls):
         if getattr(cls, "semaphores", None):
             return
-        hq_sem = HTTPSemaphore(value=100, interval=60, max_calls=1000)
-        bim360_sem = HTTPSemaphore(value=600, interval=60, max_calls=1000)
+        hq_sem = HTTPSemaphore(
+            value=100, interval=60, max_calls=1000, burst=100, name="hq"
+        )
+        bim360_sem = HTTPSemaphore(
+            value=600, interval=60, max_calls=1000, burst=100, name="bim360"
+        )
         cls.semaphores = {
             AHQ.get_project_users.__name__: bim360_sem,
             AHQ.get_users.__name__: hq_sem,
@@ -45,13 +56,36 @@ class AHQ(ForgeBase):
             AHQ.patch_project_user.__name__: hq_sem,
         }
 
+    @classmethod
+    def _project_semaphore(cls, project_id):
+        return project_limiter(
+            cls.project_semaphores, "hq", project_id, cls.PROJECT_MAX_CALLS
+        )
+
+    def _limited(self, sema, project_id=None):
+        return limited(
+            sema, AHQ._project_semaphore(project_id), semaphore, self.logger
+        )
+
     def _throttle(func):
-        """ """
+        """
+        Runs func inside the limiters of its endpoint, of the project it
+        is called for (when AHQ.PROJECT_MAX_CALLS is set) and the global
+        connection semaphore.
+        """
+        signature = inspect.signature(func)
+        by_project = "project_id" in signature.parameters
 
         @wraps(func)
         @_async_validate_token
         async def inner(self, *args, **kwargs):
-            async with AHQ.semaphores[func.__name__] and semaphore:
+            project_id = None
+            if by_project and AHQ.PROJECT_MAX_CALLS:
+                bound = signature.bind(self, *args, **kwargs)
+                project_id = bound.arguments.get("project_id")
+            async with self._limited(
+                AHQ.semaphores[func.__name__], project_id=project_id
+            ):
                 return await func(self, *args, **kwargs)
 
         return inner
@@ -59,25 +93,20 @@ class AHQ(ForgeBase):
     # Pagination Methods
 
     async def _get_page(
-        self,
-        url,
-        page_number,
-        page_size,
-        responses,
-        headers=None,
-        params={},
+        self, sema, url, page_number, headers, params, project_id=None
     ):
-        params["offset"] = page_number * page_size
-        res = await self.app._request(
-            method="GET", url=url, headers=headers, params=params
+        params = dict(params)
+        params.update(
+            {
+                "limit": AHQ.PAGE_LIMIT,
+                "offset": page_number * AHQ.PAGE_LIMIT,
+            }
         )
-        # res.raise_for_status()
-        await responses.put((res, page_number))
-
-    async def _get_page_data(self, responses, page_size, done, results):
-        res, page_number = await responses.get()
-
-        page_results = await self.app._get_data(res)
+        async with self._limited(sema, project_id=project_id):
+            res = await self.app._request(
+                method="GET", url=url, headers=headers, params=params
+            )
+            page_results = await self.app._get_data(res)
 
         # TODO
         try:
@@ -85,60 +114,74 @@ class AHQ(ForgeBase):
         except Exception:
             pass
 
-        if (page_number != 0 and len(page_results) < page_size) and (
-            not getattr(done, "last_page", None)
-            or page_number < done.last_page
-        ):
-            done.last_page = page_number
-        elif page_number == 0 and len(page_results) < page_size:
-            done.set()
-
-        results.extend(page_results)
+        if not isinstance(page_results, list):
+            page_results = []
 
-        if (
-            getattr(done, "last_page", None)
-            and len(results) >= done.last_page * page_size
-        ):
-            done.set()
+        return page_results
 
-        responses.task_done()
-
-    async def _get_iter(self, sema, url, name, headers=None, params={}):
-        responses = asyncio.Queue()
-        done = asyncio.Event()
-
-        page_size = 100
-        params["limit"] = page_size
-        results = []
+    async def _aiter_pages(
+        self, sema, url, headers=None, params=None, project_id=None
+    ):
+        """
+        Yields the first page, then requests the next PREFETCH_PAGES
+        offsets in parallel until the first short page is found; a
+        prefetched page that fails is requested again. Pages are yielded
+        in order. Every page acquires the limiters on its own, so a long
+        listing does not hold them between pages.
+        """
+        params = params or {}
 
-        tasks = []
-        page_number = 0
-        while True:
-            async with sema:
-                tasks.append(
-                    asyncio.create_task(
-                        self._get_page(
-                            url,
-                            page_number,
-                            page_size,
-                            responses,
-                            headers=headers,
-                            params=params,
-                        )
+        page = await self._get_page(
+            sema, url, 0, headers, params, project_id=project_id
+        )
+        yield page
+
+        page_number = 1
+        last_page = len(page) < AHQ.PAGE_LIMIT
+        while not last_page:
+            pages = await asyncio.gather(
+                *[
+                    self._get_page(
+                        sema,
+                        url,
+                        page_number + i,
+                        headers,
+                        params,
+                        project_id=project_id,
                     )
-                )
-            tasks.append(
-                asyncio.create_task(
-                    self._get_page_data(responses, page_size, done, results)
-                )
+                    for i in range(AHQ.PREFETCH_PAGES)
+                ],
+                return_exceptions=True,
             )
-            await asyncio.sleep(0.06)
-            page_number += 1
-            if done.is_set():
-                break
-
-        for t in tasks:
-            t.cancel()
+            for i, page in enumerate(pages):
+                if isinstance(page, BaseException):
+                    self.logger.debug(
+                        "Requesting page {} of {} again: {}".format(
+                            page_number + i, url, page
+                        )
+                    )
+                    page = await self._get_page(
+                        sema,
+                        url,
+                        page_number + i,
+                        headers,
+                        params,
+                        project_id=project_id,
+                    )
+                yield page
+                last_page = len(page) < AHQ.PAGE_LIMIT
+                if last_page:
+                    break
+            page_number += AHQ.PREFETCH_PAGES
+
+    async def _get_iter(
+        self, sema, url, name, headers=None, params=None, project_id=None
+    ):
+        results = []
+        async for page in self._aiter_pages(
+            sema, url, headers=headers, params=params, project_id=project_id
+        ):
+            results.extend(page)
 
         if results:
             if isinstance(results[0], dict):
@@ -153,23 +196,50 @@ class AHQ(ForgeBase):
                 )
         return results
 
+    async def _aiter(
+        self, sema, url, headers=None, params=None, project_id=None
+    ):
+        async for page in self._aiter_pages(
+            sema, url, headers=headers, params=params, project_id=project_id
+        ):
+            for record in page:
+                yield record
+
     # BIM 360 ADMIN V1
 
-    @_throttle
+    @_async_validate_token
     async def get_project_users(self, project_id):
-        sema = AHQ.semaphores["get_users"]
+        sema = AHQ.semaphores["get_project_users"]
+        url = "{}/projects/{}/users".format(BIM_360_ADMIN_V1_URL, project_id)
+        return await self._get_iter(
+            sema, url, "project users", project_id=project_id
+        )
+
+    @_async_validate_token
+    async def aiter_project_users(self, project_id):
+        """Yields project users as each page arrives"""
+        sema = AHQ.semaphores["get_project_users"]
         url = "{}/projects/{}/users".format(BIM_360_ADMIN_V1_URL, project_id)
-        return await self._get_iter(sema, url, "project users")
+        async for user in self._aiter(sema, url, project_id=project_id):
+            yield user
 
     # HQ V1
 
-    @_throttle
+    @_async_validate_token
     async def get_users(self):
         sema = AHQ.semaphores["get_users"]
         url = "{}/accounts/{}/users".format(HQ_V1_URL, self.account_id)
         return await self._get_iter(sema, url, "users")
 
-    @_throttle
+    @_async_validate_token
+    async def aiter_users(self):
+        """Yields account users as each page arrives"""
+        sema = AHQ.semaphores["get_users"]
+        url = "{}/accounts/{}/users".format(HQ_V1_URL, self.account_id)
+        async for user in self._aiter(sema, url):
+            yield user
+
+    @_async_validate_token
     async def get_users_search(
         self,
         name=None,
@@ -192,6 +262,28 @@ class AHQ(ForgeBase):
         url = "{}/accounts/{}/users/search".format(HQ_V1_URL, self.account_id)
         return await self._get_iter(sema, url, "users", params=params)
 
+    @_async_validate_token
+    async def aiter_users_search(
+        self,
+        name=None,
+        email=None,
+        company_name=None,
+        partial=1,  # aiohttp does not take booleans as param values
+        limit=None,
+        sort=None,
+        field=None,
+    ):
+        """Yields matching users as each page arrives"""
+        sema = AHQ.semaphores["get_users_search"]
+        params = {
+            k: v
+            for k, v in locals().items()
+            if v and (k != "self" and k != "sema")
+        }
+        url = "{}/accounts/{}/users/search".format(HQ_V1_URL, self.account_id)
+        async for user in self._aiter(sema, url, params=params):
+            yield user
+
     @_throttle
     async def get_user(self, user_id):
         url = "{}/accounts/{}/users/{}".format(
@@ -200,12 +292,20 @@ class AHQ(ForgeBase):
         res = await self.app._request(method="GET", url=url)
         return await self.app._get_data(res)
 
-    @_throttle
+    @_async_validate_token
     async def get_projects(self):
         sema = AHQ.semaphores["get_projects"]
         url = "{}/accounts/{}/projects".format(HQ_V1_URL, self.account_id)
         return await self._get_iter(sema, url, "projects")
 
+    @_async_validate_token
+    async def aiter_projects(self):
+        """Yields account projects as each page arrives"""
+        sema = AHQ.semaphores["get_projects"]
+        url = "{}/accounts/{}/projects".format(HQ_V1_URL, self.account_id)
+        async for project in self._aiter(sema, url):
+            yield project
+
     @_throttle
     async def get_project(self, project_id):
         url = "{}/accounts/{}/projects/{}".format(
@@ -214,12 +314,20 @@ class AHQ(ForgeBase):
         res = await self.app._request(method="GET", url=url)
         return await self.app._get_data(res)
 
-    @_throttle
+    @_async_validate_token
     async def get_companies(self):
         sema = AHQ.semaphores["get_companies"]
         url = "{}/accounts/{}/companies".format(HQ_V1_URL, self.account_id)
         return await self._get_iter(sema, url, "companies")
 
+    @_async_validate_token
+    async def aiter_companies(self):
+        """Yields account companies as each page arrives"""
+        sema = AHQ.semaphores["get_companies"]
+        url = "{}/accounts/{}/companies".format(HQ_V1_URL, self.account_id)
+        async for company in self._aiter(sema, url):
+            yield company
+
     @_throttle
     async def post_project(
         self,
@@ -4,6 +4,11 @@
 
 from __future__ import absolute_import
 
+import os
+import time
+
+from uuid import uuid4
+
 from ..base import ForgeBase, Logger
 from ..decorators import _validate_token
 from ..urls import DATA_V1_URL, PROJECT_V1_URL, OSS_V2_URL
@@ -12,6 +17,8 @@ logger = Logger.start(__name__)
 
 
 class DM(ForgeBase):
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
     def __init__(self, *args, **kwargs):
         self.auth = kwargs.get("auth")
         self.logger = logger
@@ -460,6 +467,52 @@ class DM(ForgeBase):
         data, _ = self.session.request("get", url, headers=headers)
         return data
 
+    @_validate_token
+    def stream_object(
+        self,
+        bucket_key,
+        object_name,
+        writable,
+        byte_range=None,
+        chunk_size=1024 * 1024,
+        progress=None,
+    ):
+        """
+        Streams an OSS object (or a byte range of it) into writable block
+        by block, so only one block is held in memory.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            writable (``object``): Any object with a write(bytes) method.
+
+        Kwargs:
+            byte_range (``tuple``, default=None): Inclusive (first, last) byte positions.
+            chunk_size (``int``, default=1048576): Size of the blocks read from the response.
+            progress (``callable``, default=None): Called with the size of every block written.
+
+        Returns:
+            written (``int``): Number of bytes written.
+        """  # noqa: E501
+        url = "{}/buckets/{}/objects/{}".format(
+            OSS_V2_URL, bucket_key, object_name
+        )
+        headers = {k: v for k, v in self.auth.header.items()}
+        if byte_range:
+            headers.update({"Range": "bytes={}-{}".format(*byte_range)})
+        written, success = self.session.stream(
+            "get",
+            url,
+            writable,
+            headers=headers,
+            chunk_size=chunk_size,
+            progress=progress,
+            message="download '{}'".format(object_name),
+        )
+        if not success:
+            raise ValueError("Failed to download '{}'".format(object_name))
+        return written
+
     @_validate_token
     def put_object(self, bucket_key, object_name, object_bytes):
         url = "{}/buckets/{}/objects/{}".format(
@@ -481,14 +534,19 @@ class DM(ForgeBase):
         object_bytes,
         total_size,
         byte_range,
-        session_id="-811577637",
+        session_id=None,
     ):
+        """
+        Uploads bytes byte_range of an object of total_size bytes. Pass
+        the same session_id for every chunk of the object; without one a
+        new upload session is started.
+        """
         url = "{}/buckets/{}/objects/{}/resumable".format(
             OSS_V2_URL, bucket_key, object_name
         )
         headers = {
             "Content-Length": str(total_size),
-            "Session-Id": session_id,
+            "Session-Id": session_id or uuid4().hex,
             "Content-Range": "bytes {}-{}/{}".format(
                 byte_range[0], byte_range[1], total_size
             ),
@@ -502,6 +560,106 @@ class DM(ForgeBase):
         )
         return data
 
+    @_validate_token
+    def put_object_chunk(
+        self,
+        bucket_key,
+        object_name,
+        object_bytes,
+        total_size,
+        byte_range,
+        session_id,
+        retries=3,
+    ):
+        """
+        Uploads one chunk of a resumable upload, sending it again up to
+        retries times if it is not accepted.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            object_bytes (``bytes``): Content of the chunk.
+            total_size (``int``): Size of the whole object in bytes.
+            byte_range (``tuple``): Inclusive (first, last) byte positions of the chunk.
+            session_id (``str``): Id shared by every chunk of the upload.
+
+        Kwargs:
+            retries (``int``, default=3): Number of times a failed chunk is sent again.
+
+        Returns:
+            data (``dict``): Body of the response, the object details once every chunk has been received.
+        """  # noqa: E501
+        url = "{}/buckets/{}/objects/{}/resumable".format(
+            OSS_V2_URL, bucket_key, object_name
+        )
+        headers = {
+            "Content-Length": str(byte_range[1] - byte_range[0] + 1),
+            "Session-Id": session_id,
+            "Content-Range": "bytes {}-{}/{}".format(
+                byte_range[0], byte_range[1], total_size
+            ),
+        }
+        headers.update(self.auth.header)
+        for attempt in range(retries + 1):
+            data, success = self.session.request(
+                "put",
+                url,
+                headers=headers,
+                byte_data=object_bytes,
+                message="upload bytes {}-{} of '{}'".format(
+                    *byte_range, object_name
+                ),
+            )
+            if success:
+                return data
+            if attempt < retries:
+                time.sleep(0.1 * (attempt + 1) ** 2)
+        raise ValueError(
+            "Failed to upload bytes {}-{} of '{}'".format(
+                *byte_range, object_name
+            )
+        )
+
+    def upload_object(
+        self, bucket_key, object_name, filepath, chunk_size=None, retries=3
+    ):
+        """
+        Uploads a local file to OSS with a resumable upload: the file is
+        read and sent chunk by chunk under one Session-Id, so only one
+        chunk is held in memory, and each chunk is retried on its own.
+
+        Args:
+            bucket_key (``str``): OSS bucket key.
+            object_name (``str``): OSS object name.
+            filepath (``str``): Path of the file to upload.
+
+        Kwargs:
+            chunk_size (``int``, default=DM.UPLOAD_CHUNK_SIZE): Size of each chunk.
+            retries (``int``, default=3): Number of times a failed chunk is sent again.
+
+        Returns:
+            data (``dict``): Object details returned by OSS.
+        """  # noqa: E501
+        total_size = os.path.getsize(filepath)
+        if not total_size:
+            return self.put_object(bucket_key, object_name, b"")
+
+        chunk_size = chunk_size or DM.UPLOAD_CHUNK_SIZE
+        session_id = uuid4().hex
+        with open(filepath, "rb") as fp:
+            for lower in range(0, total_size, chunk_size):
+                byte_range = (lower, min(lower + chunk_size, total_size) - 1)
+                data = self.put_object_chunk(
+                    bucket_key,
+                    object_name,
+                    fp.read(chunk_size),
+                    total_size,
+                    byte_range,
+                    session_id,
+                    retries=retries,
+                )
+        return data
+
     @_validate_token
     def put_object_copy(self, bucket_key, object_name, new_object_name):
         url = "{}/buckets/{}/objects/{}/copyto/{}".format(
@@ -4,18 +4,16 @@
 
 from __future__ import absolute_import
 
-import chromedriver_autoinstaller
 import os
 import sys
+import time
 
-from datetime import datetime
-from selenium.webdriver import Chrome
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import WebDriverException
+from datetime import datetime, timedelta
+from uuid import uuid4
 
 from .base import ForgeBase, Logger
 from .urls import AUTH_V1_URL
+from .utils import FileTokenStore
 
 logger = Logger.start(__name__)
 
@@ -32,6 +30,10 @@ class ForgeAuth(ForgeBase):
         username=None,
         password=None,
         log_level="info",
+        refresh_margin=60,
+        token_store=None,
+        loopback=False,
+        opener=None,
     ):
         """
         This class wraps methods found in the Authentication (OAuth) API
@@ -49,8 +51,13 @@ class ForgeAuth(ForgeBase):
             username (``string``, default=None): (Not needed for 2-Legged Context) Email or Username credential to an Autodesk Account. If not provided, it will attempt to look for the 'FORGE_USERNAME' environment variable.
             password (``string``, default=None): (Not needed for 2-Legged Context) Password credential to an Autodesk Account. If not provided, it will attempt to look for the 'FORGE_PASSWORD' environment variable.
             log_level (``string``, default="info"): Logging level.
+            refresh_margin (``int``, default=60): Seconds before expiry at which the async clients start refreshing the token.
+            token_store (``FileTokenStore``, default=None): Where tokens are shared with other processes and reused from. Defaults to a FileTokenStore, False disables it.
+            loopback (``bool``, default=False): (Not needed for 2-Legged Context) If True, the authorization code is received by a local listener on redirect_uri (e.g. 'http://localhost:8080/callback') after the user signs in with opener, instead of a headless browser signing in with username and password. Requires the "authorization_code" grant_type. Its tokens are only kept in token_store when username names the account that signs in.
+            opener (``callable``, default=webbrowser.open): (Only used with loopback) Called with the authorization URL the user has to visit.
         """  # noqa:E501
         self.timestamp = datetime.now()
+        self.refresh_margin = refresh_margin
         self.logger = logger
         Logger.set_level(self.logger, log_level)
         self.client_id = client_id or os.environ.get("FORGE_CLIENT_ID")
@@ -80,22 +87,53 @@ class ForgeAuth(ForgeBase):
             )
 
         self.three_legged = three_legged
-        if self.three_legged:
-            if self.redirect_uri and self.username and self.password:
-                self._get_auth3()
-            else:
+        self.loopback = loopback
+        self.opener = opener
+        if self.three_legged and self.loopback:
+            if not self.redirect_uri:
                 raise AttributeError(
-                    "Three-legged Authentication requires a valid "
-                    + "redirect_uri, username, and password"
+                    "Loopback Authentication requires a valid redirect_uri"
                 )
-        else:
-            self._get_auth2()
+            elif self.grant_type != "authorization_code":
+                raise ValueError(
+                    "Loopback Authentication requires the "
+                    + "'authorization_code' grant_type"
+                )
+        elif self.three_legged and not (
+            self.redirect_uri and self.username and self.password
+        ):
+            raise AttributeError(
+                "Three-legged Authentication requires a valid "
+                + "redirect_uri, username, and password"
+            )
+
+        self.token_store = token_store
+        if token_store is None:
+            try:
+                self.token_store = FileTokenStore()
+            except (IOError, OSError) as e:
+                self.logger.warning("Token store disabled: {}".format(e))
+
+        self.refresh_token = None
+        if self._load_token():
+            return
+        elif self.refresh_token:
+            # the stored refresh token may have been used by another process
+            try:
+                self._refresh_token()
+                return
+            except AttributeError:
+                self.refresh_token = None
+        self.refresh()
 
     # API Endpoints
     # Two-Legged Context
 
     def _authenticate(self):
         """https://forge.autodesk.com/en/docs/oauth/v2/reference/http/authenticate-POST/"""  # noqa:E501
+        self._get_auth(*self._authenticate_request())
+
+    def _authenticate_request(self):
         url = "{}/authenticate".format(AUTH_V1_URL)
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         params = {
@@ -104,21 +142,33 @@ class ForgeAuth(ForgeBase):
             "grant_type": "client_credentials",
             "scope": " ".join(self.scopes),
         }
-
-        self._get_auth(url, headers, params)
+        return url, headers, params
 
     # Three-Legged Context
 
-    def _authorize(self, response_type="token"):
+    def _authorize_url(self, response_type="token", **params):
         """https://forge.autodesk.com/en/docs/oauth/v2/reference/http/authorize-GET/"""  # noqa:E501
         url = "{}/authorize".format(AUTH_V1_URL)
-        params = {
-            "redirect_uri": self.redirect_uri,
-            "client_id": self.client_id,
-            "scope": " ".join(self.scopes),
-            "response_type": response_type,
-        }
-        url = self._compose_url(url, params)
+        params.update(
+            {
+                "redirect_uri": self.redirect_uri,
+                "client_id": self.client_id,
+                "scope": " ".join(self.scopes),
+                "response_type": response_type,
+            }
+        )
+        return self._compose_url(url, params)
+
+    def _authorize(self, response_type="token"):
+        url = self._authorize_url(response_type=response_type)
+
+        # only three-legged apps need the browser
+        import chromedriver_autoinstaller
+
+        from selenium.webdriver import Chrome
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import WebDriverException
 
         chrome_driver_path = os.environ.get("CHROMEDRIVER_PATH")
 
@@ -178,6 +228,34 @@ class ForgeAuth(ForgeBase):
         params = self._decompose_url(return_url)
         self.__dict__.update(params)
 
+    def _authorize_loopback(self, timeout=300):
+        """
+        Waits for the authorization code on redirect_uri while the user
+        signs in with opener.
+        """
+        import webbrowser
+
+        from .utils.loopback import wait_for_redirect
+
+        state = uuid4().hex
+        url = self._authorize_url(response_type="code", state=state)
+        self.logger.info("Sign in to authorize the Forge App: {}".format(url))
+        params = wait_for_redirect(
+            url,
+            self.redirect_uri,
+            self.opener or webbrowser.open,
+            timeout=timeout,
+        )
+        if params.get("state") != state or "code" not in params:
+            raise AttributeError(
+                "Failed to get Authorization Code: {}".format(
+                    params.get("error_description")
+                    or params.get("error")
+                    or "state mismatch"
+                )
+            )
+        self.code = params["code"]
+
     def _get_token(self):
         """https://forge.autodesk.com/en/docs/oauth/v2/reference/http/gettoken-POST/"""  # noqa:E501
         url = "{}/gettoken".format(AUTH_V1_URL)
@@ -194,6 +272,9 @@ class ForgeAuth(ForgeBase):
 
     def _refresh_token(self):
         """https://forge.autodesk.com/en/docs/oauth/v2/reference/http/refreshtoken-POST/"""  # noqa:E501
+        self._get_auth(*self._refresh_token_request())
+
+    def _refresh_token_request(self):
         url = "{}/refreshtoken".format(AUTH_V1_URL)
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         params = {
@@ -203,7 +284,7 @@ class ForgeAuth(ForgeBase):
             "refresh_token": self.refresh_token,
             "scope": " ".join(self.scopes),
         }
-        self._get_auth(url, headers, params)
+        return url, headers, params
 
     # Private Methods
 
@@ -219,11 +300,86 @@ class ForgeAuth(ForgeBase):
             raise AttributeError("Failed to get Bearer Token")
 
     def _get_auth(self, url, headers, params):
+        timestamp = datetime.now()
         data, success = self.session.request(
             "post", url, headers=headers, urlencode=params
         )
+        self._set_token(data, timestamp)
+
+    def _set_token(self, data, timestamp):
+        """Stores a token response requested at timestamp"""
         self.__dict__.update(data)
+        self.timestamp = timestamp
         self._set_auth_header()
+        self._store_token()
+
+    def _token_key(self):
+        """
+        Key of the token in the token store, None when the user the token
+        belongs to is unknown (loopback without a username).
+        """
+        if self.three_legged and not self.username:
+            return None
+        return "|".join(
+            [
+                self.client_id,
+                " ".join(sorted(self.scopes)),
+                self.grant_type if self.three_legged else "client_credentials",
+                (self.three_legged and self.username) or "",
+            ]
+        )
+
+    def _load_token(self):
+        """
+        Uses the stored token if it is valid for more than refresh_margin
+        seconds, otherwise keeps its refresh token (if any) for refresh().
+        """
+        key = self._token_key()
+        if not (self.token_store and key):
+            return False
+        try:
+            token = self.token_store.get(key)
+        except (IOError, OSError, ValueError) as e:
+            self.logger.warning("Failed to read token store: {}".format(e))
+            return False
+        if not token:
+            return False
+
+        try:
+            expires_in = float(token["expires_at"]) - time.time()
+            access_token = token["access_token"]
+            token_type = token["token_type"]
+        except (KeyError, TypeError, ValueError):
+            self.logger.warning("Ignoring malformed token in token store")
+            return False
+
+        if self.three_legged and token.get("refresh_token"):
+            self.refresh_token = token["refresh_token"]
+        if expires_in <= self.refresh_margin:
+            return False
+
+        self.access_token = access_token
+        self.token_type = token_type
+        self.expires_in = int(expires_in)
+        self.timestamp = datetime.now()
+        self._set_auth_header()
+        return True
+
+    def _store_token(self):
+        key = self._token_key()
+        if not (self.token_store and key):
+            return
+        token = {
+            "access_token": self.access_token,
+            "token_type": self.token_type,
+            "refresh_token": getattr(self, "refresh_token", None),
+            "expires_at": time.time()
+            + (self.expires_at - datetime.now()).total_seconds(),
+        }
+        try:
+            self.token_store.set(key, token)
+        except (IOError, OSError, ValueError) as e:
+            self.logger.warning("Failed to write token store: {}".format(e))
 
     def _get_auth2(self):
         """https://forge.autodesk.com/en/docs/oauth/v2/tutorials/get-2-legged-token/"""  # noqa:E501
@@ -238,18 +394,40 @@ class ForgeAuth(ForgeBase):
         https://forge.autodesk.com/en/docs/oauth/v2/tutorials/get-3-legged-token-implicit/
         """  # noqa:E501
         if self.grant_type == "implicit":
+            self.timestamp = datetime.now()
             self._authorize()
             self.refresh_token = None
             self._set_auth_header()
+            self._store_token()
 
         elif self.grant_type == "authorization_code":
-            self._authorize(response_type="code")
+            if self.loopback:
+                self._authorize_loopback()
+            else:
+                self._authorize(response_type="code")
             self._get_token()
 
+    def _refresh_request(self):
+        """
+        url, headers and params of the request refresh() sends, None when
+        refreshing goes through the browser.
+        """
+        if not self.three_legged:
+            return self._authenticate_request()
+        elif self.refresh_token:
+            return self._refresh_token_request()
+
     # Public Methods
 
+    @property
+    def expires_at(self):
+        return self.timestamp + timedelta(seconds=int(self.expires_in))
+
     def refresh(self):
         """Refresh Token"""
+        # another process may have refreshed it already
+        if self._load_token():
+            return
         if self.three_legged:
             if self.refresh_token:
                 self._refresh_token()
@@ -10,7 +10,6 @@ import urllib
 
 from datetime import date, timedelta
 
-from .session import Session
 from .urls import BASE_URL
 from .utils import Logger  # noqa:F401
 
@@ -21,12 +20,31 @@ if sys.version_info >= (3, 7):
     semaphore = BoundedSemaphore(value=50)
 
 
+class _LazySession(object):
+    """
+    Builds the Session shared by every ForgeBase the first time it is
+    accessed (importing requests is slow) and replaces itself with it.
+    """
+
+    def __init__(self):
+        self.log_level = None
+
+    def __get__(self, instance, owner):
+        from .session import Session
+
+        session = Session(base_url=BASE_URL)
+        if self.log_level:
+            Logger.set_level(session.logger, self.log_level)
+        ForgeBase.session = session
+        return session
+
+
 class ForgeBase(object):
     """
     Superclass for all api model classes in this Forge Python Wrapper.
     """
 
-    session = Session(base_url=BASE_URL)
+    session = _LazySession()
     TODAY = date.today()
     TODAY_STRING = TODAY.strftime("%Y-%m-%d")
     IN_ONE_YEAR_STRING = (TODAY + timedelta(365)).strftime("%Y-%m-%d")
@@ -218,8 +236,11 @@ class ForgeBase(object):
             self._log_level = log_level
             if getattr(self, "logger", None):
                 Logger.set_level(self.logger, log_level)
-            if getattr(self, "session", None):
-                Logger.set_level(ForgeBase.session.logger, log_level)
+            session = ForgeBase.__dict__["session"]
+            if isinstance(session, _LazySession):
+                session.log_level = log_level
+            else:
+                Logger.set_level(session.logger, log_level)
 
     @property
     def x_user_id(self):
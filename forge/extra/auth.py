@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""Async Token Refresh"""
+
+from __future__ import absolute_import
+
+import asyncio
+
+from datetime import datetime
+
+from ..base import Logger
+from ..utils import loads
+
+logger = Logger.start(__name__)
+
+
+class TokenRefresher(object):
+    """
+    Keeps the token of a ForgeAuth valid from the event loop.
+
+    Two-legged and refresh token grants are posted with aiohttp; grants
+    that go through the browser, and reads and writes of the token store,
+    run in the default executor. Callers that find the token expiring
+    share a single in-flight refresh. Within auth.refresh_margin seconds
+    of expiry the refresh starts without the caller waiting for it, and
+    with start() a background task refreshes the token before any caller
+    notices.
+    """
+
+    def __init__(self, auth, session, on_refresh=None):
+        """
+        Args:
+            auth (``ForgeAuth``): Holds the token and the client credentials.
+            session (``aiohttp.ClientSession``): Session the token requests are sent with.
+
+        Kwargs:
+            on_refresh (``callable``, default=None): Called with auth after every refresh.
+        """  # noqa: E501
+        self.auth = auth
+        self.session = session
+        self.on_refresh = on_refresh
+        self.logger = logger
+        self._refreshing = None
+        self._background = None
+
+    def seconds_left(self):
+        """Seconds until the token expires"""
+        return (self.auth.expires_at - datetime.now()).total_seconds()
+
+    async def ensure(self):
+        """
+        Returns at once while the token is valid for more than the margin,
+        starts a refresh within the margin and waits for it once expired.
+        """
+        seconds_left = self.seconds_left()
+        if seconds_left <= 1:
+            await self.refresh()
+        elif seconds_left <= self.auth.refresh_margin:
+            self._start()
+
+    def refresh(self):
+        """Returns the in-flight refresh, starting one if there is none"""
+        # a cancelled caller must not cancel the refresh others wait for
+        return asyncio.shield(self._start())
+
+    def _start(self):
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(self._refreshed)
+        return self._refreshing
+
+    def _refreshed(self, future):
+        self._refreshing = None
+        if not future.cancelled() and future.exception():
+            self.logger.warning(
+                "Failed to refresh token: {}".format(future.exception())
+            )
+
+    async def _refresh(self):
+        # another process may have stored a newer token
+        loop = asyncio.get_event_loop()
+        if not await loop.run_in_executor(None, self.auth._load_token):
+            await self._request_token()
+        self.logger.debug(
+            "Refreshed token, expires at {}".format(self.auth.expires_at)
+        )
+        if self.on_refresh:
+            self.on_refresh(self.auth)
+
+    async def _request_token(self):
+        request = self.auth._refresh_request()
+        if request is None:
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.auth.refresh
+            )
+            return
+
+        timestamp = datetime.now()
+        url, headers, params = request
+        async with self.session.post(url, headers=headers, data=params) as res:
+            data = await res.json(loads=loads, content_type=None)
+        if res.status != 200 or "access_token" not in data:
+            raise AttributeError(
+                "Failed to get Bearer Token - {}: {}".format(res.status, data)
+            )
+        await asyncio.get_event_loop().run_in_executor(
+            None, self.auth._set_token, data, timestamp
+        )
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(
+                max(1, self.seconds_left() - self.auth.refresh_margin)
+            )
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # logged by _refreshed, callers still refresh on demand
+                await asyncio.sleep(self.auth.refresh_margin / 4.0)
+
+    def start(self):
+        """Refreshes the token in the background until stop()"""
+        if self._background is None:
+            self._background = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        for task in (self._background, self._refreshing):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._background = None
@@ -6,19 +6,38 @@ from __future__ import absolute_import
 
 from datetime import datetime
 from functools import wraps
+from inspect import isasyncgenfunction
 
 
 def _async_validate_token(func):
     """DM & HQ"""
 
-    @wraps(func)
-    async def inner(self, *args, **kwargs):
+    async def validate(self):
+        tokens = getattr(self.app, "tokens", None)
+        if tokens:
+            await tokens.ensure()
+            return
+
         now = datetime.now()
         timedelta = int((now - self.app.auth.timestamp).total_seconds()) + 1
         if timedelta >= int(self.app.auth.expires_in):
             self.app.auth.timestamp = now
             self.app.auth.refresh()
-            self.app._session.headers = self.app.auth.header
+            self.app._session.headers.update(self.app.auth.header)
+
+    if isasyncgenfunction(func):
+
+        @wraps(func)
+        async def inner_gen(self, *args, **kwargs):
+            await validate(self)
+            async for result in func(self, *args, **kwargs):
+                yield result
+
+        return inner_gen
+
+    @wraps(func)
+    async def inner(self, *args, **kwargs):
+        await validate(self)
         return await func(self, *args, **kwargs)
 
     return inner
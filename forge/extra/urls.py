@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
 
+import os
 import sys
 
 """
@@ -8,7 +9,10 @@ Forge APIs urls
 https://forge.autodesk.com/en/docs/
 """
 
-BASE_URL = "https://developer.api.autodesk.com"
+# FORGE_BASE_URL points the package at another server, e.g. a local mock
+BASE_URL = os.environ.get(
+    "FORGE_BASE_URL", "https://developer.api.autodesk.com"
+).rstrip("/")
 
 # Authentication (OAuth)
 # https://forge.autodesk.com/en/docs/oauth/v2/developers_guide/basics/
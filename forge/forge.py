@@ -4,10 +4,14 @@
 
 from __future__ import absolute_import
 
+import json
 import os
+import sys
 import time
 
-from tqdm import tqdm
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
 
 from .api import ForgeApi
 from .auth import ForgeAuth
@@ -21,7 +25,7 @@ from .decorators import (
     _validate_project,
     _validate_x_user_id,
 )
-from .utils import pretty_print
+from .utils import TransferError, loads, pretty_print
 from .urls import OSS_V2_URL
 
 logger = Logger.start(__name__)
@@ -42,10 +46,22 @@ class ForgeApp(ForgeBase):
         username=None,
         password=None,
         log_level="info",
+        cache=None,
+        token_store=None,
+        loopback=False,
+        opener=None,
     ):
-        """"""
+        """
+        Kwargs:
+            cache (``MetadataCache``, default=None): Cache used to revalidate GET responses with ETag / Last-Modified. It is set on the Session shared by every ForgeApp. Disabled by default.
+            token_store (``FileTokenStore``, default=None): Where tokens are shared with other processes and reused from. Defaults to a FileTokenStore, False disables it.
+            loopback (``bool``, default=False): Receive the three-legged authorization code on a local redirect_uri instead of signing in with a headless browser. See ForgeAuth.
+            opener (``callable``, default=webbrowser.open): Called with the URL the user signs in at when loopback is True.
+        """  # noqa: E501
         self.logger = logger
         self.log_level = log_level
+        if cache is not None:
+            ForgeBase.session.cache = cache
 
         self.auth = ForgeAuth(
             client_id=client_id,
@@ -57,6 +73,9 @@ class ForgeApp(ForgeBase):
             username=username,
             password=password,
             log_level=log_level,
+            token_store=token_store,
+            loopback=loopback,
+            opener=opener,
         )
 
         self.api = ForgeApi(auth=self.auth, log_level=self.log_level)
@@ -94,11 +113,12 @@ class ForgeApp(ForgeBase):
         self.hubs = self.api.dm.get_hubs().get("data")
 
     @_validate_hub
-    def get_projects(self, source="all"):
+    def get_projects(self, source="all", retain="full"):
         """
         Get all projects and sets the self.projects attribute
         Kwargs:
             source (``string``, default="all"): "all", "admin" or "docs"
+            retain (``string``, default="full"): Project.retain of the projects: "full", "minimal" or "none"
         Returns:
             {
                 id_1: {"docs": {}, "admin": {}},
@@ -189,6 +209,9 @@ class ForgeApp(ForgeBase):
                     "Failed to get projects. The BIM 360 API only supports 2-legged access tokens"  # noqa:E501
                 )
 
+        for project in self.projects:
+            project.retain = retain
+
     @_validate_hub
     def get_project(self, project_id):
         if project_id[:2] not in self.NAMESPACES:
@@ -309,6 +332,8 @@ class ForgeApp(ForgeBase):
 
 
 class Project(ForgeBase):
+    RETAIN = ("full", "minimal", "none")
+
     def __init__(
         self,
         name,
@@ -317,6 +342,7 @@ class Project(ForgeBase):
         data=None,
         x_user_id=None,
         include_hidden=False,
+        retain="full",
     ):
         self.name = name
         self.id = {"hq": project_id}
@@ -327,6 +353,9 @@ class Project(ForgeBase):
         if x_user_id:
             self.x_user_id = x_user_id
         self.include_hidden = include_hidden
+        self.retain = retain
+        # contents by id and path, and lists of contents by name
+        self._indexes = {"id": {}, "path": {}, "name": {}}
 
     def __repr__(self):
         return "<Project - Name: {} - ID: {} at {}>".format(
@@ -367,6 +396,24 @@ class Project(ForgeBase):
             elif "attributes" in data:
                 self._data["docs"] = data
 
+    @property
+    def retain(self):
+        """
+        How much of each folder, item and version payload Content.data
+        keeps: "full", "minimal" (Content.MINIMAL_ATTRIBUTES) or "none".
+        Without payloads, refresh_contents can't tell which folders
+        changed and lists them all again.
+        """
+        return self._retain
+
+    @retain.setter
+    def retain(self, retain):
+        if retain not in Project.RETAIN:
+            raise ValueError(
+                "Project.retain must be one of {}".format(Project.RETAIN)
+            )
+        self._retain = retain
+
     @_validate_app
     @_validate_bim360_hub
     def update(self, name=None, status=None):
@@ -409,6 +456,8 @@ class Project(ForgeBase):
             if count > 6:
                 break
 
+        for folder in getattr(self, "top_folders", None) or []:
+            self._unindex(folder)
         self.top_folders = [
             Folder(
                 folder["attributes"]["name"],
@@ -439,13 +488,52 @@ class Project(ForgeBase):
 
         return self.top_folders
 
-    def get_contents(self):
+    def get_contents(self, retain=None):
+        """
+        Kwargs:
+            retain (``str``, default=None): Sets Project.retain before listing: "full", "minimal" or "none".
+        """  # noqa: E501
+        if retain:
+            self.retain = retain
         if not getattr(self, "top_folders", None):
             self.get_top_folders()
 
         for folder in self.top_folders:
             folder.get_contents()
 
+    def refresh_contents(self, snapshot=None):
+        """
+        Updates the folder tree in place, re-listing only the folders
+        whose lastModifiedTime moved since they were last listed. Gets
+        the whole tree if it was never fetched.
+
+        Kwargs:
+            snapshot (``dict``, default=None): Folder id to lastModifiedTime to compare against. Defaults to the current tree (see Project.snapshot).
+
+        Returns:
+            changed (``list``): The folders that were re-listed.
+        """  # noqa: E501
+        if not getattr(self, "top_folders", None):
+            self.get_contents()
+            return list(self.top_folders)
+
+        if snapshot is None:
+            snapshot = self.snapshot()
+        changed = []
+        for folder in self.top_folders:
+            changed.extend(folder.refresh(snapshot=snapshot))
+        return changed
+
+    def snapshot(self):
+        """
+        Returns:
+            snapshot (``dict``): lastModifiedTime of every folder, by id. It can be stored and given to refresh_contents later.
+        """  # noqa: E501
+        snapshot = {}
+        for folder in getattr(self, "top_folders", None) or []:
+            snapshot.update(folder.snapshot())
+        return snapshot
+
     @_validate_app
     @_validate_bim360_hub
     def get_roles(self):
@@ -490,23 +578,61 @@ class Project(ForgeBase):
 
     def find(self, value, key="name"):
         """key = name or id or path"""
-        if key.lower() not in ("name", "id", "path"):
+        found = self.find_all(value, key=key)
+        if found:
+            return found[0]
+
+        self.app.logger.debug(
+            "{}: {} not found in '{}'".format(key, value, self.name)
+        )
+
+    def find_all(self, value, key="name"):
+        """
+        Looks value up in the indexes kept as the tree is built.
+
+        Returns:
+            contents (``list``): The folders and items whose key (name, id or path) is value.
+        """  # noqa: E501
+        key = key.lower()
+        if key not in ("name", "id", "path"):
             raise ValueError()
 
         if not getattr(self, "top_folders", None):
             self.get_contents()
 
-        for folder in self.top_folders:
-            if getattr(folder, key, None) == value:
-                return folder
-            else:
-                for content, _ in folder._iter_contents():
-                    if getattr(content, key, None) == value:
-                        return content
-
-        self.app.logger.debug(
-            "{}: {} not found in '{}'".format(key, value, self.name)
-        )
+        found = self._indexes[key].get(value)
+        if key == "name":
+            return list(found or [])
+        return [found] if found else []
+
+    def _index(self, content, recursive=False):
+        """Adds content and, if recursive, everything below it."""
+        contents = [content]
+        while contents:
+            content = contents.pop()
+            if recursive and content.type == "folders":
+                contents.extend(content.contents)
+            self._indexes["id"][content.id] = content
+            self._indexes["path"][content.path] = content
+            self._indexes["name"].setdefault(content.name, []).append(content)
+
+    def _unindex(self, content, recursive=True):
+        """Removes content and, if recursive, everything below it."""
+        contents = [content]
+        while contents:
+            content = contents.pop()
+            if recursive and content.type == "folders":
+                contents.extend(content.contents)
+            for key in ("id", "path"):
+                if self._indexes[key].get(getattr(content, key)) is content:
+                    del self._indexes[key][getattr(content, key)]
+            same_name = self._indexes["name"].get(content.name, [])
+            for i, other in enumerate(same_name):
+                if other is content:
+                    del same_name[i]
+                    break
+            if not same_name:
+                self._indexes["name"].pop(content.name, None)
 
     def walk(self):
         if not getattr(self, "top_folders", None):
@@ -518,6 +644,20 @@ class Project(ForgeBase):
 
 
 class Content(object):
+    # a crawled project holds one instance per folder, item and version
+    __slots__ = (
+        "name",
+        "id",
+        "_extension_type",
+        "deleted",
+        "_data",
+        "_last_modified",
+        "_project",
+        "_host",
+    )
+    # attributes Content.data keeps when Project.retain is "minimal"
+    MINIMAL_ATTRIBUTES = ("name", "displayName", "lastModifiedTime", "hidden")
+
     def __init__(
         self,
         name,
@@ -530,13 +670,75 @@ class Content(object):
         self.name = name
         self.id = content_id
         self.extension_type = extension_type
-        self.data = data
-        self.path = "/{}".format(self.name)
         if project:
             self.project = project
         if host:
             self.host = host
-            self.path = "{}{}".format(host.path, self.path)
+        self.data = data
+        if project:
+            project._index(self)
+
+    @property
+    def path(self):
+        return "{}/{}".format(self.host.path if self.host else "", self.name)
+
+    @property
+    def data(self):
+        """
+        The JSON:API payload of the content, trimmed to what
+        Project.retain keeps. It is stored as a compact JSON string until
+        it is first read, then kept parsed so changes made to it stay;
+        Content.get_data fetches it in full.
+        """
+        if isinstance(self._data, str):
+            self._data = loads(self._data)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        retain = self.project.retain if self.project else "full"
+        self._last_modified = None
+        if isinstance(data, dict):
+            if retain == "none":
+                data = None
+            else:
+                # read on every refresh, without parsing the payload
+                self._last_modified = (data.get("attributes") or {}).get(
+                    "lastModifiedTime"
+                )
+                if retain == "minimal":
+                    data = self._minimal(data)
+                data = json.dumps(data, separators=(",", ":"))
+        self._data = data
+
+    def _minimal(self, data):
+        attributes = data.get("attributes") or {}
+        return {
+            "type": data.get("type"),
+            "id": data.get("id"),
+            "attributes": {
+                key: attributes[key]
+                for key in self.MINIMAL_ATTRIBUTES
+                if key in attributes
+            },
+        }
+
+    @_validate_project
+    def get_data(self):
+        """
+        Fetches the full payload of the content, whatever Project.retain
+        kept in Content.data.
+
+        Returns:
+            data (``dict``): The JSON:API resource of the folder, item or version.
+        """  # noqa: E501
+        # get_folder, get_item or get_version
+        get = getattr(self.project.app.api.dm, "get_" + self.type[:-1])
+        data = get(
+            self.project.id["dm"], self.id, x_user_id=self.project.x_user_id
+        )
+        if isinstance(data, dict) and "data" in data:
+            return data["data"]
 
     @property
     def extension_type(self):
@@ -545,6 +747,8 @@ class Content(object):
 
     @extension_type.setter
     def extension_type(self, extension_type):
+        if isinstance(extension_type, str):
+            extension_type = sys.intern(extension_type)
         self._extension_type = extension_type
         self.deleted = extension_type in (
             ForgeApp.TYPES[ForgeApp.NAMESPACES["a."]]["versions"]["Deleted"],
@@ -583,12 +787,48 @@ class Content(object):
         else:
             self._host = host
 
+    @property
+    def last_modified(self):
+        return self._last_modified
+
+    def _update(self, data):
+        """
+        Takes the payload of a new listing. Items whose lastModifiedTime
+        moved forget their metadata and versions so they are fetched
+        again.
+        """
+        attributes = data.get("attributes") or {}
+        is_modified = self.last_modified != attributes.get("lastModifiedTime")
+        # TODO - name or displayName
+        name = (
+            attributes.get("displayName")
+            if self.type == "items"
+            else attributes.get("name")
+        ) or self.name
+        # paths below a renamed folder change with it
+        recursive = name != self.name and self.type == "folders"
+        if self.project:
+            self.project._unindex(self, recursive=recursive)
+        self.data = data
+        self.name = name
+        self.extension_type = (attributes.get("extension") or {}).get(
+            "type"
+        ) or self.extension_type
+        if self.project:
+            self.project._index(self, recursive=recursive)
+        if is_modified and self.type == "items":
+            self.versions = []
+            self.metadata = None
+
     def _unpack_storage_id(self, storage_id):
         """returns bucket_key, object_name"""
         return storage_id.split(":")[-1].split("/")
 
 
 class Folder(Content):
+    __slots__ = ("contents",)
+    type = "folders"
+
     def __init__(self, *args, **kwargs):
         """
         Args:
@@ -601,7 +841,6 @@ class Folder(Content):
             host (``Folder``): The host folder.
         """
         super(Folder, self).__init__(*args, **kwargs)
-        self.type = "folders"
         self.contents = []
 
     def _iter_contents(self, level=0):
@@ -614,7 +853,14 @@ class Folder(Content):
                     yield sub_content, sub_level
 
     @_validate_project
-    def get_contents(self, is_recursive=True):
+    def get_contents(self, is_recursive=True, retain=None):
+        """
+        Kwargs:
+            is_recursive (``bool``, default=True): Also get the contents of every sub folder.
+            retain (``str``, default=None): Sets Project.retain before listing: "full", "minimal" or "none".
+        """  # noqa: E501
+        if retain:
+            self.project.retain = retain
         contents = self.project.app.api.dm.get_folder_contents(
             self.project.id["dm"],
             self.id,
@@ -622,9 +868,16 @@ class Folder(Content):
             x_user_id=self.project.x_user_id,
         )
 
+        # keep the objects of contents that are still there
+        existing = {content.id: content for content in self.contents}
         self.contents = []
         for content in contents:
-            if content["type"] == "items":
+            current = existing.get(content["id"])
+            if current is not None and current.type == content["type"]:
+                del existing[content["id"]]
+                current._update(content)
+                self.contents.append(current)
+            elif content["type"] == "items":
                 self.contents.append(
                     Item(
                         # TODO - name or displayName
@@ -651,11 +904,69 @@ class Folder(Content):
                         host=self,
                     )
                 )
-                if is_recursive:
-                    self.contents[-1].get_contents()
+            else:
+                continue
+
+            if is_recursive and self.contents[-1].type == "folders":
+                self.contents[-1].get_contents()
+
+        for content in existing.values():
+            self.project._unindex(content)
 
         return self.contents
 
+    @_validate_project
+    def refresh(self, snapshot=None, is_fresh=False):
+        """
+        Updates this folder's tree in place, re-listing only the folders
+        whose lastModifiedTime moved since they were last listed.
+
+        Kwargs:
+            snapshot (``dict``, default=None): Folder id to lastModifiedTime to compare against. Defaults to the current tree (see Folder.snapshot).
+            is_fresh (``bool``, default=False): Folder.data already comes from a new listing of the parent.
+
+        Returns:
+            changed (``list``): The folders that were re-listed.
+        """  # noqa: E501
+        if snapshot is None:
+            snapshot = self.snapshot()
+
+        if not is_fresh:
+            data = self.project.app.api.dm.get_folder(
+                self.project.id["dm"],
+                self.id,
+                x_user_id=self.project.x_user_id,
+            )
+            if isinstance(data, dict) and "data" in data:
+                self._update(data["data"])
+
+        changed = []
+        is_modified = (
+            self.last_modified is None
+            or snapshot.get(self.id) != self.last_modified
+        )
+        if is_modified:
+            self.get_contents(is_recursive=False)
+            changed.append(self)
+
+        for content in self.contents:
+            if content.type == "folders":
+                changed.extend(
+                    content.refresh(snapshot=snapshot, is_fresh=is_modified)
+                )
+        return changed
+
+    def snapshot(self):
+        """
+        Returns:
+            snapshot (``dict``): lastModifiedTime of this folder and every sub folder, by id.
+        """  # noqa: E501
+        snapshot = {self.id: self.last_modified}
+        for content, _ in self._iter_contents():
+            if content.type == "folders":
+                snapshot[content.id] = content.last_modified
+        return snapshot
+
     @_validate_project
     def add_sub_folder(self, folder_name):
         """"""
@@ -717,8 +1028,12 @@ class Folder(Content):
         ).get("data")
 
     @_validate_project
-    def _upload_file(self, storage_id, obj_bytes):
+    def _upload_file(self, storage_id, obj_bytes=None, filepath=None):
         bucket_key, object_name = self._unpack_storage_id(storage_id)
+        if filepath:
+            return self.project.app.api.dm.upload_object(
+                bucket_key, object_name, filepath
+            )
         return self.project.app.api.dm.put_object(
             bucket_key, object_name, obj_bytes
         )
@@ -731,15 +1046,21 @@ class Folder(Content):
         obj_bytes=None,
         item_extension_type=None,
         version_extension_type=None,
+        filepath=None,
     ):
         """
         name include extension
+
+        filepath : path of a local file to upload in resumable chunks
+        instead of obj_bytes
         """
-        if not storage_id and obj_bytes:
+        if not storage_id and (obj_bytes or filepath):
             storage_id = self._add_storage(name).get("id")
 
-        if obj_bytes:
-            self._upload_file(storage_id, obj_bytes)
+        if storage_id and (obj_bytes or filepath):
+            self._upload_file(
+                storage_id, obj_bytes=obj_bytes, filepath=filepath
+            )
 
         if not storage_id:
             return
@@ -755,14 +1076,19 @@ class Folder(Content):
         )
 
         if item.get("data"):
-            return Item(
-                item["data"]["attributes"]["displayName"],
-                item["data"]["id"],
-                extension_type=item["data"]["attributes"]["extension"]["type"],
-                data=item["data"],
-                project=self.project,
-                host=self,
+            self.contents.append(
+                Item(
+                    item["data"]["attributes"]["displayName"],
+                    item["data"]["id"],
+                    extension_type=item["data"]["attributes"]["extension"][
+                        "type"
+                    ],
+                    data=item["data"],
+                    project=self.project,
+                    host=self,
+                )
             )
+            return self.contents[-1]
 
     @_validate_project
     def copy_item(self, original_item):
@@ -783,35 +1109,62 @@ class Folder(Content):
         )
 
         if item.get("data"):
-            return Item(
-                item["data"]["attributes"]["displayName"],
-                item["data"]["id"],
-                extension_type=item["data"]["attributes"]["extension"]["type"],
-                data=item,
-                project=self.project,
-                host=self,
+            self.contents.append(
+                Item(
+                    item["data"]["attributes"]["displayName"],
+                    item["data"]["id"],
+                    extension_type=item["data"]["attributes"]["extension"][
+                        "type"
+                    ],
+                    data=item["data"],
+                    project=self.project,
+                    host=self,
+                )
             )
+            return self.contents[-1]
         else:
             return item
 
     def find(self, value, key="name", shallow=True):
-        """key = name or id or path"""
-        if key.lower() not in ("name", "id", "path"):
+        """
+        key = name or id or path
+
+        Looks value up in the indexes of the project and keeps the first
+        content held by this folder, or anywhere below it unless shallow.
+        """
+        key = key.lower()
+        if key not in ("name", "id", "path"):
             raise ValueError()
 
         if not self.contents:
             self.get_contents()
 
-        for content, level in self._iter_contents():
-            if shallow and level != 0:
-                continue
-            if getattr(content, key, None) == value:
+        indexes = self.project._indexes
+        if key == "name" and shallow:
+            found = [indexes["path"].get("{}/{}".format(self.path, value))]
+        elif key == "name":
+            found = indexes["name"].get(value) or []
+        else:
+            found = [indexes[key].get(value)]
+        for content in found:
+            if content is not None and self._holds(content, shallow):
                 return content
 
         self.project.app.logger.debug(
             "{}: {} not found in '{}'".format(key, value, self.name)
         )
 
+    def _holds(self, content, shallow=True):
+        """Whether content is in this folder, or below it unless shallow"""
+        host = content.host
+        while host is not None:
+            if host is self:
+                return True
+            if shallow:
+                return False
+            host = host.host
+        return False
+
     def walk(self, level=0):
         if not self.contents:
             self.get_contents()
@@ -821,6 +1174,20 @@ class Folder(Content):
 
 
 class Item(Content):
+    __slots__ = (
+        "versions",
+        "storage_id",
+        "metadata",
+        "hidden",
+        "bucket_key",
+        "object_name",
+        "storage_size",
+        "bytes",
+        "filepath",
+        "_version_indices_by_number",
+    )
+    type = "items"
+
     def __init__(self, *args, **kwargs):
         """
         Args:
@@ -833,7 +1200,6 @@ class Item(Content):
             host (``Folder``): The host folder.
         """
         super(Item, self).__init__(*args, **kwargs)
-        self.type = "items"
         self.versions = []
         self.storage_id = None
 
@@ -862,6 +1228,13 @@ class Item(Content):
             # no storage key
             pass
 
+        try:
+            self.storage_size = self.metadata["included"][0]["attributes"][
+                "storageSize"
+            ]
+        except (KeyError, TypeError):
+            self.storage_size = None
+
     @_validate_project
     @_validate_host
     def add_version(
@@ -870,15 +1243,21 @@ class Item(Content):
         storage_id=None,
         obj_bytes=None,
         version_extension_type=None,
+        filepath=None,
     ):
         """
         name include extension
+
+        filepath : path of a local file to upload in resumable chunks
+        instead of obj_bytes
         """
-        if not storage_id and obj_bytes:
+        if not storage_id and (obj_bytes or filepath):
             storage_id = self.host._add_storage(name).get("id")
 
-        if obj_bytes:
-            self.host._upload_file(storage_id, obj_bytes)
+        if storage_id and (obj_bytes or filepath):
+            self.host._upload_file(
+                storage_id, obj_bytes=obj_bytes, filepath=filepath
+            )
 
         if not storage_id:
             return
@@ -905,6 +1284,7 @@ class Item(Content):
                     data=version["data"],
                 )
             )
+            return self.versions[-1]
         else:
             pretty_print(version)
 
@@ -965,7 +1345,17 @@ class Item(Content):
             )
 
     @_validate_project
-    def download(self, save=False, location=None):
+    def download(self, save=False, location=None, writable=None):
+        """
+        Downloads the tip version. With save and location the object is
+        streamed to '<location>/<name>'; with a writable it is streamed
+        into it. Otherwise its content is kept in Item.bytes.
+
+        Kwargs:
+            save (``bool``, default=False): Write the object to location.
+            location (``str``, default=None): Directory to save the file in.
+            writable (``object``, default=None): Object with a write(bytes) method the content is streamed to.
+        """  # noqa: E501
         if not getattr(self, "metadata", None):
             self.get_metadata()
 
@@ -979,6 +1369,16 @@ class Item(Content):
             return
 
         self.project.app.logger.info("Downloading Item {}".format(self.name))
+        if writable is not None:
+            self._stream(writable)
+            return
+
+        if save and location and os.path.isdir(location):
+            self.filepath = os.path.join(location, self.name)
+            with open(self.filepath, "wb") as fp:
+                self._stream(fp)
+            return
+
         self.bytes = self.project.app.api.dm.get_object(
             self.bucket_key, self.object_name
         )
@@ -987,11 +1387,28 @@ class Item(Content):
                 len(self.bytes) / 1024 / 1024
             )
         )
-        if save and location and os.path.isdir(location):
-            self.filepath = os.path.join(location, self.name)
-            with open(self.filepath, "wb") as fp:
-                fp.write(self.bytes)
-            self.bytes = None
+
+    def _stream(self, writable):
+        from tqdm import tqdm
+
+        with tqdm(
+            total=getattr(self, "storage_size", None),
+            unit="iB",
+            unit_scale=True,
+            desc="Downloading - {}".format(self.name),
+        ) as pbar:
+            written = self.project.app.api.dm.stream_object(
+                self.bucket_key,
+                self.object_name,
+                writable,
+                progress=pbar.update,
+            )
+        self.bytes = None
+        self.project.app.logger.info(
+            "Download Finished - file size: {0:0.1f} MB".format(
+                written / 1024 / 1024
+            )
+        )
 
     def load(self):
         if getattr(self, "filepath", None):
@@ -1000,6 +1417,19 @@ class Item(Content):
 
 
 class Version(Content):
+    __slots__ = (
+        "number",
+        "_item",
+        "metadata",
+        "storage_id",
+        "bucket_key",
+        "object_name",
+        "file_size",
+        "details",
+        "storage_size",
+    )
+    type = "versions"
+
     def __init__(
         self,
         name,
@@ -1013,9 +1443,14 @@ class Version(Content):
         self.number = number
         self.id = version_id
         self.extension_type = extension_type
-        self.data = data
         if item:
             self.item = item
+        self.data = data
+
+    @property
+    def project(self):
+        if self.item:
+            return self.item.project
 
     @property
     def item(self):
@@ -1091,10 +1526,22 @@ class Version(Content):
         chunk_size=100000000,
         force_create=False,
         remote=None,
+        max_in_flight=4,
+        max_memory=None,
+        journal=None,
     ):
         """
         force_create to force create an item if item is not in target_host
 
+        max_in_flight : number of chunks copied at once
+        max_memory : cap in bytes on the chunks held at once
+        journal : TransferJournal checkpointing local transfers, so an
+        interrupted transfer into the same target_host resumes with the
+        same storage and only sends the missing chunks
+
+        A local transfer raises TransferError, with the byte range of the
+        chunk that failed, when a chunk cannot be copied.
+
         remote : None or dict
         {
             post_url: "url"
@@ -1136,6 +1583,8 @@ class Version(Content):
                         self.number, self.name
                     )
                 )
+                if journal:
+                    journal.finish(self.id)
                 return
             elif len(target_item.versions) != self.number - 1:
                 self.item.project.app.logger.warning(
@@ -1145,8 +1594,34 @@ class Version(Content):
                 )
                 return
 
-        # TODO - name or displayName
-        tg_storage_id = target_host._add_storage(self.name).get("id")
+        entry = journal.get(self.id) if journal and not remote else None
+        # an upload into another folder is not resumed here
+        if (
+            entry
+            and entry["target_id"] == target_host.id
+            and entry["total_size"] == self.storage_size
+        ):
+            tg_storage_id = entry["storage_id"]
+            session_id = entry["session_id"]
+            chunk_size = entry["chunk_size"]
+            self.item.project.app.logger.info(
+                "Resuming transfer of: '{}' - version: {}".format(
+                    self.name, self.number
+                )
+            )
+        else:
+            # TODO - name or displayName
+            tg_storage_id = target_host._add_storage(self.name).get("id")
+            session_id = uuid4().hex
+            if journal and not remote:
+                journal.start(
+                    self.id,
+                    tg_storage_id,
+                    session_id,
+                    chunk_size,
+                    self.storage_size,
+                    target_id=target_host.id,
+                )
 
         self.item.project.app.logger.info(
             "Beginning transfer of: '{}' - version: {}".format(
@@ -1162,7 +1637,15 @@ class Version(Content):
                 chunk_size,
             )
             if remote
-            else self._transfer_local(target_host, tg_storage_id, chunk_size)
+            else self._transfer_local(
+                target_host,
+                tg_storage_id,
+                chunk_size,
+                max_in_flight=max_in_flight,
+                max_memory=max_memory,
+                session_id=session_id,
+                journal=journal,
+            )
         ):
             return
 
@@ -1176,7 +1659,7 @@ class Version(Content):
                 self.item.extension_type,
                 target_host.project.app.hub_type,
             )
-            target_host.add_item(
+            created = target_host.add_item(
                 # TODO - name or displayName
                 self.name,
                 storage_id=tg_storage_id,
@@ -1184,12 +1667,14 @@ class Version(Content):
                 version_extension_type=version_ext_type,
             )
         else:
-            target_item.add_version(
+            created = target_item.add_version(
                 # TODO - name or displayName
                 self.name,
                 storage_id=tg_storage_id,
                 version_extension_type=version_ext_type,
             )
+        if journal and created:
+            journal.finish(self.id)
 
         self.item.project.app.logger.info(
             "Finished transfer of: '{}' version: '{}'".format(
@@ -1209,6 +1694,9 @@ class Version(Content):
     ):
         """ """
         tg_bucket_key, tg_object_name = self._unpack_storage_id(tg_storage_id)
+
+        from tqdm import tqdm
+
         with tqdm(
             total=self.storage_size,
             unit="iB",
@@ -1277,6 +1765,8 @@ class Version(Content):
 
         estimate = self.storage_size / 20000000 + 1
 
+        from tqdm import tqdm
+
         with tqdm(
             total=estimate,
             unit="s",
@@ -1314,42 +1804,88 @@ class Version(Content):
                         )
                         return True
 
-    def _transfer_local(self, target_host, tg_storage_id, chunk_size):
-        """ """
+    def _transfer_local(
+        self,
+        target_host,
+        tg_storage_id,
+        chunk_size,
+        max_in_flight=4,
+        max_memory=None,
+        session_id=None,
+        journal=None,
+    ):
+        """
+        Copies the object chunk by chunk to the target storage. Each of
+        max_in_flight threads downloads a range then uploads it, so range
+        GETs from the source overlap with resumable PUTs to the target
+        while at most max_in_flight chunks (or max_memory bytes) are held.
+        The last chunk is sent once every other chunk has been accepted.
+        Ranges recorded in journal are skipped and new ones recorded.
+
+        Raises TransferError with the range of the first chunk that fails.
+        """
         tg_bucket_key, tg_object_name = self._unpack_storage_id(tg_storage_id)
+        source_dm = self.item.project.app.api.dm
+        target_dm = target_host.project.app.api.dm
+
+        if max_memory:
+            max_in_flight = min(max_in_flight, max_memory // chunk_size)
+        max_in_flight = max(1, max_in_flight)
+
+        session_id = session_id or uuid4().hex
+        byte_ranges = [
+            (lower, min(lower + chunk_size, self.storage_size) - 1)
+            for lower in range(0, self.storage_size, chunk_size)
+        ]
+        entry = journal.get(self.id) if journal else None
+        completed = entry["ranges"] if entry else set()
+        if byte_ranges[-1] in completed:
+            return True
+        pending = [r for r in byte_ranges[:-1] if r not in completed]
+
+        from tqdm import tqdm
+
         with tqdm(
             total=self.storage_size,
+            initial=sum(r[1] - r[0] + 1 for r in completed),
             unit="iB",
             unit_scale=True,
             desc="Transferring - {}".format(self.name),
         ) as pbar:
 
-            data_left = self.storage_size
-            count = 0
-            while data_left > 0:
-                lower = count * chunk_size
-                upper = lower + chunk_size
-                if upper > self.storage_size:
-                    upper = self.storage_size
-                upper -= 1
-
-                chunk = self.item.project.app.api.dm.get_object(
-                    self.bucket_key,
-                    self.object_name,
-                    byte_range=(lower, upper),
-                )
-
-                target_host.project.app.api.dm.put_object_resumable(
-                    tg_bucket_key,
-                    tg_object_name,
-                    chunk,
-                    self.storage_size,
-                    (lower, upper),
-                )
-
-                pbar.update(chunk_size)
-                data_left -= chunk_size
-                count += 1
+            def copy(byte_range):
+                try:
+                    chunk = source_dm.get_object(
+                        self.bucket_key,
+                        self.object_name,
+                        byte_range=byte_range,
+                    )
+                    if not isinstance(chunk, bytes) or len(chunk) != (
+                        byte_range[1] - byte_range[0] + 1
+                    ):
+                        raise ValueError("invalid response")
+                    target_dm.put_object_chunk(
+                        tg_bucket_key,
+                        tg_object_name,
+                        chunk,
+                        self.storage_size,
+                        byte_range,
+                        session_id,
+                    )
+                except Exception as e:
+                    raise TransferError(
+                        "Couldn't copy bytes {}-{} of '{}': {}".format(
+                            *byte_range, self.name, e
+                        ),
+                        byte_range,
+                    ) from e
+                if journal:
+                    journal.complete(self.id, byte_range)
+                pbar.update(len(chunk))
+
+            with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+                list(pool.map(copy, pending))
+            copy(byte_ranges[-1])
             pbar.desc = "Transferred - {}".format(self.name)
 
         return True
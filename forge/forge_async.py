@@ -5,7 +5,9 @@
 from __future__ import absolute_import
 
 import asyncio
+import json
 import os
+import sys
 import time
 
 from aiohttp import (
@@ -15,12 +17,14 @@ from aiohttp import (
     ContentTypeError,
     TCPConnector,
 )
-from json.decoder import JSONDecodeError
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from uuid import uuid4
 
 from .api import ForgeApi
 from .auth import ForgeAuth
 from .base import ForgeBase, Logger
+from .extra.auth import TokenRefresher
 from .decorators import (
     _validate_app,
     _validate_bim360_hub,
@@ -30,7 +34,13 @@ from .decorators import (
     _validate_project,
     _validate_x_user_id,
 )
-from .utils import HTTPSemaphore, pretty_print
+from .utils import (
+    HTTPSemaphore,
+    TransferError,
+    current_limiter,
+    loads,
+    pretty_print,
+)
 from .urls import OSS_V2_URL
 
 logger = Logger.start(__name__)
@@ -38,6 +48,28 @@ logger = Logger.start(__name__)
 # TODO - Error Logging and Level Consistency
 
 
+class _CachedResponse(object):
+    """Stands in for an aiohttp response answered with 304 Not Modified."""
+
+    status = 200
+
+    def __init__(self, response):
+        self.headers = {"Content-Type": response["content_type"]}
+        self._body = response["body"]
+
+    async def json(self, *args, **kwargs):
+        return loads(self._body)
+
+    async def text(self, *args, **kwargs):
+        return self._body
+
+    async def read(self):
+        return self._body.encode("utf-8")
+
+    def release(self):
+        pass
+
+
 class ForgeAppAsync(ForgeBase):
     def __init__(
         self,
@@ -52,10 +84,21 @@ class ForgeAppAsync(ForgeBase):
         username=None,
         password=None,
         log_level="info",
+        cache=None,
+        token_store=None,
+        loopback=False,
+        opener=None,
     ):
-        """"""
+        """
+        Kwargs:
+            cache (``MetadataCache``, default=None): Persistent cache of folder contents, items and versions, also used to revalidate GET responses with ETag / Last-Modified. Disabled by default.
+            token_store (``FileTokenStore``, default=None): Where tokens are shared with other processes and reused from. Defaults to a FileTokenStore, False disables it.
+            loopback (``bool``, default=False): Receive the three-legged authorization code on a local redirect_uri instead of signing in with a headless browser. See ForgeAuth.
+            opener (``callable``, default=webbrowser.open): Called with the URL the user signs in at when loopback is True.
+        """  # noqa: E501
         self.logger = logger
         self.log_level = log_level
+        self.cache = cache
 
         self.auth = ForgeAuth(
             client_id=client_id,
@@ -67,10 +110,15 @@ class ForgeAppAsync(ForgeBase):
             username=username,
             password=password,
             log_level=log_level,
+            token_store=token_store,
+            loopback=loopback,
+            opener=opener,
         )
 
         self.api = ForgeApi(app=self, async_apis=True)
         self.retries = 5
+        # TokenRefresher of the open session
+        self.tokens = None
 
         if hub_id or os.environ.get("FORGE_HUB_ID"):
             self.hub_id = hub_id or os.environ.get("FORGE_HUB_ID")
@@ -81,9 +129,16 @@ class ForgeAppAsync(ForgeBase):
 
         conn_remote = TCPConnector(limit=100)
         self._session_remote = ClientSession(connector=conn_remote)
+
+        self.tokens = TokenRefresher(
+            self.auth, self._session_remote, on_refresh=self._set_auth_header
+        )
+        self.tokens.start()
         return self
 
     async def __aexit__(self, *err):
+        await self.tokens.stop()
+        self.tokens = None
         await self._session.close()
         await self._session_remote.close()
         self._session = None
@@ -92,6 +147,9 @@ class ForgeAppAsync(ForgeBase):
     async def open(self):
         return await self.__aenter__()
 
+    def _set_auth_header(self, auth):
+        self._session.headers.update(auth.header)
+
     async def close(self, *err):
         await self.__aexit__(*err)
 
@@ -103,6 +161,8 @@ class ForgeAppAsync(ForgeBase):
     async def _request(self, *args, session=None, **kwargs):
         if not session:
             session = self._session
+
+        key, cached = self._conditional(kwargs)
         try:
             res = await session.request(*args, **kwargs)
             err = False
@@ -127,7 +187,18 @@ class ForgeAppAsync(ForgeBase):
                     f"Connection/Timeout Error: trying again - {int(count/step)+1} of {self.retries+1} times"  # noqa: E501
                 )
 
-            await asyncio.sleep(0.1 * count ** 2)
+            retry_after = None if err else self._retry_after(res)
+            limiter = current_limiter.get()
+            if limiter and not err and res.status == 429:
+                delay = await limiter.backoff(retry_after)
+            elif retry_after is not None:
+                delay = retry_after
+            else:
+                delay = 0.1 * count ** 2
+
+            if not err:
+                res.release()
+            await asyncio.sleep(delay)
 
             try:
                 res = await session.request(*args, **kwargs)
@@ -146,14 +217,75 @@ class ForgeAppAsync(ForgeBase):
         if res.status in (408, 429, 503, 504):
             # res.raise_for_status()
             pass
+        else:
+            limiter = current_limiter.get()
+            if limiter:
+                limiter.succeeded()
+
+        return await self._revalidated(key, cached, res)
 
+    def _conditional(self, kwargs):
+        """
+        Adds the validators of the cached response to the headers of a
+        GET request. Returns the cache key and the cached response.
+        """
+        headers = kwargs.get("headers") or {}
+        if not (
+            getattr(self, "cache", None)
+            and str(kwargs.get("method")).upper() == "GET"
+            and "Range" not in headers
+        ):
+            return None, None
+
+        key = self.cache.request_key(
+            kwargs.get("url"),
+            params=kwargs.get("params"),
+            x_user_id=headers.get("x-user-id"),
+        )
+        cached, kwargs["headers"] = self.cache.conditional_headers(
+            key, headers
+        )
+        return key, cached
+
+    async def _revalidated(self, key, cached, res):
+        """Serves 304s from the cache and stores new JSON responses"""
+        if not key:
+            return res
+        if res.status == 304 and cached:
+            res.release()
+            return _CachedResponse(cached)
+        if res.status == 200 and self.cache.storable(res.headers):
+            await asyncio.get_event_loop().run_in_executor(
+                None,
+                self.cache.store_response,
+                key,
+                res.headers,
+                await res.text(encoding="utf-8"),
+            )
         return res
 
+    @staticmethod
+    def _retry_after(res):
+        """Seconds to wait according to the Retry-After header, if any"""
+        value = res.headers.get("Retry-After")
+        if not value:
+            return
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            delta = retry_at - datetime.now(timezone.utc)
+            return max(0.0, delta.total_seconds())
+        except (TypeError, ValueError):
+            return
+
     async def _get_data(self, res):
         try:
-            return await res.json(encoding="utf-8")
+            return await res.json(encoding="utf-8", loads=loads)
         # else if raw data
-        except JSONDecodeError:
+        except ValueError:
             return await res.text(encoding="utf-8")
         except ContentTypeError:
             return await res.read()
@@ -187,11 +319,12 @@ class ForgeAppAsync(ForgeBase):
             self.hubs = []
 
     @_validate_hub
-    async def get_projects(self, source="all"):
+    async def get_projects(self, source="all", retain="full"):
         """
         Get all projects and sets the self.projects attribute
         Kwargs:
             source (``string``, default="all"): "all", "admin" or "docs"
+            retain (``string``, default="full"): Project.retain of the projects: "full", "minimal" or "none"
         Returns:
             {
                 id_1: {"docs": {}, "admin": {}},
@@ -285,6 +418,9 @@ class ForgeAppAsync(ForgeBase):
                     "Failed to get projects. The BIM 360 API only supports 2-legged access tokens"  # noqa:E501
                 )
 
+        for project in self.projects:
+            project.retain = retain
+
     @_validate_hub
     async def get_project(self, project_id):
         if project_id[:2] not in self.NAMESPACES:
@@ -408,6 +544,8 @@ class ForgeAppAsync(ForgeBase):
 
 
 class Project(ForgeBase):
+    RETAIN = ("full", "minimal", "none")
+
     def __init__(
         self,
         name,
@@ -416,6 +554,7 @@ class Project(ForgeBase):
         data=None,
         x_user_id=None,
         include_hidden=False,
+        retain="full",
     ):
         self.name = name
         self.id = {"hq": project_id}
@@ -426,6 +565,9 @@ class Project(ForgeBase):
         if x_user_id:
             self.x_user_id = x_user_id
         self.include_hidden = include_hidden
+        self.retain = retain
+        # contents by id and path, and lists of contents by name
+        self._indexes = {"id": {}, "path": {}, "name": {}}
 
     def __repr__(self):
         return "<Project - Name: {} - ID: {} at {}>".format(
@@ -466,6 +608,24 @@ class Project(ForgeBase):
             elif "attributes" in data:
                 self._data["docs"] = data
 
+    @property
+    def retain(self):
+        """
+        How much of each folder, item and version payload Content.data
+        keeps: "full", "minimal" (Content.MINIMAL_ATTRIBUTES) or "none".
+        Without payloads, refresh_contents can't tell which folders
+        changed and lists them all again.
+        """
+        return self._retain
+
+    @retain.setter
+    def retain(self, retain):
+        if retain not in Project.RETAIN:
+            raise ValueError(
+                "Project.retain must be one of {}".format(Project.RETAIN)
+            )
+        self._retain = retain
+
     @_validate_app
     @_validate_bim360_hub
     async def update(self, name=None, status=None):
@@ -510,6 +670,8 @@ class Project(ForgeBase):
             if count > 6:
                 break
 
+        for folder in getattr(self, "top_folders", None) or []:
+            self._unindex(folder)
         self.top_folders = [
             Folder(
                 folder["attributes"]["name"],
@@ -540,12 +702,56 @@ class Project(ForgeBase):
 
         return self.top_folders
 
-    async def get_contents(self):
+    async def get_contents(
+        self, max_depth=None, max_in_flight=None, retain=None
+    ):
+        """
+        Kwargs:
+            max_depth (``int``, default=None): Number of sub folder levels to expand below the top folders. None expands the whole tree.
+            max_in_flight (``int``, default=None): Maximum number of folders listed concurrently.
+            retain (``str``, default=None): Sets Project.retain before listing: "full", "minimal" or "none".
+        """  # noqa: E501
+        if retain:
+            self.retain = retain
         if not getattr(self, "top_folders", None):
             await self.get_top_folders()
 
-        for folder in self.top_folders:
-            await folder.get_contents()
+        await Folder._crawl(
+            self.top_folders, max_depth=max_depth, max_in_flight=max_in_flight
+        )
+
+    async def refresh_contents(self, snapshot=None, max_in_flight=None):
+        """
+        Updates the folder tree in place, re-listing only the folders
+        whose lastModifiedTime moved since they were last listed. Gets
+        the whole tree if it was never fetched.
+
+        Kwargs:
+            snapshot (``dict``, default=None): Folder id to lastModifiedTime to compare against. Defaults to the current tree (see Project.snapshot).
+            max_in_flight (``int``, default=None): Maximum number of folders checked concurrently.
+
+        Returns:
+            changed (``list``): The folders that were re-listed.
+        """  # noqa: E501
+        if not getattr(self, "top_folders", None):
+            await self.get_contents(max_in_flight=max_in_flight)
+            return list(self.top_folders)
+
+        if snapshot is None:
+            snapshot = await self.snapshot()
+        return await Folder._refresh(
+            self.top_folders, snapshot, max_in_flight=max_in_flight
+        )
+
+    async def snapshot(self):
+        """
+        Returns:
+            snapshot (``dict``): lastModifiedTime of every folder, by id. It can be stored and given to refresh_contents later.
+        """  # noqa: E501
+        snapshot = {}
+        for folder in getattr(self, "top_folders", None) or []:
+            snapshot.update(await folder.snapshot())
+        return snapshot
 
     @_validate_app
     @_validate_bim360_hub
@@ -591,23 +797,61 @@ class Project(ForgeBase):
 
     async def find(self, value, key="name"):
         """key = name or id or path"""
-        if key.lower() not in ("name", "id", "path"):
+        found = await self.find_all(value, key=key)
+        if found:
+            return found[0]
+
+        self.app.logger.debug(
+            "{}: {} not found in '{}'".format(key, value, self.name)
+        )
+
+    async def find_all(self, value, key="name"):
+        """
+        Looks value up in the indexes kept as the tree is built.
+
+        Returns:
+            contents (``list``): The folders and items whose key (name, id or path) is value.
+        """  # noqa: E501
+        key = key.lower()
+        if key not in ("name", "id", "path"):
             raise ValueError()
 
         if not getattr(self, "top_folders", None):
             await self.get_contents()
 
-        for folder in self.top_folders:
-            if getattr(folder, key, None) == value:
-                return folder
-            else:
-                async for content, _ in folder._iter_contents():
-                    if getattr(content, key, None) == value:
-                        return content
-
-        self.app.logger.debug(
-            "{}: {} not found in '{}'".format(key, value, self.name)
-        )
+        found = self._indexes[key].get(value)
+        if key == "name":
+            return list(found or [])
+        return [found] if found else []
+
+    def _index(self, content, recursive=False):
+        """Adds content and, if recursive, everything below it."""
+        contents = [content]
+        while contents:
+            content = contents.pop()
+            if recursive and content.type == "folders":
+                contents.extend(content.contents)
+            self._indexes["id"][content.id] = content
+            self._indexes["path"][content.path] = content
+            self._indexes["name"].setdefault(content.name, []).append(content)
+
+    def _unindex(self, content, recursive=True):
+        """Removes content and, if recursive, everything below it."""
+        contents = [content]
+        while contents:
+            content = contents.pop()
+            if recursive and content.type == "folders":
+                contents.extend(content.contents)
+            for key in ("id", "path"):
+                if self._indexes[key].get(getattr(content, key)) is content:
+                    del self._indexes[key][getattr(content, key)]
+            same_name = self._indexes["name"].get(content.name, [])
+            for i, other in enumerate(same_name):
+                if other is content:
+                    del same_name[i]
+                    break
+            if not same_name:
+                self._indexes["name"].pop(content.name, None)
 
     async def walk(self):
         if not getattr(self, "top_folders", None):
@@ -619,6 +863,20 @@ class Project(ForgeBase):
 
 
 class Content(object):
+    # a crawled project holds one instance per folder, item and version
+    __slots__ = (
+        "name",
+        "id",
+        "_extension_type",
+        "deleted",
+        "_data",
+        "_last_modified",
+        "_project",
+        "_host",
+    )
+    # attributes Content.data keeps when Project.retain is "minimal"
+    MINIMAL_ATTRIBUTES = ("name", "displayName", "lastModifiedTime", "hidden")
+
     def __init__(
         self,
         name,
@@ -631,13 +889,75 @@ class Content(object):
         self.name = name
         self.id = content_id
         self.extension_type = extension_type
-        self.data = data
-        self.path = "/{}".format(self.name)
         if project:
             self.project = project
         if host:
             self.host = host
-            self.path = "{}{}".format(host.path, self.path)
+        self.data = data
+        if project:
+            project._index(self)
+
+    @property
+    def path(self):
+        return "{}/{}".format(self.host.path if self.host else "", self.name)
+
+    @property
+    def data(self):
+        """
+        The JSON:API payload of the content, trimmed to what
+        Project.retain keeps. It is stored as a compact JSON string until
+        it is first read, then kept parsed so changes made to it stay;
+        Content.get_data fetches it in full.
+        """
+        if isinstance(self._data, str):
+            self._data = loads(self._data)
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        retain = self.project.retain if self.project else "full"
+        self._last_modified = None
+        if isinstance(data, dict):
+            if retain == "none":
+                data = None
+            else:
+                # read on every refresh, without parsing the payload
+                self._last_modified = (data.get("attributes") or {}).get(
+                    "lastModifiedTime"
+                )
+                if retain == "minimal":
+                    data = self._minimal(data)
+                data = json.dumps(data, separators=(",", ":"))
+        self._data = data
+
+    def _minimal(self, data):
+        attributes = data.get("attributes") or {}
+        return {
+            "type": data.get("type"),
+            "id": data.get("id"),
+            "attributes": {
+                key: attributes[key]
+                for key in self.MINIMAL_ATTRIBUTES
+                if key in attributes
+            },
+        }
+
+    @_validate_project
+    async def get_data(self):
+        """
+        Fetches the full payload of the content, whatever Project.retain
+        kept in Content.data.
+
+        Returns:
+            data (``dict``): The JSON:API resource of the folder, item or version.
+        """  # noqa: E501
+        # get_folder, get_item or get_version
+        get = getattr(self.project.app.api.dm, "get_" + self.type[:-1])
+        data = await get(
+            self.project.id["dm"], self.id, x_user_id=self.project.x_user_id
+        )
+        if isinstance(data, dict) and "data" in data:
+            return data["data"]
 
     @property
     def extension_type(self):
@@ -646,6 +966,8 @@ class Content(object):
 
     @extension_type.setter
     def extension_type(self, extension_type):
+        if isinstance(extension_type, str):
+            extension_type = sys.intern(extension_type)
         self._extension_type = extension_type
         self.deleted = extension_type in (
             ForgeBase.TYPES[ForgeBase.NAMESPACES["a."]]["versions"]["Deleted"],
@@ -684,12 +1006,49 @@ class Content(object):
         else:
             self._host = host
 
+    @property
+    def last_modified(self):
+        return self._last_modified
+
+    def _update(self, data):
+        """
+        Takes the payload of a new listing. Items whose lastModifiedTime
+        moved forget their metadata and versions so they are fetched
+        again. Returns whether lastModifiedTime moved.
+        """
+        attributes = data.get("attributes") or {}
+        is_modified = self.last_modified != attributes.get("lastModifiedTime")
+        # TODO - name or displayName
+        name = (
+            attributes.get("displayName")
+            if self.type == "items"
+            else attributes.get("name")
+        ) or self.name
+        # paths below a renamed folder change with it
+        recursive = name != self.name and self.type == "folders"
+        if self.project:
+            self.project._unindex(self, recursive=recursive)
+        self.data = data
+        self.name = name
+        self.extension_type = (attributes.get("extension") or {}).get(
+            "type"
+        ) or self.extension_type
+        if self.project:
+            self.project._index(self, recursive=recursive)
+        if is_modified and self.type == "items":
+            self.versions = []
+            self.metadata = None
+        return is_modified
+
     def _unpack_storage_id(self, storage_id):
         """returns bucket_key, object_name"""
         return storage_id.split(":")[-1].split("/")
 
 
 class Folder(Content):
+    __slots__ = ("contents",)
+    type = "folders"
+
     def __init__(self, *args, **kwargs):
         """
         Args:
@@ -702,7 +1061,6 @@ class Folder(Content):
             host (``Folder``): The host folder.
         """
         super().__init__(*args, **kwargs)
-        self.type = "folders"
         self.contents = []
 
     async def _iter_contents(self, level=0):
@@ -715,7 +1073,171 @@ class Folder(Content):
                     yield sub_content, sub_level
 
     @_validate_project
-    async def get_contents(self, is_recursive=True):
+    async def get_contents(
+        self,
+        is_recursive=True,
+        max_depth=None,
+        max_in_flight=None,
+        retain=None,
+    ):
+        """
+        Kwargs:
+            is_recursive (``bool``, default=True): Also get the contents of every sub folder.
+            max_depth (``int``, default=None): Number of sub folder levels to expand when is_recursive. None expands the whole tree.
+            max_in_flight (``int``, default=None): Maximum number of folders listed concurrently. Defaults to the concurrency of the 'get_folder_contents' rate limit.
+            retain (``str``, default=None): Sets Project.retain before listing: "full", "minimal" or "none".
+        """  # noqa: E501
+        if retain:
+            self.project.retain = retain
+        await Folder._crawl(
+            [self],
+            max_depth=max_depth if is_recursive else 0,
+            max_in_flight=max_in_flight,
+        )
+        return self.contents
+
+    @staticmethod
+    async def _crawl(folders, max_depth=None, max_in_flight=None):
+        """
+        Breadth-first listing of folders and their sub folders. Sibling
+        folders are listed concurrently by up to max_in_flight workers.
+        """
+
+        async def visit(folder, depth):
+            await folder._list_contents()
+            if max_depth is not None and depth >= max_depth:
+                return []
+            return [
+                (content, depth + 1)
+                for content in folder.contents
+                if content.type == "folders"
+            ]
+
+        await Folder._pool(
+            [(folder, 0) for folder in folders], visit, max_in_flight
+        )
+
+    @staticmethod
+    async def _refresh(folders, snapshot, max_in_flight=None):
+        """
+        Breadth-first refresh: a folder is re-listed only when its
+        lastModifiedTime differs from the one in snapshot. Folders whose
+        parent was re-listed already carry fresh data; the others are
+        fetched with get_folder.
+
+        Returns:
+            changed (``list``): The folders that were re-listed.
+        """
+        changed = []
+
+        async def visit(folder, is_fresh):
+            if not is_fresh:
+                data = await folder.project.app.api.dm.get_folder(
+                    folder.project.id["dm"],
+                    folder.id,
+                    x_user_id=folder.project.x_user_id,
+                )
+                if isinstance(data, dict) and "data" in data:
+                    folder._update(data["data"])
+
+            is_modified = (
+                folder.last_modified is None
+                or snapshot.get(folder.id) != folder.last_modified
+            )
+            if is_modified:
+                # the cached listing predates the change
+                await folder.project.app.api.dm._invalidate(
+                    "get_folder_contents", folder.project.id["dm"], folder.id
+                )
+                await folder._list_contents()
+                changed.append(folder)
+            return [
+                (content, is_modified)
+                for content in folder.contents
+                if content.type == "folders"
+            ]
+
+        await Folder._pool(
+            [(folder, False) for folder in folders], visit, max_in_flight
+        )
+        return changed
+
+    @staticmethod
+    async def _pool(tasks, visit, max_in_flight=None):
+        """
+        Runs visit(folder, arg) for every (folder, arg) task on up to
+        max_in_flight workers. visit returns the follow-up tasks. Once
+        every task has run, the first exception raised by visit (if any)
+        is raised again; the others are logged.
+        """
+        if not tasks:
+            return
+
+        if not max_in_flight:
+            app = tasks[0][0].project.app
+            max_in_flight = app.api.dm.semaphores["get_folder_contents"].value
+
+        queue = asyncio.Queue()
+        for task in tasks:
+            queue.put_nowait(task)
+        errors = []
+
+        async def worker():
+            while True:
+                folder, arg = await queue.get()
+                try:
+                    for task in await visit(folder, arg):
+                        queue.put_nowait(task)
+                except Exception as e:
+                    folder.project.app.logger.warning(
+                        "{}: couldn't get contents of '{}': {}".format(
+                            folder.project.name, folder.name, e
+                        )
+                    )
+                    errors.append(e)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_in_flight)]
+        try:
+            await queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        if errors:
+            raise errors[0]
+
+    @_validate_project
+    async def refresh(self, snapshot=None, max_in_flight=None):
+        """
+        Updates this folder's tree in place, re-listing only the folders
+        whose lastModifiedTime moved since they were last listed.
+
+        Kwargs:
+            snapshot (``dict``, default=None): Folder id to lastModifiedTime to compare against. Defaults to the current tree (see Folder.snapshot).
+            max_in_flight (``int``, default=None): Maximum number of folders checked concurrently.
+
+        Returns:
+            changed (``list``): The folders that were re-listed.
+        """  # noqa: E501
+        if snapshot is None:
+            snapshot = await self.snapshot()
+        return await Folder._refresh([self], snapshot, max_in_flight)
+
+    async def snapshot(self):
+        """
+        Returns:
+            snapshot (``dict``): lastModifiedTime of this folder and every sub folder, by id.
+        """  # noqa: E501
+        snapshot = {self.id: self.last_modified}
+        async for content, _ in self._iter_contents():
+            if content.type == "folders":
+                snapshot[content.id] = content.last_modified
+        return snapshot
+
+    @_validate_project
+    async def _list_contents(self):
         contents = await self.project.app.api.dm.get_folder_contents(
             self.project.id["dm"],
             self.id,
@@ -723,9 +1245,18 @@ class Folder(Content):
             x_user_id=self.project.x_user_id,
         )
 
+        # keep the objects of contents that are still there
+        existing = {content.id: content for content in self.contents}
+        modified = []
         self.contents = []
         for content in contents:
-            if content["type"] == "items":
+            current = existing.get(content["id"])
+            if current is not None and current.type == content["type"]:
+                del existing[content["id"]]
+                if current._update(content) and current.type == "items":
+                    modified.append(current.id)
+                self.contents.append(current)
+            elif content["type"] == "items":
                 self.contents.append(
                     Item(
                         # TODO - name or displayName
@@ -752,8 +1283,16 @@ class Folder(Content):
                         host=self,
                     )
                 )
-                if is_recursive:
-                    await self.contents[-1].get_contents()
+
+        for content in existing.values():
+            self.project._unindex(content)
+
+        # modified items are not answered from the cache either
+        for item_id in modified:
+            for name in ("get_item", "get_item_versions"):
+                await self.project.app.api.dm._invalidate(
+                    name, self.project.id["dm"], item_id
+                )
 
         return self.contents
 
@@ -849,8 +1388,12 @@ class Folder(Content):
 
     # TODO - untested
     @_validate_project
-    async def _upload_file(self, storage_id, obj_bytes):
+    async def _upload_file(self, storage_id, obj_bytes=None, filepath=None):
         bucket_key, object_name = self._unpack_storage_id(storage_id)
+        if filepath:
+            return await self.project.app.api.dm.upload_object(
+                bucket_key, object_name, filepath
+            )
         return await self.project.app.api.dm.put_object(
             bucket_key, object_name, obj_bytes
         )
@@ -864,19 +1407,25 @@ class Folder(Content):
         obj_bytes=None,
         item_extension_type=None,
         version_extension_type=None,
+        filepath=None,
     ):
         """
         name include extension
+
+        filepath : path of a local file to upload in resumable chunks
+        instead of obj_bytes
         """
-        if not storage_id and obj_bytes:
+        if not storage_id and (obj_bytes or filepath):
             storage = await self._add_storage(name)
             if isinstance(storage, dict) and "id" in storage:
                 storage_id = storage.get("id")
             else:
                 storage_id = None
 
-        if obj_bytes:
-            await self._upload_file(storage_id, obj_bytes)
+        if storage_id and (obj_bytes or filepath):
+            await self._upload_file(
+                storage_id, obj_bytes=obj_bytes, filepath=filepath
+            )
 
         if not storage_id:
             return
@@ -925,35 +1474,62 @@ class Folder(Content):
         )
 
         if isinstance(item, dict) and "data" in item:
-            return Item(
-                item["data"]["attributes"]["displayName"],
-                item["data"]["id"],
-                extension_type=item["data"]["attributes"]["extension"]["type"],
-                data=item,
-                project=self.project,
-                host=self,
+            self.contents.append(
+                Item(
+                    item["data"]["attributes"]["displayName"],
+                    item["data"]["id"],
+                    extension_type=item["data"]["attributes"]["extension"][
+                        "type"
+                    ],
+                    data=item["data"],
+                    project=self.project,
+                    host=self,
+                )
             )
+            return self.contents[-1]
         else:
             return item
 
     async def find(self, value, key="name", shallow=True):
-        """key = name or id or path"""
-        if key.lower() not in ("name", "id", "path"):
+        """
+        key = name or id or path
+
+        Looks value up in the indexes of the project and keeps the first
+        content held by this folder, or anywhere below it unless shallow.
+        """
+        key = key.lower()
+        if key not in ("name", "id", "path"):
             raise ValueError()
 
         if not self.contents:
             await self.get_contents()
 
-        async for content, level in self._iter_contents():
-            if shallow and level != 0:
-                continue
-            if getattr(content, key, None) == value:
+        indexes = self.project._indexes
+        if key == "name" and shallow:
+            found = [indexes["path"].get("{}/{}".format(self.path, value))]
+        elif key == "name":
+            found = indexes["name"].get(value) or []
+        else:
+            found = [indexes[key].get(value)]
+        for content in found:
+            if content is not None and self._holds(content, shallow):
                 return content
 
         self.project.app.logger.debug(
             "{}: {} not found in '{}'".format(key, value, self.name)
         )
 
+    def _holds(self, content, shallow=True):
+        """Whether content is in this folder, or below it unless shallow"""
+        host = content.host
+        while host is not None:
+            if host is self:
+                return True
+            if shallow:
+                return False
+            host = host.host
+        return False
+
     async def walk(self, level=0):
         if not self.contents:
             await self.get_contents()
@@ -963,6 +1539,21 @@ class Folder(Content):
 
 
 class Item(Content):
+    __slots__ = (
+        "versions",
+        "storage_id",
+        "metadata",
+        "hidden",
+        "bucket_key",
+        "object_name",
+        "storage_size",
+        "bytes",
+        "filepath",
+        "_version_indices_by_number",
+        "_version_names",
+    )
+    type = "items"
+
     def __init__(self, *args, **kwargs):
         """
         Args:
@@ -975,7 +1566,6 @@ class Item(Content):
             host (``Folder``): The host folder.
         """
         super().__init__(*args, **kwargs)
-        self.type = "items"
         self.versions = []
         self.storage_id = None
 
@@ -1004,6 +1594,13 @@ class Item(Content):
             # no storage key
             pass
 
+        try:
+            self.storage_size = self.metadata["included"][0]["attributes"][
+                "storageSize"
+            ]
+        except (AttributeError, KeyError, TypeError):
+            self.storage_size = None
+
     # TODO - untested
     @_validate_project
     @_validate_host
@@ -1013,19 +1610,25 @@ class Item(Content):
         storage_id=None,
         obj_bytes=None,
         version_extension_type=None,
+        filepath=None,
     ):
         """
         name include extension
+
+        filepath : path of a local file to upload in resumable chunks
+        instead of obj_bytes
         """
-        if not storage_id and obj_bytes:
+        if not storage_id and (obj_bytes or filepath):
             storage = await self.host._add_storage(name)
             if isinstance(storage, dict) and "id" in storage:
                 storage_id = storage.get("id")
             else:
                 storage_id = None
 
-        if obj_bytes:
-            await self.host._upload_file(storage_id, obj_bytes)
+        if storage_id and (obj_bytes or filepath):
+            await self.host._upload_file(
+                storage_id, obj_bytes=obj_bytes, filepath=filepath
+            )
 
         if not storage_id:
             return
@@ -1037,6 +1640,7 @@ class Item(Content):
             name,
             version_extension_type=version_extension_type,
             x_user_id=self.project.x_user_id,
+            folder_id=self.host.id if self.host else None,
         )
 
         if isinstance(version, dict) and "data" in version:
@@ -1120,7 +1724,21 @@ class Item(Content):
             )
 
     @_validate_project
-    async def download(self, save=False, location=None):
+    async def download(
+        self, save=False, location=None, writable=None, progress=None
+    ):
+        """
+        Downloads the tip version. With save and location the object is
+        streamed to '<location>/<name>' in concurrent byte ranges; with a
+        writable it is streamed into it in order. Otherwise its content is
+        kept in Item.bytes.
+
+        Kwargs:
+            save (``bool``, default=False): Write the object to location.
+            location (``str``, default=None): Directory to save the file in.
+            writable (``object``, default=None): Object with a write(bytes) method the content is streamed to.
+            progress (``callable``, default=None): Called with the size of every block written when streaming.
+        """  # noqa: E501
         if not getattr(self, "metadata", None):
             await self.get_metadata()
 
@@ -1134,6 +1752,38 @@ class Item(Content):
             return
 
         self.project.app.logger.info("Downloading Item {}".format(self.name))
+        if writable is not None:
+            written = await self.project.app.api.dm.stream_object(
+                self.bucket_key,
+                self.object_name,
+                writable,
+                progress=progress,
+            )
+            self.bytes = None
+            self.project.app.logger.info(
+                "Download Finished - file size: {0:0.1f} MB".format(
+                    written / 1024 / 1024
+                )
+            )
+            return
+
+        if save and location and os.path.isdir(location):
+            self.filepath = os.path.join(location, self.name)
+            await self.project.app.api.dm.download_object(
+                self.bucket_key,
+                self.object_name,
+                self.filepath,
+                size=getattr(self, "storage_size", None),
+                progress=progress,
+            )
+            self.bytes = None
+            self.project.app.logger.info(
+                "Download Finished - file size: {0:0.1f} MB".format(
+                    os.path.getsize(self.filepath) / 1024 / 1024
+                )
+            )
+            return
+
         self.bytes = await self.project.app.api.dm.get_object(
             self.bucket_key, self.object_name
         )
@@ -1142,11 +1792,6 @@ class Item(Content):
                 len(self.bytes) / 1024 / 1024
             )
         )
-        if save and location and os.path.isdir(location):
-            self.filepath = os.path.join(location, self.name)
-            with open(self.filepath, "wb") as fp:
-                fp.write(self.bytes)
-            self.bytes = None
 
     async def load(self):
         if getattr(self, "filepath", None):
@@ -1155,9 +1800,24 @@ class Item(Content):
 
 
 class Version(Content):
+    __slots__ = (
+        "number",
+        "_item",
+        "metadata",
+        "storage_id",
+        "bucket_key",
+        "object_name",
+        "file_size",
+        "details",
+        "storage_size",
+    )
+    type = "versions"
+
     # heroku / lambda semaphore
     # https://docs.aws.amazon.com/lambda/latest/dg/gettingstarted-limits.html#limits-list  # noqa: E501
-    lambda_sem = HTTPSemaphore(value=50, interval=60, max_calls=1000)
+    lambda_sem = HTTPSemaphore(
+        value=50, interval=60, max_calls=1000, burst=100, name="lambda"
+    )
 
     def __init__(
         self,
@@ -1172,9 +1832,14 @@ class Version(Content):
         self.number = number
         self.id = version_id
         self.extension_type = extension_type
-        self.data = data
         if item:
             self.item = item
+        self.data = data
+
+    @property
+    def project(self):
+        if self.item:
+            return self.item.project
 
     @property
     def item(self):
@@ -1250,10 +1915,24 @@ class Version(Content):
         chunk_size=50000000,
         force_create=False,
         remote=None,
+        max_in_flight=4,
+        max_memory=None,
+        journal=None,
+        bandwidth=None,
     ):
         """
         force_create to force create an item if item is not in target_host
 
+        max_in_flight : number of chunks copied at once
+        max_memory : cap in bytes on the chunks held at once
+        journal : TransferJournal checkpointing local transfers, so an
+        interrupted transfer into the same target_host resumes with the
+        same storage and only sends the missing chunks
+
+        A local transfer raises TransferError, with the byte range of the
+        chunk that failed, when a chunk cannot be copied.
+        bandwidth : BandwidthLimiter shared by the uploads of local transfers
+
         remote : None or dict
         {
             post_url: "url"
@@ -1298,6 +1977,8 @@ class Version(Content):
                         self.number, self.name
                     )
                 )
+                if journal:
+                    journal.finish(self.id)
                 return target_item
             elif len(target_item.versions) != self.number - 1:
                 self.item.project.app.logger.warning(
@@ -1307,17 +1988,43 @@ class Version(Content):
                 )
                 return target_item
 
-        # TODO - name or displayName
-        tg_storage = await target_host._add_storage(self.name)
-        if isinstance(tg_storage, dict) and "id" in tg_storage:
-            tg_storage_id = tg_storage.get("id")
-        else:
-            self.item.project.app.logger.warning(
-                "Couldn't add Version: {} of Item: '{}' because: Failed to create storage".format(  # noqa: E501
-                    self.number, self.name
+        entry = journal.get(self.id) if journal and not remote else None
+        # an upload into another folder is not resumed here
+        if (
+            entry
+            and entry["target_id"] == target_host.id
+            and entry["total_size"] == self.storage_size
+        ):
+            tg_storage_id = entry["storage_id"]
+            session_id = entry["session_id"]
+            chunk_size = entry["chunk_size"]
+            self.item.project.app.logger.info(
+                "Resuming transfer of: '{}' - version: {}".format(
+                    self.name, self.number
                 )
             )
-            return target_item
+        else:
+            # TODO - name or displayName
+            tg_storage = await target_host._add_storage(self.name)
+            if isinstance(tg_storage, dict) and "id" in tg_storage:
+                tg_storage_id = tg_storage.get("id")
+            else:
+                self.item.project.app.logger.warning(
+                    "Couldn't add Version: {} of Item: '{}' because: Failed to create storage".format(  # noqa: E501
+                        self.number, self.name
+                    )
+                )
+                return target_item
+            session_id = uuid4().hex
+            if journal and not remote:
+                journal.start(
+                    self.id,
+                    tg_storage_id,
+                    session_id,
+                    chunk_size,
+                    self.storage_size,
+                    target_id=target_host.id,
+                )
 
         start = time.perf_counter()
         self.item.project.app.logger.info(
@@ -1335,7 +2042,14 @@ class Version(Content):
             )
             if remote
             else await self._transfer_local(
-                target_host, tg_storage_id, chunk_size
+                target_host,
+                tg_storage_id,
+                chunk_size,
+                max_in_flight=max_in_flight,
+                max_memory=max_memory,
+                session_id=session_id,
+                journal=journal,
+                bandwidth=bandwidth,
             )
         ):
             self.item.project.app.logger.warning(
@@ -1353,7 +2067,7 @@ class Version(Content):
                 self.item.extension_type,
                 target_host.project.app.hub_type,
             )
-            target_item = await target_host.add_item(
+            target_item = created = await target_host.add_item(
                 # TODO - name or displayName
                 self.name,
                 storage_id=tg_storage_id,
@@ -1361,12 +2075,14 @@ class Version(Content):
                 version_extension_type=version_ext_type,
             )
         else:
-            await target_item.add_version(
+            created = await target_item.add_version(
                 # TODO - name or displayName
                 self.name,
                 storage_id=tg_storage_id,
                 version_extension_type=version_ext_type,
             )
+        if journal and created:
+            journal.finish(self.id)
         end = time.perf_counter() - start
         # TODO - name or displayName
         self.item.project.app.logger.info(
@@ -1473,34 +2189,89 @@ class Version(Content):
 
         return res.status
 
-    async def _transfer_local(self, target_host, tg_storage_id, chunk_size):
-        """ """
+    async def _transfer_local(
+        self,
+        target_host,
+        tg_storage_id,
+        chunk_size,
+        max_in_flight=4,
+        max_memory=None,
+        session_id=None,
+        journal=None,
+        bandwidth=None,
+    ):
+        """
+        Copies the object chunk by chunk to the target storage. Each of
+        max_in_flight workers downloads a range then uploads it, so range
+        GETs from the source overlap with resumable PUTs to the target
+        while at most max_in_flight chunks (or max_memory bytes) are held.
+        The last chunk is sent once every other chunk has been accepted.
+        Ranges recorded in journal are skipped and new ones recorded.
+        Uploads wait on bandwidth, a BandwidthLimiter, when given.
+
+        Raises TransferError with the range of the first chunk that fails.
+        """
         tg_bucket_key, tg_object_name = self._unpack_storage_id(tg_storage_id)
+        source_dm = self.item.project.app.api.dm
+        target_dm = target_host.project.app.api.dm
 
-        data_left = self.storage_size
-        count = 0
-        while data_left > 0:
-            lower = count * chunk_size
-            upper = lower + chunk_size
-            if upper > self.storage_size:
-                upper = self.storage_size
-            upper -= 1
-
-            chunk = await self.item.project.app.api.dm.get_object(
-                self.bucket_key,
-                self.object_name,
-                byte_range=(lower, upper),
-            )
+        if max_memory:
+            max_in_flight = min(max_in_flight, max_memory // chunk_size)
+        max_in_flight = max(1, max_in_flight)
 
-            await target_host.project.app.api.dm.put_object_resumable(
-                tg_bucket_key,
-                tg_object_name,
-                chunk,
-                self.storage_size,
-                (lower, upper),
-            )
+        session_id = session_id or uuid4().hex
+        byte_ranges = [
+            (lower, min(lower + chunk_size, self.storage_size) - 1)
+            for lower in range(0, self.storage_size, chunk_size)
+        ]
+        entry = journal.get(self.id) if journal else None
+        completed = entry["ranges"] if entry else set()
+        if byte_ranges[-1] in completed:
+            return True
 
-            data_left -= chunk_size
-            count += 1
+        async def copy(byte_range):
+            try:
+                chunk = await source_dm.get_object(
+                    self.bucket_key, self.object_name, byte_range=byte_range
+                )
+                if not isinstance(chunk, bytes) or len(chunk) != (
+                    byte_range[1] - byte_range[0] + 1
+                ):
+                    raise ValueError("invalid response")
+                if bandwidth:
+                    await bandwidth.consume(len(chunk))
+                await target_dm.put_object_chunk(
+                    tg_bucket_key,
+                    tg_object_name,
+                    chunk,
+                    self.storage_size,
+                    byte_range,
+                    session_id,
+                )
+            except Exception as e:
+                raise TransferError(
+                    "Couldn't copy bytes {}-{} of '{}': {}".format(
+                        *byte_range, self.name, e
+                    ),
+                    byte_range,
+                ) from e
+            if journal:
+                journal.complete(self.id, byte_range)
+
+        pending = iter(r for r in byte_ranges[:-1] if r not in completed)
+
+        async def worker():
+            for byte_range in pending:
+                await copy(byte_range)
+
+        workers = [asyncio.create_task(worker()) for _ in range(max_in_flight)]
+        try:
+            await asyncio.gather(*workers)
+            await copy(byte_ranges[-1])
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
 
         return True
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+"""Bulk migration of a project's folders and files between hubs"""
+
+from __future__ import absolute_import
+
+import asyncio
+import csv
+import time
+
+from .base import Logger
+from .utils import BandwidthLimiter
+
+logger = Logger.start(__name__)
+
+
+class ProjectMigrator(object):
+    """
+    Copies the folder tree and files of a source Project into a target
+    Project (both from ForgeAppAsync apps, possibly on different hubs).
+
+    The target folder tree is mirrored first, one level at a time with
+    the folders of a level created concurrently, siblings one after the
+    other. Items are then handed to a pool of workers; each worker copies
+    the versions of its item in order and stops at the first failure, so
+    version N is only added once version N-1 exists in the target.
+    Versions already in the target are skipped, which makes a migration
+    safe to run again.
+
+    Every item gets a row in ProjectMigrator.results.
+    """
+
+    COLUMNS = (
+        "path",
+        "status",
+        "versions",
+        "skipped",
+        "transferred",
+        "bytes",
+        "seconds",
+        "error",
+    )
+
+    def __init__(
+        self,
+        source,
+        target,
+        max_in_flight=4,
+        chunks_in_flight=2,
+        bytes_per_second=None,
+        chunk_size=50000000,
+        journal=None,
+        publish=False,
+        log_level="info",
+    ):
+        """
+        Args:
+            source (``Project``): Project to copy from.
+            target (``Project``): Project to copy into.
+
+        Kwargs:
+            max_in_flight (``int``, default=4): Number of items migrated at once.
+            chunks_in_flight (``int``, default=2): Number of chunks copied at once for each version.
+            bytes_per_second (``int``, default=None): Upload bandwidth shared by the whole migration. None means unlimited.
+            chunk_size (``int``, default=50000000): Size of the chunks versions are copied in.
+            journal (``TransferJournal``, default=None): Checkpoint journal so interrupted transfers resume.
+            publish (``bool``, default=False): Publish cloud models in the source before copying them.
+            log_level (``str``, default="info"): Level of the migration logs.
+        """  # noqa: E501
+        self.source = source
+        self.target = target
+        self.max_in_flight = max_in_flight
+        self.chunks_in_flight = chunks_in_flight
+        self.bandwidth = (
+            BandwidthLimiter(bytes_per_second) if bytes_per_second else None
+        )
+        self.chunk_size = chunk_size
+        self.journal = journal
+        self.publish = publish
+        self.logger = logger
+        Logger.set_level(self.logger, log_level)
+        self.folders = {}
+        self.results = []
+
+    async def run(self):
+        """
+        Mirrors the folders then migrates every item.
+
+        Returns:
+            results (``list``): One dict per item, keyed by ProjectMigrator.COLUMNS.
+        """  # noqa: E501
+        await asyncio.gather(
+            self.source.get_contents(), self.target.get_contents()
+        )
+        await self.mirror_folders()
+
+        items = []
+        for folder in self.source.top_folders:
+            async for content, _ in folder._iter_contents():
+                if content.type == "items":
+                    items.append(content)
+
+        self.logger.info(
+            "Migrating {} items from '{}' to '{}'".format(
+                len(items), self.source.name, self.target.name
+            )
+        )
+        queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    self.results.append(await self.migrate_item(item))
+                finally:
+                    queue.task_done()
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(self.max_in_flight)
+        ]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        return self.results
+
+    async def mirror_folders(self):
+        """
+        Creates the missing target folders. Folders are keyed by source
+        folder id in ProjectMigrator.folders.
+        """
+        target_tops = {
+            folder.name: folder for folder in self.target.top_folders
+        }
+        level = []
+        for folder in self.source.top_folders:
+            if folder.name in target_tops:
+                self.folders[folder.id] = target_tops[folder.name]
+                level.append(folder)
+            else:
+                self.logger.warning(
+                    "Top folder '{}' not found in '{}'".format(
+                        folder.name, self.target.name
+                    )
+                )
+
+        while level:
+            # source folders of the same name share a target parent
+            parents, siblings = {}, {}
+            for folder in level:
+                parent = self.folders[folder.id]
+                parents[parent.id] = parent
+                siblings.setdefault(parent.id, []).extend(
+                    sub_folder
+                    for sub_folder in folder.contents
+                    if sub_folder.type == "folders"
+                )
+            created = await asyncio.gather(
+                *[
+                    self._add_sub_folders(parents[parent_id], sub_folders)
+                    for parent_id, sub_folders in siblings.items()
+                ]
+            )
+            level = []
+            for sub_folders, targets in zip(siblings.values(), created):
+                for sub_folder, target_folder in zip(sub_folders, targets):
+                    if isinstance(target_folder, Exception):
+                        self.logger.warning(
+                            "Couldn't create folder '{}': {}".format(
+                                sub_folder.path, target_folder
+                            )
+                        )
+                        continue
+                    self.folders[sub_folder.id] = target_folder
+                    level.append(sub_folder)
+
+        return self.folders
+
+    async def _add_sub_folders(self, parent, sub_folders):
+        """
+        Creates the sub folders of one target parent one after the other:
+        add_sub_folder lists the parent while it has no contents, so
+        concurrent siblings would overwrite each other's entries.
+
+        Returns:
+            created (``list``): The target folder, or the exception raised, for each of sub_folders.
+        """  # noqa: E501
+        created = []
+        for sub_folder in sub_folders:
+            try:
+                created.append(await parent.add_sub_folder(sub_folder.name))
+            except Exception as e:
+                created.append(e)
+        return created
+
+    async def migrate_item(self, item):
+        """
+        Copies the versions of item missing from the target, oldest
+        first, stopping at the first one that fails.
+
+        Returns:
+            result (``dict``): Row of the results table.
+        """
+        start = time.perf_counter()
+        result = dict.fromkeys(ProjectMigrator.COLUMNS, 0)
+        result.update({"path": item.path, "status": "ok", "error": ""})
+
+        target_host = self.folders.get(item.host.id)
+        if not target_host:
+            result.update(status="failed", error="target folder missing")
+            return result
+
+        try:
+            versions = sorted(
+                await item.get_versions(), key=lambda v: v.number
+            )
+            result["versions"] = len(versions)
+
+            target_item = await target_host.find(item.name)
+            existing = 0
+            if target_item:
+                existing = len(await target_item.get_versions())
+            result["skipped"] = min(existing, len(versions))
+
+            if self.publish and existing < len(versions):
+                await item.publish()
+
+            for version in versions[existing:]:
+                target_item = await version.transfer(
+                    target_host,
+                    target_item=target_item,
+                    chunk_size=self.chunk_size,
+                    max_in_flight=self.chunks_in_flight,
+                    journal=self.journal,
+                    bandwidth=self.bandwidth,
+                )
+                if not target_item or (
+                    version.number > 1
+                    and len(target_item.versions) < version.number
+                ):
+                    raise ValueError(
+                        "version {} could not be transferred".format(
+                            version.number
+                        )
+                    )
+                result["transferred"] += 1
+                result["bytes"] += version.storage_size
+        except Exception as e:
+            result.update(status="failed", error=str(e))
+            self.logger.warning("'{}' failed: {}".format(item.path, e))
+
+        result["seconds"] = round(time.perf_counter() - start, 2)
+        return result
+
+    def report(self):
+        """
+        Returns:
+            table (``str``): The results as aligned text columns.
+        """
+        rows = [ProjectMigrator.COLUMNS] + [
+            tuple(str(result[key]) for key in ProjectMigrator.COLUMNS)
+            for result in self.results
+        ]
+        widths = [
+            max(len(row[i]) for row in rows) for i in range(len(rows[0]))
+        ]
+        return "\n".join(
+            "  ".join(
+                value.ljust(width) for value, width in zip(row, widths)
+            ).rstrip()
+            for row in rows
+        )
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as fp:
+            writer = csv.DictWriter(fp, fieldnames=ProjectMigrator.COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.results)
@@ -34,7 +34,7 @@ else:
     SUCCESS_CODES = ("OK", "Created", "Accepted", "Partial Content")
 
 
-from ..utils import Logger  # noqa: E402
+from ..utils import Logger, loads  # noqa: E402
 
 
 class Response(object):
@@ -52,9 +52,9 @@ class Response(object):
             else:  # if sys.implementation.name == "cpython"
                 # if response is a json object
                 try:
-                    self._data = self.response.json()
+                    self._data = loads(self.response.content)
                 # else if raw data
-                except json.decoder.JSONDecodeError:
+                except ValueError:
                     self._data = self.response.content
         return self._data
 
@@ -75,13 +75,14 @@ class Response(object):
         if sys.implementation.name == "ironpython":
             error_msg = self.data
         else:  # if sys.implementation.name == "cpython"
-            try:
+            body = self.data
+            if isinstance(body, dict):
                 response_error = (
-                    json.loads(self.response.text).get("error")
-                    or json.loads(self.response.text).get("errors")
-                    or self.response.json().get("message")
+                    body.get("error")
+                    or body.get("errors")
+                    or body.get("message")
                 )
-            except json.decoder.JSONDecodeError:
+            else:
                 response_error = self.response.text
             if response_error:
                 if isinstance(response_error, list):
@@ -116,6 +117,8 @@ class Session(object):
         self.logger = Logger.start(__name__)
         self.timeout = int(timeout * 60)  # in secs
         self.success_codes = SUCCESS_CODES
+        # MetadataCache used for conditional GETs, if any
+        self.cache = None
 
         if sys.implementation.name != "ironpython":
             self.session = _Session()
@@ -194,9 +197,6 @@ class Session(object):
         stream = kwargs.get("stream")
 
         try:
-            if headers:
-                self.session.headers = headers
-
             # get file contents as bytes
             if filepath:
                 with open(filepath, "rb") as fp:
@@ -213,6 +213,7 @@ class Session(object):
             return self.session.request(
                 method.lower(),
                 url,
+                headers=headers,
                 params=params,
                 json=json_data,
                 data=data,
@@ -276,8 +277,8 @@ class Session(object):
                         with StreamReader(response_stream) as stream_reader:
                             raw = stream_reader.ReadToEnd()
                         try:
-                            data = json.loads(raw)
-                        except json.decoder.JSONDecodeError:
+                            data = loads(raw)
+                        except ValueError:
                             print(content_type)
                             data = raw
                         except Exception as e:
@@ -329,6 +330,21 @@ class Session(object):
         else:  # if sys.implementation.name == "cpython"
             _request = self._request_cpython
 
+        key = None
+        if (
+            self.cache is not None
+            and sys.implementation.name != "ironpython"
+            and method.lower() == "get"
+            and not stream
+            and "Range" not in (headers or {})
+        ):
+            key = self.cache.request_key(
+                url,
+                params=params,
+                x_user_id=(headers or {}).get("x-user-id"),
+            )
+            cached, headers = self.cache.conditional_headers(key, headers)
+
         req = _request(
             method,
             url,
@@ -340,6 +356,13 @@ class Session(object):
             filepath=filepath,
             stream=stream,
         )
+        if key:
+            if req.status_code == 304 and cached:
+                return loads(cached["body"]), True
+            # the body of a download is never decoded for the cache
+            if req.status_code == 200 and self.cache.storable(req.headers):
+                self.cache.store_response(key, req.headers, req.text)
+
         res = Response(
             req,
             message=message,
@@ -347,6 +370,63 @@ class Session(object):
         )
         return res.data, res.success
 
+    def stream(
+        self,
+        method,
+        url,
+        writable,
+        headers=None,
+        params=None,
+        chunk_size=1024 * 1024,
+        progress=None,
+        message="",
+    ):
+        """
+        Request wrapper that writes the body of the response to writable
+        in blocks of chunk_size instead of loading it in memory.
+        Args:
+            method (``str``): api method.
+            url (``str``): uri for API call.
+            writable (``object``): Any object with a write(bytes) method.
+        Kwargs:
+            headers (``dict``, optional): dictionary of request headers.
+            params (``dict``, optional): dictionary of request uri parameters.
+            chunk_size (``int``, default=1048576): size of the blocks read from the response.
+            progress (``callable``, optional): called with the size of every block written.
+            message (``str``, optional): description of the call for error logs.
+
+        Returns:
+            written (``int``): Number of bytes written.
+            success (``bool``): True if response returned a accepted, created or ok status code.
+        """  # noqa: E501
+        if sys.implementation.name == "ironpython":
+            data, success = self.request(
+                method, url, headers=headers, params=params, message=message
+            )
+            if not success:
+                return 0, success
+            writable.write(data)
+            if progress:
+                progress(len(data))
+            return len(data), success
+
+        req = self._request_cpython(
+            method, url, headers=headers, params=params, stream=True
+        )
+        res = Response(req, stream=True, message=message, logger=self.logger)
+        written = 0
+        try:
+            if not res.success:
+                return written, False
+            for chunk in req.iter_content(chunk_size=chunk_size):
+                writable.write(chunk)
+                written += len(chunk)
+                if progress:
+                    progress(len(chunk))
+        finally:
+            req.close()
+        return written, True
+
 
 if __name__ == "__main__":
     pass
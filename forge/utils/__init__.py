@@ -15,10 +15,23 @@ try:
 except ImportError:
     from collections import Iterable, Mapping
 
+from .cache import MetadataCache  # noqa: F401
+from .decoder import loads, set_decoder  # noqa: F401
+from .journal import TransferError, TransferJournal  # noqa: F401
 from .logger import Logger  # noqa
+from .tokens import FileTokenStore  # noqa: F401
 
 if sys.version_info >= (3, 7):
-    from .semaphore import HTTPSemaphore  # noqa: F401
+    from .semaphore import (  # noqa: F401
+        BandwidthLimiter,
+        FileBackend,
+        HTTPSemaphore,
+        LimiterStack,
+        LocalBackend,
+        current_limiter,
+        limited,
+        project_limiter,
+    )
 
 
 def pretty_print(obj, sort=True, _print=True):
@@ -46,7 +59,16 @@ def _obj_to_dict(obj):
     try:
         d = {pformat(obj): _clean(obj.__dict__)}
     except AttributeError:
-        d = {pformat(obj): None}
+        d = {pformat(obj): _clean(_slots_to_dict(obj)) or None}
+    return d
+
+
+def _slots_to_dict(obj):
+    d = {}
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if hasattr(obj, name):
+                d[name] = getattr(obj, name)
     return d
 
 
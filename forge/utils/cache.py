@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""Persistent cache of Data Management payloads"""
+
+import json
+import sqlite3
+
+from threading import Lock
+from time import time
+
+from .decoder import loads
+
+
+class MetadataCache(object):
+    """
+    Stores JSON payloads in a SQLite file for ttl seconds. Keys are paths
+    such as 'get_folder_contents/<project id>/<folder id>/...' so a whole
+    resource can be invalidated by prefix.
+    """
+
+    def __init__(self, path, ttl=3600):
+        """
+        Args:
+            path (``str``): Path of the SQLite database, created if needed.
+
+        Kwargs:
+            ttl (``int``, default=3600): Seconds an entry is served for. None keeps entries until they are invalidated.
+        """  # noqa: E501
+        self.path = path
+        self.ttl = ttl
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT, stored REAL)"
+            )
+
+    @staticmethod
+    def key(*parts):
+        return "/".join(str(part) for part in parts)
+
+    def get(self, key, stale=False):
+        """
+        Returns the payload stored under key, or None if missing or older
+        than ttl (unless stale is True).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return
+        value, stored = row
+        if not stale and self.ttl is not None and time() - stored > self.ttl:
+            return
+        return loads(value)
+
+    def set(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, json.dumps(value), time()),
+            )
+
+    # Conditional requests
+
+    def request_key(self, url, params=None, x_user_id=None):
+        """Key of the stored response of a GET request."""
+        return "{}?{}".format(
+            self.key("http", url),
+            json.dumps([params or {}, x_user_id], sort_keys=True),
+        )
+
+    def conditional_headers(self, key, headers=None):
+        """
+        Returns the response stored under key, if any, and a copy of
+        headers with its validators (If-None-Match, If-Modified-Since).
+        """
+        headers = dict(headers or {})
+        response = self.get(key, stale=True)
+        if response:
+            if response.get("etag"):
+                headers["If-None-Match"] = response["etag"]
+            if response.get("last_modified"):
+                headers["If-Modified-Since"] = response["last_modified"]
+        return response, headers
+
+    @staticmethod
+    def storable(headers):
+        """
+        Whether a response with headers is JSON and carries an ETag or
+        Last-Modified validator, checked before its body is read.
+        """
+        return bool(
+            (headers.get("ETag") or headers.get("Last-Modified"))
+            and "json" in (headers.get("Content-Type") or "")
+        )
+
+    def store_response(self, key, headers, body):
+        """
+        Stores a JSON response body under key when headers carry an ETag
+        or Last-Modified validator.
+        """
+        if self.storable(headers):
+            self.set(
+                key,
+                {
+                    "etag": headers.get("ETag"),
+                    "last_modified": headers.get("Last-Modified"),
+                    "content_type": headers.get("Content-Type"),
+                    "body": body,
+                },
+            )
+
+    def invalidate(self, prefix=None):
+        """
+        Removes every entry whose key starts with prefix, or every entry
+        if no prefix is given.
+        """
+        with self._lock, self._conn:
+            if prefix is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE substr(key, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""JSON decoding with the fastest installed library"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# every decoder takes str or bytes and raises a ValueError on bad input
+DECODERS = {"json": json.loads}
+if ujson:
+    DECODERS["ujson"] = ujson.loads
+if orjson:
+    DECODERS["orjson"] = orjson.loads
+
+_loads = json.loads
+
+
+def loads(s):
+    """Decodes a JSON document with the decoder chosen by set_decoder."""
+    return _loads(s)
+
+
+def set_decoder(decoder=None):
+    """
+    Set the 'FORGE_JSON_DECODER' environment variable to choose the
+    decoder at import time.
+
+    Kwargs:
+        decoder (``str`` or ``callable``, default=None): "orjson", "ujson", "json" or a function taking str or bytes. None picks the fastest installed.
+    """  # noqa: E501
+    global _loads
+    if decoder is None:
+        decoder = next(
+            name for name in ("orjson", "ujson", "json") if name in DECODERS
+        )
+    if isinstance(decoder, str):
+        if decoder not in DECODERS:
+            raise ValueError(
+                "JSON decoder '{}' is not installed".format(decoder)
+            )
+        decoder = DECODERS[decoder]
+    _loads = decoder
+
+
+set_decoder(os.environ.get("FORGE_JSON_DECODER") or None)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""Checkpoint journal for resumable hub to hub transfers"""
+
+import sqlite3
+
+from threading import Lock
+
+
+class TransferError(Exception):
+    """
+    A chunk of a transfer could not be copied. TransferError.byte_range
+    is the (lower, upper) range of that chunk, the cause is chained.
+    """
+
+    def __init__(self, message, byte_range):
+        super().__init__(message)
+        self.byte_range = byte_range
+
+
+class TransferJournal(object):
+    """
+    Records, per source version id, the target folder and storage, the
+    OSS resumable Session-Id, the chunk size and the byte ranges already
+    accepted by the target, in a SQLite file. A transfer restarted with
+    the same journal into the same folder reuses the storage and session
+    and only sends the missing ranges.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (``str``): Path of the SQLite database, created if needed.
+        """
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS transfers ("
+                "version_id TEXT PRIMARY KEY, storage_id TEXT, "
+                "session_id TEXT, chunk_size INTEGER, total_size INTEGER, "
+                "target_id TEXT)"
+            )
+            columns = [
+                row[1]
+                for row in self._conn.execute("PRAGMA table_info(transfers)")
+            ]
+            if "target_id" not in columns:
+                # journal written before the target folder was recorded
+                self._conn.execute(
+                    "ALTER TABLE transfers ADD COLUMN target_id TEXT"
+                )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS ranges ("
+                "version_id TEXT, lower INTEGER, upper INTEGER, "
+                "PRIMARY KEY (version_id, lower))"
+            )
+
+    def get(self, version_id):
+        """
+        Returns:
+            entry (``dict``): storage_id, session_id, chunk_size, total_size, target_id and the set of completed ranges, or None.
+        """  # noqa: E501
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT storage_id, session_id, chunk_size, total_size, "
+                "target_id FROM transfers WHERE version_id = ?",
+                (version_id,),
+            ).fetchone()
+            if not row:
+                return
+            ranges = self._conn.execute(
+                "SELECT lower, upper FROM ranges WHERE version_id = ?",
+                (version_id,),
+            ).fetchall()
+        storage_id, session_id, chunk_size, total_size, target_id = row
+        return {
+            "storage_id": storage_id,
+            "session_id": session_id,
+            "chunk_size": chunk_size,
+            "total_size": total_size,
+            "target_id": target_id,
+            "ranges": {tuple(r) for r in ranges},
+        }
+
+    def start(
+        self,
+        version_id,
+        storage_id,
+        session_id,
+        chunk_size,
+        total_size,
+        target_id=None,
+    ):
+        """
+        Records a new transfer, forgetting any previous one. target_id is
+        the id of the folder the version is added to.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM ranges WHERE version_id = ?", (version_id,)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    version_id,
+                    storage_id,
+                    session_id,
+                    chunk_size,
+                    total_size,
+                    target_id,
+                ),
+            )
+
+    def complete(self, version_id, byte_range):
+        """Records a byte range accepted by the target."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ranges VALUES (?, ?, ?)",
+                (version_id, byte_range[0], byte_range[1]),
+            )
+
+    def finish(self, version_id):
+        """Forgets a transfer once its version has been created."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM ranges WHERE version_id = ?", (version_id,)
+            )
+            self._conn.execute(
+                "DELETE FROM transfers WHERE version_id = ?", (version_id,)
+            )
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Receives an OAuth redirect on the loopback interface"""
+
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+LOOPBACK_HOSTS = ("localhost", "127.0.0.1")
+
+PAGE = "<html><body><p>{}</p><p>You can close this window.</p></body></html>"
+
+
+def wait_for_redirect(url, redirect_uri, opener, timeout=300):
+    """
+    Listens on redirect_uri, which must point at this machine, calls
+    opener(url) in a thread and returns the query parameters of the first
+    request made to the path of redirect_uri.
+
+    Args:
+        url (``str``): Authorization URL, visited by the user.
+        redirect_uri (``str``): 'http://localhost:<port>/<path>' the authorization server redirects to.
+        opener (``callable``): Shows url to the user, e.g. webbrowser.open.
+
+    Kwargs:
+        timeout (``int``, default=300): Seconds to wait for the redirect.
+
+    Returns:
+        params (``dict``): Query parameters of the redirect.
+    """  # noqa: E501
+    redirect = urlparse(redirect_uri)
+    if redirect.scheme != "http" or redirect.hostname not in LOOPBACK_HOSTS:
+        raise ValueError(
+            "redirect_uri must be an http URL on localhost, got '{}'".format(
+                redirect_uri
+            )
+        )
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if path != (redirect.path or "/"):
+                self.send_error(404)
+                return
+            self.server.params = dict(parse_qsl(query))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            message = (
+                "Authorization failed."
+                if "error" in self.server.params
+                else "Signed in to Autodesk Forge."
+            )
+            self.wfile.write(PAGE.format(message).encode("utf-8"))
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer((redirect.hostname, redirect.port or 80), Handler)
+    server.params = None
+    try:
+        threading.Thread(target=opener, args=(url,), daemon=True).start()
+        deadline = time.time() + timeout
+        while server.params is None:
+            server.timeout = deadline - time.time()
+            if server.timeout <= 0:
+                raise RuntimeError(
+                    "No redirect received on '{}' within {} seconds".format(
+                        redirect_uri, timeout
+                    )
+                )
+            server.handle_request()
+    finally:
+        server.server_close()
+    return server.params
@@ -1,70 +1,386 @@
 # -*- coding: utf-8 -*-
 
-"""Delayed Bounded Semaphore for HTTP Connections"""
+"""Rate Limited Bounded Semaphore for HTTP Connections"""
 
-from asyncio import BoundedSemaphore, sleep
-from collections import deque
-from datetime import datetime
+import json
+import os
 
-from inspect import iscoroutinefunction
-from time import sleep as tsleep
+from asyncio import BoundedSemaphore, get_event_loop, sleep
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from time import monotonic, time
+
+from .filelock import locked
+
+# limiter of the endpoint family the running request belongs to
+current_limiter = ContextVar("current_limiter", default=None)
+
+
+class LocalBackend(object):
+    """Keeps rate limit state in this process (default)."""
+
+    # reserve() and hold() return at once
+    blocking = False
+
+    def __init__(self):
+        self.tats = {}
+
+    def reserve(self, key, period, burst):
+        now = monotonic()
+        tat = max(self.tats.get(key, 0.0), now)
+        self.tats[key] = tat + period
+        return max(0.0, tat - (burst - 1) * period - now)
+
+    def hold(self, key, seconds, period, burst):
+        # past the burst tolerance, so reserve() waits the whole time
+        self.tats[key] = max(
+            self.tats.get(key, 0.0),
+            monotonic() + seconds + (burst - 1) * period,
+        )
+
+    def refund(self, key, period):
+        self.tats[key] = self.tats.get(key, 0.0) - period
+
+
+class FileBackend(object):
+    """
+    Keeps rate limit state in a JSON file guarded by an exclusive file
+    lock, so every process on the host using the same path shares one
+    budget per limiter name. Times are wall clock seconds.
+
+    Set the 'FORGE_RATE_LIMIT_FILE' environment variable to use it for
+    every HTTPSemaphore by default.
+    """
+
+    # reserve() and hold() wait for the file lock
+    blocking = True
+
+    def __init__(self, path):
+        self.path = path
+
+    def _update(self, key, func):
+        with locked(self.path) as fp:
+            try:
+                state = json.loads(fp.read() or "{}")
+            except ValueError:
+                state = {}
+            now = time()
+            tat, result = func(max(state.get(key, 0.0), now), now)
+            state[key] = tat
+            fp.seek(0)
+            fp.truncate()
+            fp.write(json.dumps(state))
+        return result
+
+    def reserve(self, key, period, burst):
+        return self._update(
+            key,
+            lambda tat, now: (
+                tat + period,
+                max(0.0, tat - (burst - 1) * period - now),
+            ),
+        )
+
+    def hold(self, key, seconds, period, burst):
+        self._update(
+            key,
+            lambda tat, now: (
+                max(tat, now + seconds + (burst - 1) * period),
+                None,
+            ),
+        )
+
+    def refund(self, key, period):
+        self._update(key, lambda tat, now: (tat - period, None))
 
 
 class HTTPSemaphore(BoundedSemaphore):
-    """ """
+    """
+    Bounded semaphore that also admits acquisitions at a steady rate of
+    max_calls per interval. Admission follows the Generic Cell Rate
+    Algorithm (a token bucket expressed as a theoretical arrival time), so
+    waiting happens before the request is sent and up to burst requests
+    may go out back to back. The burst is taken out of the steady rate,
+    so no interval admits more than max_calls.
+
+    When adaptive, the allowed rate is lowered multiplicatively every time
+    the server answers 429 and raised additively as calls succeed, never
+    exceeding max_calls per interval (AIMD).
+
+    The admission state lives in a backend: LocalBackend keeps it in this
+    process, FileBackend shares it between processes through a file.
+    Limiters with the same name share their budget within a backend.
+    Unnamed limiters keep their state to themselves, in this process.
+    Calls to a blocking backend run in the default executor.
+    """
+
+    backend = (
+        FileBackend(os.environ["FORGE_RATE_LIMIT_FILE"])
+        if os.environ.get("FORGE_RATE_LIMIT_FILE")
+        else LocalBackend()
+    )
 
     def __init__(
         self,
         value: int = 10,
         interval: int = 60,  # in seconds
         max_calls: int = 300,
+        burst: int = 1,
+        adaptive: bool = True,
+        decrease: float = 0.5,
+        increase: float = 0.05,
+        name: str = None,
+        backend=None,
         **kwargs,
     ) -> None:
         """
         https://forge.autodesk.com/en/docs/data/v2/developers_guide/rate-limiting/dm-rate-limits/
+
+        Args:
+            value (``int``, default=10): Maximum number of concurrent acquisitions.
+            interval (``int``, default=60): Length of the rate limit window in seconds.
+            max_calls (``int``, default=300): Number of calls allowed per interval.
+            burst (``int``, default=1): Number of calls that may be admitted at once before the steady rate applies.
+            adaptive (``bool``, default=True): Adjust the rate to 429 responses.
+            decrease (``float``, default=0.5): Factor applied to the rate on a 429 response.
+            increase (``float``, default=0.05): Fraction of max_calls regained after an interval worth of successful calls.
+            name (``str``, default=None): Key of this limiter's state in the backend. Required with an explicit backend.
+            backend (``LocalBackend`` or ``FileBackend``, default=HTTPSemaphore.backend): Where admission state is kept. Ignored by unnamed limiters.
         """  # noqa: E501
-        self.rate = float(interval) / float(max_calls)
-        # self.max = int(max_calls / interval) + 1
+        self.value = value
         self.interval = interval
         self.max = max_calls
-        self.acquisitions = deque(maxlen=self.max)
+        self.burst = max(1, int(burst))
+        self.adaptive = adaptive
+        self.decrease = decrease
+        self.increase = increase
+        self._set_calls(float(max_calls))
+        self._last_decrease = 0.0
+        self.name = name
+        if not name:
+            if backend:
+                raise ValueError("A limiter with a backend needs a name")
+            self.backend = LocalBackend()
+        elif backend:
+            self.backend = backend
         super().__init__(value, **kwargs)
 
-    def throttle(self):
-        if len(self.acquisitions) == self.max:
-            first = self.acquisitions.popleft()
-            last = self.acquisitions[-1]
+    async def _run(self, func, *args):
+        if self.backend.blocking:
+            return await get_event_loop().run_in_executor(None, func, *args)
+        return func(*args)
 
-            self.delta = (last - first).total_seconds()
-            if self.delta <= self.interval:
-                return True
+    def reserve(self):
+        """
+        Books the next admission slot and returns how many seconds the
+        caller has to wait before using it.
+        """
+        return self.backend.reserve(self.name, self.period, self._burst)
+
+    def refund(self):
+        """Gives back a slot booked by reserve() that was not used."""
+        self.backend.refund(self.name, self.period)
+
+    async def acquire(self):
+        await super().acquire()
+        try:
+            delay = await self._run(self.reserve)
+        except BaseException:
+            self.release()
+            raise
+        try:
+            if delay:
+                await sleep(delay)
+        except BaseException:
+            # cancelled while waiting for the slot
+            if self.backend.blocking:
+                get_event_loop().run_in_executor(None, self.refund)
             else:
-                return False
-        else:
-            return False
-
-    def time(self):
-        remainder = self.interval - self.delta + 0.01
-        # print(f"I have been delayed: {remainder} secs")
-        return remainder
-
-    def delay(func):
-        async def inner_coro(self, *args, **kwargs):
-            result = await func(self, *args, **kwargs)
-            if self.throttle():
-                await sleep(self.time())
-            self.acquisitions.append(datetime.now())
-            return result
-
-        def inner_func(self, *args, **kwargs):
-            result = func(self, *args, **kwargs)
-            if self.throttle():
-                tsleep(self.time())
-            self.acquisitions.append(datetime.now())
-            return result
-
-        inner = inner_coro if iscoroutinefunction(func) else inner_func
-
-        return inner
-
-    acquire = delay(BoundedSemaphore.acquire)
+                self.refund()
+            self.release()
+            raise
+        return True
+
+    def throttled(self, retry_after=None):
+        """
+        Called when the server answered 429. Holds every admission until
+        retry_after seconds have passed and lowers the rate, at most once
+        per cool down so a burst of 429s only counts once.
+        """
+        self._slow_down(retry_after)
+        if retry_after:
+            self.hold(retry_after)
+
+    def hold(self, seconds):
+        """Admits nothing, burst included, for the next seconds."""
+        self.backend.hold(self.name, seconds, self.period, self._burst)
+
+    async def backoff(self, retry_after=None):
+        """
+        throttled() followed by reserve(), with the backend calls off the
+        event loop. Returns how many seconds to wait before retrying.
+        """
+
+        def hold_and_reserve():
+            if retry_after:
+                self.hold(retry_after)
+            return self.reserve()
+
+        self._slow_down(retry_after)
+        return await self._run(hold_and_reserve)
+
+    def _slow_down(self, retry_after):
+        now = monotonic()
+        if not self.adaptive:
+            return
+
+        if now - self._last_decrease >= max(retry_after or 0, self.period):
+            self._last_decrease = now
+            self._set_calls(max(1.0, self.calls * self.decrease))
+
+    def succeeded(self):
+        """Called when a request went through without being throttled."""
+        if self.adaptive and self.calls < self.max:
+            self._set_calls(
+                min(
+                    float(self.max),
+                    self.calls + self.increase * self.max / self.calls,
+                )
+            )
+
+    def _set_calls(self, calls):
+        # calls per interval currently allowed
+        self.calls = calls
+        # calls admitted back to back, fewer than allowed per interval
+        self._burst = max(1, min(self.burst, int(calls) - 1))
+        # seconds between two admissions at the steady rate, which leaves
+        # room for the burst within any interval
+        self.period = float(self.interval) / max(1.0, calls - self._burst)
+
+
+class LimiterStack(object):
+    """
+    Acquires several limiters as one: the (name, limiter) layers are
+    acquired in the order given and released in reverse. If acquiring a
+    layer fails or is cancelled, the layers already held are released.
+
+    LimiterStack.waits holds the seconds spent acquiring each layer and
+    LimiterStack.totals accumulates them by name across every stack.
+    """
+
+    totals = Counter()
+
+    def __init__(self, *layers):
+        """
+        Args:
+            layers (``tuple``): (name, limiter) pairs. Layers whose limiter is None are skipped.
+        """  # noqa: E501
+        self.layers = [
+            (name, limiter) for name, limiter in layers if limiter is not None
+        ]
+        self.waits = {}
+
+    @property
+    def waited(self):
+        return sum(self.waits.values())
+
+    async def __aenter__(self):
+        acquired = []
+        try:
+            for name, limiter in self.layers:
+                start = monotonic()
+                await limiter.acquire()
+                acquired.append(limiter)
+                self.waits[name] = monotonic() - start
+                LimiterStack.totals[name] += self.waits[name]
+        except BaseException:
+            for limiter in reversed(acquired):
+                limiter.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        for _, limiter in reversed(self.layers):
+            limiter.release()
+
+
+def project_limiter(limiters, prefix, project_id, max_calls):
+    """
+    Returns the limiter of project_id in limiters, created with max_calls
+    per minute and named '<prefix>.project.<project_id>' on first use, or
+    None when max_calls or project_id is not set.
+    """
+    if not (max_calls and project_id):
+        return None
+    if project_id not in limiters:
+        limiters[project_id] = HTTPSemaphore(
+            value=50,
+            interval=60,
+            max_calls=max_calls,
+            burst=max(1, max_calls // 10),
+            name="{}.project.{}".format(prefix, project_id),
+        )
+    return limiters[project_id]
+
+
+@asynccontextmanager
+async def limited(sema, project_sema, global_sema, logger):
+    """
+    Holds the endpoint limiter, the project limiter (if any) and the
+    global connection semaphore, acquired in that order so a request
+    waiting on a rate never holds one of the shared connections. sema is
+    the current_limiter meanwhile.
+    """
+    token = current_limiter.set(sema)
+    try:
+        async with LimiterStack(
+            (sema.name, sema),
+            (project_sema and project_sema.name, project_sema),
+            ("global", global_sema),
+        ) as stack:
+            if stack.waited >= 0.001:
+                logger.debug(
+                    "Waited {:.3f}s for {}".format(
+                        stack.waited,
+                        ", ".join(
+                            "{}: {:.3f}s".format(name, wait)
+                            for name, wait in stack.waits.items()
+                        ),
+                    )
+                )
+            yield stack
+    finally:
+        current_limiter.reset(token)
+
+
+class BandwidthLimiter(object):
+    """
+    Admits bytes at a steady rate of bytes_per_second, shared by every
+    coroutine consuming from it. Like HTTPSemaphore it books a theoretical
+    arrival time, so a large chunk delays the following ones instead of
+    being refused.
+    """
+
+    def __init__(self, bytes_per_second):
+        """
+        Args:
+            bytes_per_second (``int``): Average number of bytes admitted per second.
+        """  # noqa: E501
+        self.rate = float(bytes_per_second)
+        self._tat = 0.0
+
+    def reserve(self, nbytes):
+        """
+        Books nbytes and returns how many seconds the caller has to wait
+        before sending them.
+        """
+        now = monotonic()
+        tat = max(self._tat, now)
+        self._tat = tat + nbytes / self.rate
+        return tat - now
+
+    async def consume(self, nbytes):
+        delay = self.reserve(nbytes)
+        if delay:
+            await sleep(delay)
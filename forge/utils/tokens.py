@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""Access tokens shared between processes on one host"""
+
+import json
+import os
+import time
+
+from .filelock import locked
+
+
+class FileTokenStore(object):
+    """
+    Keeps access tokens in a JSON file guarded by an exclusive file lock,
+    so every process on the host using the same path reuses the tokens
+    the others obtained. The file is only readable by its owner.
+
+    Set the 'FORGE_TOKEN_STORE' environment variable to change the default
+    path. Any object with the same get(key) and set(key, token) methods
+    can be passed to ForgeAuth as a token store.
+    """
+
+    def __init__(self, path=None):
+        """
+        Kwargs:
+            path (``str``, default=None): Path of the JSON file, created if needed. Defaults to 'FORGE_TOKEN_STORE' or '~/.forge/tokens.json'.
+        """  # noqa: E501
+        self.path = path or os.environ.get(
+            "FORGE_TOKEN_STORE",
+            os.path.join(os.path.expanduser("~"), ".forge", "tokens.json"),
+        )
+        folder = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(folder):
+            os.makedirs(folder, 0o700)
+
+    def _read(self, fp):
+        try:
+            return json.loads(fp.read() or "{}")
+        except ValueError:
+            return {}
+
+    def get(self, key):
+        """
+        Returns the token stored under key, a dict with the token response
+        attributes and 'expires_at' in seconds since the epoch, or None.
+        """
+        with locked(self.path) as fp:
+            return self._read(fp).get(key)
+
+    def set(self, key, token):
+        """Stores token under key and drops tokens that cannot be used."""
+        with locked(self.path) as fp:
+            tokens = self._read(fp)
+            tokens[key] = token
+            now = time.time()
+            tokens = {
+                k: v
+                for k, v in tokens.items()
+                if v.get("expires_at", 0) > now or v.get("refresh_token")
+            }
+            fp.seek(0)
+            fp.truncate()
+            fp.write(json.dumps(tokens))
@@ -21,6 +21,7 @@ setup(
         "chromedriver_autoinstaller",
         "tqdm",
     ],
+    extras_require={"orjson": ["orjson"]},
     python_requires="!=2.7.*, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*, !=3.5.*, !=3.6.*",  # noqa: E501
     keywords=["forge", "autodesk", "api", "async", "async.io"],
     license="The MIT License (MIT)",
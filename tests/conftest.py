@@ -0,0 +1,110 @@
+"""Helpers shared by the tests, imported with 'from conftest import ...'"""
+
+import asyncio
+import logging
+
+from types import SimpleNamespace
+
+from forge.forge_async import ForgeAppAsync, Project
+
+
+def make_app(dm=None, cls=ForgeAppAsync, **attrs):
+    """An app of cls that was never opened, with dm as app.api.dm"""
+    app = cls.__new__(cls)
+    app._hub_id = "b.hub"
+    app.api = SimpleNamespace(dm=dm)
+    app.logger = logging.getLogger(__name__)
+    for name, value in attrs.items():
+        setattr(app, name, value)
+    return app
+
+
+def make_project(dm=None, name="project", project_id="p"):
+    return Project(name, project_id, app=make_app(dm))
+
+
+def payload(kind, content_id, name=None, modified="t0"):
+    """JSON:API payload of a folder, item or version"""
+    return {
+        "type": kind,
+        "id": content_id,
+        "attributes": {
+            "displayName" if kind == "items" else "name": name or content_id,
+            "lastModifiedTime": modified,
+            "extension": {"type": "{}:autodesk.bim360:File".format(kind)},
+        },
+    }
+
+
+class FakeDM(object):
+    """
+    Data Management answering from dicts: folders by id, the contents of
+    each folder and the number of versions of each item.
+    """
+
+    semaphores = {"get_folder_contents": SimpleNamespace(value=4)}
+
+    def __init__(self, folders=None, contents=None, versions=None):
+        self.folders = folders or {}
+        self.contents = contents or {}
+        self.versions = versions or {}
+        self.listed = []
+        self.posted = []
+        self.failing = set()
+
+    async def _invalidate(self, name, project_id, resource_id=None):
+        pass
+
+    async def get_folder(self, project_id, folder_id, x_user_id=None):
+        return {"data": self.folders[folder_id]}
+
+    async def get_folder_contents(
+        self, project_id, folder_id, include_hidden=False, x_user_id=None
+    ):
+        self.listed.append(folder_id)
+        await asyncio.sleep(0)
+        if folder_id in self.failing:
+            raise ConnectionError("{} failed".format(folder_id))
+        return list(self.contents.get(folder_id, []))
+
+    async def get_item(self, project_id, item_id, x_user_id=None):
+        return {"data": payload("items", item_id)}
+
+    async def get_item_versions(self, project_id, item_id, x_user_id=None):
+        versions = []
+        for number in range(self.versions.get(item_id, 0), 0, -1):
+            version = payload(
+                "versions", "{}?v={}".format(item_id, number), item_id
+            )
+            version["attributes"]["versionNumber"] = number
+            versions.append(version)
+        return versions
+
+    async def post_storage(
+        self, project_id, host_type, host_id, name, x_user_id=None
+    ):
+        return {"data": {"id": "urn:adsk.objects:os.object:b/" + name}}
+
+    async def post_item(
+        self, project_id, folder_id, storage_id, name, **kwargs
+    ):
+        item = payload("items", "{}/{}".format(folder_id, name), name)
+        self.contents.setdefault(folder_id, []).append(item)
+        return {"data": item}
+
+    async def post_folder(
+        self,
+        project_id,
+        parent_folder_id,
+        folder_name,
+        project_name=None,
+        x_user_id=None,
+    ):
+        await asyncio.sleep(0)
+        folder_id = "{}/{}".format(parent_folder_id, folder_name)
+        self.posted.append(folder_id)
+        folder = self.folders[folder_id] = payload(
+            "folders", folder_id, folder_name
+        )
+        self.contents.setdefault(parent_folder_id, []).append(folder)
+        return {"data": folder}
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import logging
+import os
+import pytest
+import socket
+import threading
+import time
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlparse
+from urllib.request import urlopen
+
+import forge.auth
+
+from forge.auth import ForgeAuth
+from forge.extra.auth import TokenRefresher
+from forge.utils import FileTokenStore
+
+
+def _auth(url, expires_in):
+    auth = ForgeAuth.__new__(ForgeAuth)
+    auth.client_id, auth.client_secret = "id", "secret"
+    auth.scopes = ["data:read"]
+    auth.three_legged = False
+    auth.refresh_margin = 60
+    auth.token_store = None
+    auth.access_token, auth.token_type = "old", "Bearer"
+    auth.expires_in = expires_in
+    auth.timestamp = datetime.now()
+    auth._authenticate_request = lambda: (url, {}, {"grant_type": "x"})
+    auth.logger = logging.getLogger(__name__)
+    return auth
+
+
+@pytest.mark.asyncio
+async def test_single_flight_refresh() -> None:
+    calls = []
+
+    async def authenticate(request):
+        calls.append(await request.post())
+        await asyncio.sleep(0.05)
+        return web.json_response(
+            {
+                "access_token": "new",
+                "token_type": "Bearer",
+                "expires_in": 3599,
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/authenticate", authenticate)
+    async with TestServer(app) as server, ClientSession() as session:
+        auth = _auth(str(server.make_url("/authenticate")), 0)
+        headers = {}
+        tokens = TokenRefresher(
+            auth, session, on_refresh=lambda auth: headers.update(auth.header)
+        )
+
+        # expired: every caller waits on the same request
+        await asyncio.gather(*[tokens.ensure() for _ in range(50)])
+        assert len(calls) == 1
+        assert headers == {"Authorization": "Bearer new"}
+        assert tokens.seconds_left() > 3500
+
+        # within the margin: the refresh starts without the caller waiting
+        auth.timestamp -= timedelta(seconds=3560)
+        await tokens.ensure()
+        assert len(calls) == 1
+        await tokens.refresh()
+        assert len(calls) == 2
+        assert tokens.seconds_left() > 3500
+        await tokens.stop()
+
+
+class _SlowStore(object):
+    """Token store whose file lock is held by another process."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, key):
+        time.sleep(0.2)
+        self.calls.append("get")
+
+    def set(self, key, token):
+        time.sleep(0.2)
+        self.calls.append("set")
+
+
+@pytest.mark.asyncio
+async def test_refresh_off_loop() -> None:
+    async def authenticate(request):
+        return web.json_response(
+            {"access_token": "new", "token_type": "Bearer", "expires_in": 3599}
+        )
+
+    app = web.Application()
+    app.router.add_post("/authenticate", authenticate)
+    async with TestServer(app) as server, ClientSession() as session:
+        auth = _auth(str(server.make_url("/authenticate")), 0)
+        auth.token_store = _SlowStore()
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        await TokenRefresher(auth, session).refresh()
+        ticker.cancel()
+        assert auth.token_store.calls == ["get", "set"]
+        # the loop kept running while the store was locked
+        assert len(ticks) > 10
+
+
+def test_token_store(tmp_path, monkeypatch) -> None:
+    requests = []
+
+    def _authenticate(self):
+        requests.append(self.client_id)
+        self._set_token(
+            {"access_token": "a", "token_type": "Bearer", "expires_in": 3599},
+            datetime.now(),
+        )
+
+    monkeypatch.setattr(ForgeAuth, "_authenticate", _authenticate)
+    store = FileTokenStore(str(tmp_path / "tokens.json"))
+    kwargs = dict(
+        client_secret="secret", token_store=store, log_level="warning"
+    )
+
+    first = ForgeAuth(client_id="id", **kwargs)
+    second = ForgeAuth(client_id="id", **kwargs)
+    assert requests == ["id"]
+    assert second.header == first.header
+    assert 3500 < second.expires_in < 3600
+    assert os.stat(store.path).st_mode & 0o777 == 0o600
+
+    # other clients and scopes get their own token
+    ForgeAuth(client_id="other", **kwargs)
+    ForgeAuth(client_id="id", scopes=["data:read"], **kwargs)
+    ForgeAuth(client_id="id", token_store=False, client_secret="secret")
+    assert requests == ["id", "other", "id", "id"]
+
+    # a token about to expire is not reused
+    store.set(
+        first._token_key(), dict(store.get(first._token_key()), expires_at=0)
+    )
+    ForgeAuth(client_id="id", **kwargs)
+    assert len(requests) == 5
+
+    # a malformed entry is a miss
+    store.set(first._token_key(), {"access_token": "a", "refresh_token": "r"})
+    ForgeAuth(client_id="id", **kwargs)
+    assert len(requests) == 6
+
+
+class _OAuth(BaseHTTPRequestHandler):
+    """Stand-in Autodesk OAuth server that approves every request."""
+
+    def do_GET(self):
+        query = dict(parse_qsl(urlparse(self.path).query))
+        self.server.requests.append("authorize")
+        self.send_response(302)
+        self.send_header(
+            "Location",
+            "{}?code=the-code&state={}".format(
+                query["redirect_uri"], query["state"]
+            ),
+        )
+        self.end_headers()
+
+    def do_POST(self):
+        form = dict(
+            parse_qsl(self.rfile.read(int(self.headers["Content-Length"])))
+        )
+        grant_type = form[b"grant_type"].decode()
+        self.server.requests.append(grant_type)
+        token = {
+            "access_token": grant_type,
+            "token_type": "Bearer",
+            "expires_in": 3599,
+            "refresh_token": "refresh-{}".format(len(self.server.requests)),
+        }
+        if grant_type == "authorization_code":
+            assert form[b"code"] == b"the-code"
+        body = json.dumps(token).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_loopback(tmp_path, monkeypatch) -> None:
+    server = HTTPServer(("127.0.0.1", 0), _OAuth)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        forge.auth,
+        "AUTH_V1_URL",
+        "http://127.0.0.1:{}".format(server.server_port),
+    )
+    monkeypatch.delenv("FORGE_USERNAME", raising=False)
+    opened = []
+    store = FileTokenStore(str(tmp_path / "tokens.json"))
+
+    def opener(url):
+        opened.append(url)
+        urlopen(url).read()
+
+    try:
+        auth = ForgeAuth(
+            client_id="id",
+            client_secret="secret",
+            three_legged=True,
+            grant_type="authorization_code",
+            redirect_uri="http://localhost:{}/callback".format(_free_port()),
+            loopback=True,
+            opener=opener,
+            token_store=store,
+            log_level="warning",
+        )
+        assert server.requests == ["authorize", "authorization_code"]
+        # whoever signed in, their token is not stored under a shared key
+        assert not os.path.exists(store.path)
+        assert auth.header == {"Authorization": "Bearer authorization_code"}
+        assert auth.refresh_token == "refresh-2"
+
+        # later tokens come from the refresh token, not the browser
+        auth.refresh()
+        assert server.requests[2:] == ["refresh_token"]
+        assert auth.refresh_token == "refresh-3"
+        assert len(opened) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,194 @@
+import pytest
+import threading
+
+from types import SimpleNamespace
+
+from conftest import make_app
+from forge.api.adm import ADM
+from forge.utils import MetadataCache
+
+
+def test_cache(tmp_path) -> None:
+    cache = MetadataCache(str(tmp_path / "cache.db"), ttl=60)
+    cache.set("get_item/p/i1/None", {"data": 1})
+    cache.set("get_item/p/i2/None", {"data": 2})
+    assert cache.get("get_item/p/i1/None") == {"data": 1}
+
+    cache.invalidate("get_item/p/i1/")
+    assert cache.get("get_item/p/i1/None") is None
+    assert cache.get("get_item/p/i2/None") == {"data": 2}
+
+    cache.ttl = -1
+    assert cache.get("get_item/p/i2/None") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_calls(tmp_path) -> None:
+    calls = []
+
+    class FakeADM(ADM):
+        @ADM._cached
+        async def get_item(self, project_id, item_id, x_user_id=None):
+            calls.append(item_id)
+            return {"data": {"id": item_id}}
+
+    class Cache(MetadataCache):
+        def get(self, key):
+            threads.add(threading.get_ident())
+            return super().get(key)
+
+    threads = set()
+    adm = FakeADM.__new__(FakeADM)
+    adm.app = SimpleNamespace(cache=Cache(":memory:"))
+
+    await adm.get_item("p", "i1")
+    assert await adm.get_item("p", "i1") == {"data": {"id": "i1"}}
+    assert calls == ["i1"]
+    # the lookups leave the event loop running
+    assert threading.get_ident() not in threads
+
+    await adm._invalidate("get_item", "p", "i1")
+    await adm.get_item("p", "i1")
+    assert calls == ["i1", "i1"]
+
+
+@pytest.mark.asyncio
+async def test_cached_listings(tmp_path) -> None:
+    requests = []
+    errors = set()
+
+    async def _request(method, url, headers=None, **kwargs):
+        requests.append((method, url))
+        return SimpleNamespace(status=500 if url in errors else 200, url=url)
+
+    async def _get_data(res):
+        if res.status != 200:
+            return {"errors": [{"status": "500"}]}
+        return {"data": []} if res.url == "empty" else {"data": {}}
+
+    async def ensure():
+        pass
+
+    class FakeADM(ADM):
+        @ADM._cached
+        async def get_folder_contents(
+            self, project_id, folder_id, include_hidden=False, x_user_id=None
+        ):
+            return await self._get_iter(
+                ADM.semaphores["get_folder_contents"], folder_id
+            )
+
+    ADM._set_rate_limits()
+    adm = FakeADM.__new__(FakeADM)
+    adm.app = SimpleNamespace(
+        cache=MetadataCache(":memory:"),
+        tokens=SimpleNamespace(ensure=ensure),
+        _request=_request,
+        _get_data=_get_data,
+    )
+
+    # empty folders are cached, failed listings are not
+    errors.add("failed")
+    for _ in range(2):
+        assert await adm.get_folder_contents("p", "empty") == []
+        assert await adm.get_folder_contents("p", "failed") == []
+    assert requests.count(("GET", "empty")) == 1
+    assert requests.count(("GET", "failed")) == 2
+
+    # a new version drops the contents of the folder of its item
+    await adm.post_item_version(
+        "p", None, "i1", "model.rvt", copy_from_id="v1", folder_id="empty"
+    )
+    await adm.get_folder_contents("p", "empty")
+    assert requests.count(("GET", "empty")) == 2
+
+
+def test_conditional_get(tmp_path, monkeypatch) -> None:
+    import requests
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from forge.session import Session
+
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/object":
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", "4")
+                self.send_header("ETag", '"o1"')
+                self.end_headers()
+                self.wfile.write(b"\x00\xff\x00\xff")
+                return
+            seen.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b'{"data": []}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.api+json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{}/contents".format(server.server_port)
+
+    session = Session()
+    session.cache = MetadataCache(str(tmp_path / "cache.db"))
+    try:
+        assert session.request("get", url) == ({"data": []}, True)
+        assert session.request("get", url) == ({"data": []}, True)
+
+        # downloads are not decoded to text on the way to the cache
+        decoded = []
+        text = requests.Response.text
+        monkeypatch.setattr(
+            requests.Response,
+            "text",
+            property(lambda res: decoded.append(res.url) or text.fget(res)),
+        )
+        object_url = url.replace("/contents", "/object")
+        assert session.request("get", object_url)[1]
+        assert decoded == []
+    finally:
+        server.shutdown()
+    assert seen == [None, '"v1"']
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_async(tmp_path) -> None:
+    from aiohttp import ClientSession, web
+    from aiohttp.test_utils import TestServer
+
+    seen = []
+
+    async def contents(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response(
+            {"data": [{"id": "f1"}]},
+            content_type="application/vnd.api+json",
+            headers={"ETag": '"v1"'},
+        )
+
+    server_app = web.Application()
+    server_app.router.add_get("/contents", contents)
+
+    app = make_app(cache=MetadataCache(str(tmp_path / "cache.db")), retries=1)
+    async with TestServer(server_app) as server, ClientSession() as session:
+        url = str(server.make_url("/contents"))
+        for _ in range(2):
+            res = await app._request(method="GET", url=url, session=session)
+            assert res.status == 200
+            assert await app._get_data(res) == {"data": [{"id": "f1"}]}
+    assert seen == [None, '"v1"']
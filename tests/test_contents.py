@@ -0,0 +1,190 @@
+import pytest
+
+from types import SimpleNamespace
+
+from conftest import FakeDM, make_app, make_project, payload
+from forge import forge
+from forge.api.adm import ADM
+from forge.forge_async import Folder
+from forge.utils import MetadataCache
+
+
+class CachedDM(FakeDM):
+    get_folder_contents = ADM._cached(FakeDM.get_folder_contents)
+    get_item_versions = ADM._cached(FakeDM.get_item_versions)
+    _invalidate = ADM._invalidate
+
+
+def _dm(cls=FakeDM):
+    folders = {
+        "r": payload("folders", "r"),
+        "a": payload("folders", "a"),
+        "b": payload("folders", "b"),
+    }
+    return cls(
+        folders,
+        {
+            "r": [folders["a"], payload("items", "i1")],
+            "a": [folders["b"]],
+            "b": [payload("items", "i2")],
+        },
+    )
+
+
+def _project(dm):
+    project = make_project(dm)
+    project.top_folders = [
+        Folder("r", "r", data=dm.folders["r"], project=project)
+    ]
+    return project
+
+
+@pytest.mark.asyncio
+async def test_refresh() -> None:
+    dm = _dm()
+    project = _project(dm)
+
+    await project.get_contents()
+    assert sorted(dm.listed) == ["a", "b", "r"]
+    i2 = project.top_folders[0].contents[0].contents[0].contents[0]
+
+    dm.listed = []
+    dm.folders["b"] = payload("folders", "b", modified="t1")
+    dm.contents["b"].append(payload("items", "i3", modified="t1"))
+
+    changed = await project.refresh_contents()
+
+    assert dm.listed == ["b"]
+    assert [folder.id for folder in changed] == ["b"]
+    b = changed[0]
+    assert [content.id for content in b.contents] == ["i2", "i3"]
+    assert b.contents[0] is i2
+    assert await project.refresh_contents() == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_cached() -> None:
+    dm = _dm(CachedDM)
+    dm.app = SimpleNamespace(cache=MetadataCache(":memory:"))
+    dm.versions["i2"] = 1
+    project = _project(dm)
+    await project.get_contents()
+    i2 = await project.find("i2")
+    assert len(await i2.get_versions()) == 1
+
+    dm.listed = []
+    dm.folders["b"] = payload("folders", "b", modified="t1")
+    dm.contents["b"] = [
+        payload("items", "i2", modified="t1"),
+        payload("items", "i3", modified="t1"),
+    ]
+    dm.versions["i2"] = 2
+
+    # changed folders and items are not answered from the cache
+    assert [folder.id for folder in await project.refresh_contents()] == ["b"]
+    assert dm.listed == ["b"]
+    assert (await project.find("/r/a/b/i3", key="path")).id == "i3"
+    assert len(await i2.get_versions()) == 2
+
+    # the others still are
+    await project.top_folders[0].get_contents()
+    assert dm.listed == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_failed_listing() -> None:
+    dm = _dm()
+    dm.failing.add("a")
+    project = _project(dm)
+
+    with pytest.raises(ConnectionError):
+        await project.get_contents()
+    # the other folders were still listed before raising
+    assert sorted(dm.listed) == ["a", "r"]
+
+
+@pytest.mark.asyncio
+async def test_find() -> None:
+    dm = _dm()
+    project = _project(dm)
+    await project.get_contents()
+
+    i2 = await project.find("/r/a/b/i2", key="path")
+    assert i2.id == "i2"
+    assert await project.find("i2", key="id") is i2
+    assert await project.find("i2") is i2
+
+    # folders look in their own contents, or below them unless shallow
+    r, b = project.top_folders[0], i2.host
+    assert await b.find("i2") is i2
+    assert await r.find("i2") is None
+    assert await r.find("i2", shallow=False) is i2
+    assert await r.find("/r/a/b/i2", key="path", shallow=False) is i2
+    assert await b.find("i1", key="id", shallow=False) is None
+
+    # a copied item is listed where find() reports it
+    dm.versions["i2"] = 1
+    copy = await r.copy_item(i2)
+    assert await r.find(copy.name) is copy
+    assert r.contents[-1] is copy
+
+    # paths follow a renamed folder
+    dm.folders["a"] = payload("folders", "a", modified="t1")
+    dm.folders["a"]["attributes"]["name"] = "A"
+    dm.contents["r"][0] = dm.folders["a"]
+    await project.refresh_contents()
+    assert i2.path == "/r/A/b/i2"
+    assert await project.find("/r/A/b/i2", key="path") is i2
+    assert await project.find("/r/a/b/i2", key="path") is None
+
+    # contents gone from a listing leave the indexes
+    dm.contents["a"] = []
+    dm.folders["a"] = payload("folders", "a", modified="t2")
+    await project.refresh_contents()
+    assert await project.find("i2", key="id") is None
+    assert await project.find_all("b") == []
+
+    # an item added by the sync tree is listed where find() reports it
+    def post_item(project_id, folder_id, storage_id, name, **kwargs):
+        return {"data": payload("items", name)}
+
+    app = make_app(SimpleNamespace(post_item=post_item), cls=forge.ForgeApp)
+    project = forge.Project("project", "p", app=app)
+    project.top_folders = [forge.Folder("r", "r", project=project)]
+    i4 = project.top_folders[0].add_item("i4", storage_id="storage")
+    assert project.find("i4") is i4
+    assert project.top_folders[0].contents == [i4]
+
+
+@pytest.mark.asyncio
+async def test_retain() -> None:
+    dm = _dm()
+    project = _project(dm)
+    await project.get_contents(retain="minimal")
+
+    i2 = await project.find("i2")
+    assert i2.data == {
+        "type": "items",
+        "id": "i2",
+        "attributes": {"displayName": "i2", "lastModifiedTime": "t0"},
+    }
+    assert await i2.get_data() == payload("items", "i2")
+
+    # a refresh reads the timestamps without parsing the payloads
+    await project.refresh_contents()
+    i1 = await project.find("i1")
+    assert isinstance(i1._data, str)
+    # which are parsed once, so changes made to them stay
+    i1.data["attributes"]["hidden"] = True
+    assert i1.data["attributes"]["hidden"] is True
+
+    # without payloads every folder is listed again
+    project.retain = "none"
+    await project.refresh_contents()
+    assert i2.data is None
+    dm.listed = []
+    await project.refresh_contents()
+    assert sorted(dm.listed) == ["a", "b", "r"]
+
+    with pytest.raises(ValueError):
+        project.retain = "some"
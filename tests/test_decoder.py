@@ -0,0 +1,21 @@
+import pytest
+
+from forge.utils import decoder
+
+
+def test_set_decoder() -> None:
+    document = b'{"data": [{"id": "a"}]}'
+    try:
+        for name in decoder.DECODERS:
+            decoder.set_decoder(name)
+            assert decoder.loads(document) == {"data": [{"id": "a"}]}
+            with pytest.raises(ValueError):
+                decoder.loads(b"\x89PNG")
+
+        decoder.set_decoder(lambda s: "custom")
+        assert decoder.loads(document) == "custom"
+
+        with pytest.raises(ValueError):
+            decoder.set_decoder("simdjson")
+    finally:
+        decoder.set_decoder()
@@ -0,0 +1,93 @@
+import os
+import pytest
+
+from types import SimpleNamespace
+
+from forge.api.adm import ADM
+
+
+@pytest.mark.asyncio
+async def test_download_object(tmp_path) -> None:
+    payload = os.urandom(1000)
+    ranges = []
+
+    async def stream_object(
+        bucket_key, object_name, writable, byte_range=None, progress=None
+    ):
+        ranges.append(byte_range)
+        chunk = payload[byte_range[0] : byte_range[1] + 1]
+        # written in two blocks like a streamed body
+        writable.write(chunk[:100])
+        writable.write(chunk[100:])
+        return len(chunk)
+
+    ADM._set_rate_limits()
+    adm = ADM.__new__(ADM)
+    adm.stream_object = stream_object
+    filepath = str(tmp_path / "object.bin")
+
+    await adm.download_object(
+        "bucket", "object", filepath, size=len(payload), chunk_size=300
+    )
+
+    assert sorted(ranges) == [(0, 299), (300, 599), (600, 899), (900, 999)]
+    with open(filepath, "rb") as fp:
+        assert fp.read() == payload
+
+
+@pytest.mark.asyncio
+async def test_download_failure(tmp_path) -> None:
+    async def stream_object(
+        bucket_key, object_name, writable, byte_range=None, progress=None
+    ):
+        raise ConnectionError("reset by peer")
+
+    ADM._set_rate_limits()
+    adm = ADM.__new__(ADM)
+    adm.stream_object = stream_object
+    filepath = str(tmp_path / "object.bin")
+
+    with pytest.raises(ConnectionError):
+        await adm.download_object(
+            "bucket", "object", filepath, size=1000, chunk_size=300
+        )
+    assert not os.path.exists(filepath)
+
+
+class _Response(object):
+    status = 206
+    released = False
+
+    def __init__(self):
+        self.content = self
+
+    async def iter_chunked(self, size):
+        yield b"block"
+
+    def release(self):
+        self.released = True
+
+
+@pytest.mark.asyncio
+async def test_stream_releases(tmp_path) -> None:
+    res = _Response()
+
+    async def _request(**kwargs):
+        return res
+
+    class Full(object):
+        def write(self, data):
+            raise OSError("No space left on device")
+
+    async def ensure():
+        pass
+
+    ADM._set_rate_limits()
+    adm = ADM.__new__(ADM)
+    adm.app = SimpleNamespace(
+        _request=_request, tokens=SimpleNamespace(ensure=ensure)
+    )
+
+    with pytest.raises(OSError):
+        await adm.stream_object("bucket", "object", Full())
+    assert res.released
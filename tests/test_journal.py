@@ -0,0 +1,42 @@
+import sqlite3
+
+from forge.utils import TransferJournal
+
+
+def test_journal(tmp_path) -> None:
+    path = str(tmp_path / "journal.db")
+    journal = TransferJournal(path)
+    journal.start("v1", "urn:storage", "session", 300, 1000, target_id="f1")
+    journal.complete("v1", (0, 299))
+    journal.close()
+
+    # survives a restart
+    journal = TransferJournal(path)
+    entry = journal.get("v1")
+    assert entry["storage_id"] == "urn:storage"
+    assert entry["session_id"] == "session"
+    assert entry["target_id"] == "f1"
+    assert entry["ranges"] == {(0, 299)}
+
+    journal.finish("v1")
+    assert journal.get("v1") is None
+
+
+def test_journal_upgrade(tmp_path) -> None:
+    path = str(tmp_path / "journal.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE transfers (version_id TEXT PRIMARY KEY, "
+            "storage_id TEXT, session_id TEXT, chunk_size INTEGER, "
+            "total_size INTEGER)"
+        )
+        conn.execute(
+            "INSERT INTO transfers VALUES ('v1', 'urn:storage', 's', 1, 2)"
+        )
+    conn.close()
+
+    # entries written without a target are never resumed
+    journal = TransferJournal(path)
+    assert journal.get("v1")["target_id"] is None
+    journal.start("v2", "urn:storage", "session", 300, 1000, target_id="f1")
+    assert journal.get("v2")["target_id"] == "f1"
@@ -0,0 +1,115 @@
+import csv
+import pytest
+
+from conftest import FakeDM, make_project, payload
+from forge.forge_async import Folder, Item, Version
+from forge.migrate import ProjectMigrator
+
+
+def _project(name, dm):
+    project = make_project(dm, name, name)
+    project.top_folders = [Folder("Files", name + "-top", project=project)]
+    return project
+
+
+def _add(host, cls, name):
+    content = cls(
+        name, "{}/{}".format(host.id, name), project=host.project, host=host
+    )
+    host.contents.append(content)
+    return content
+
+
+@pytest.mark.asyncio
+async def test_mirror_folders() -> None:
+    source = _project("source", FakeDM())
+    top = source.top_folders[0]
+    for name in ("A", "B", "C"):
+        _add(_add(top, Folder, name), Folder, "D")
+
+    dm = FakeDM(
+        contents={"target-top": [payload("folders", "target-top/A", "A")]}
+    )
+    target = _project("target", dm)
+
+    folders = await ProjectMigrator(source, target).mirror_folders()
+
+    # the top folder is listed once, not by every sibling creation
+    assert dm.listed.count("target-top") == 1
+    assert sorted(dm.posted) == [
+        "target-top/A/D",
+        "target-top/B",
+        "target-top/B/D",
+        "target-top/C",
+        "target-top/C/D",
+    ]
+    names = [folder.name for folder in target.top_folders[0].contents]
+    assert sorted(names) == ["A", "B", "C"]
+    assert folders["source-top/B/D"].id == "target-top/B/D"
+
+
+async def _migrate(monkeypatch, fail=None):
+    dm = FakeDM(versions={"source-top/model.rvt": 3})
+    source = _project("source", dm)
+    item = _add(source.top_folders[0], Item, "model.rvt")
+    target = _project("target", dm)
+    target_item = _add(target.top_folders[0], Item, "model.rvt")
+    dm.versions[target_item.id] = 1
+
+    transferred = []
+
+    async def transfer(version, target_host, target_item=None, **kwargs):
+        if version.number == fail:
+            raise ConnectionError("chunk failed")
+        transferred.append(version.number)
+        version.storage_size = 10
+        target_item.versions.append(version)
+        return target_item
+
+    monkeypatch.setattr(Version, "transfer", transfer)
+    migrator = ProjectMigrator(source, target)
+    migrator.folders = {source.top_folders[0].id: target.top_folders[0]}
+    migrator.results.append(await migrator.migrate_item(item))
+    return migrator, transferred
+
+
+@pytest.mark.asyncio
+async def test_migrate_item(monkeypatch, tmp_path) -> None:
+    migrator, transferred = await _migrate(monkeypatch)
+
+    # version 1 is already in the target
+    assert transferred == [2, 3]
+    result = migrator.results[0]
+    assert result["status"] == "ok"
+    assert (result["versions"], result["skipped"]) == (3, 1)
+    assert (result["transferred"], result["bytes"]) == (2, 20)
+
+    table = migrator.report().splitlines()
+    assert table[0].split() == list(ProjectMigrator.COLUMNS)
+    assert table[1].split()[:6] == [
+        "/Files/model.rvt",
+        "ok",
+        "3",
+        "1",
+        "2",
+        "20",
+    ]
+
+    path = str(tmp_path / "report.csv")
+    migrator.write_csv(path)
+    with open(path, newline="") as fp:
+        rows = list(csv.DictReader(fp))
+    assert rows[0]["path"] == "/Files/model.rvt"
+    assert rows[0]["transferred"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_migrate_item_stops(monkeypatch) -> None:
+    migrator, transferred = await _migrate(monkeypatch, fail=2)
+
+    # version 3 is not added on top of a missing version 2
+    assert transferred == []
+    result = migrator.results[0]
+    assert result["status"] == "failed"
+    assert result["error"] == "chunk failed"
+    assert result["transferred"] == 0
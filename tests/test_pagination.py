@@ -0,0 +1,162 @@
+import os
+import pytest
+import sys
+
+from aiohttp import ClientSession
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from forge.api.adm import ADM
+from forge.api.ahq import AHQ
+from forge.utils import HTTPSemaphore
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "benchmarks",
+    ),
+)
+from mock_forge import HUB_ID, TOKEN, MockForge  # noqa: E402
+
+ITEMS = 450
+
+
+async def _ensure():
+    pass
+
+
+class _App(object):
+    """Sends requests to MockForge, failing some page numbers once."""
+
+    tokens = SimpleNamespace(ensure=_ensure)
+
+    def __init__(self, session, fail=()):
+        self.session = session
+        self.fail = set(fail)
+        self.requested = []
+
+    async def _request(self, method, url, headers=None, params=None):
+        params = params or {}
+        number = params.get("page[number]")
+        if "offset" in params:
+            number = params["offset"] // params["limit"]
+        if number in self.fail:
+            self.fail.remove(number)
+            raise ConnectionError("page {} failed".format(number))
+        self.requested.append(number)
+        return await self.session.request(
+            method, url, headers=headers, params=params
+        )
+
+    async def _get_data(self, res):
+        return await res.json(content_type=None)
+
+
+async def _list(page_limit, fail=()):
+    mock = MockForge(
+        projects=1, depth=0, items=ITEMS, versions=1, page_limit=page_limit
+    )
+    url = mock.start()
+    folder_id = mock.top_folders["project-0"][0]["id"]
+    try:
+        async with ClientSession(
+            headers={"Authorization": "Bearer " + TOKEN}
+        ) as session:
+            adm = ADM.__new__(ADM)
+            adm.app = _App(session, fail=fail)
+            contents = await adm._get_iter(
+                HTTPSemaphore(value=10, interval=1, max_calls=1000),
+                "{}/data/v1/projects/b.project-0/folders/{}/contents".format(
+                    url, folder_id
+                ),
+            )
+    finally:
+        mock.stop()
+    return contents, adm.app.requested
+
+
+@pytest.mark.asyncio
+async def test_short_pages() -> None:
+    # the server serves 50 records a page although 200 were asked for
+    contents, requested = await _list(page_limit=50)
+    assert len(contents) == ITEMS
+    assert len({content["id"] for content in contents}) == ITEMS
+    # the first page by number, the others through the next links
+    assert requested == [0] + [None] * 8
+
+
+@pytest.mark.asyncio
+async def test_prefetch_retries_failed_pages() -> None:
+    contents, requested = await _list(page_limit=200, fail=[2])
+    assert len({content["id"] for content in contents}) == ITEMS
+    assert requested.count(2) == 1
+
+
+@asynccontextmanager
+async def _serve(api, fail=(), **kwargs):
+    """An ADM or AHQ of the MockForge hub built from kwargs"""
+    mock = MockForge(projects=1, depth=0, **kwargs)
+    url = mock.start()
+    try:
+        async with ClientSession(
+            headers={"Authorization": "Bearer " + TOKEN}
+        ) as session:
+            client = api.__new__(api)
+            client.app = _App(session, fail=fail)
+            client.hub_id = HUB_ID
+            api._set_rate_limits()
+            yield mock, url, client
+    finally:
+        mock.stop()
+
+
+async def _ids(records):
+    return [record["id"] async for record in records]
+
+
+@pytest.mark.asyncio
+async def test_adm_streams(monkeypatch) -> None:
+    async with _serve(ADM, items=ITEMS, versions=1) as (mock, url, adm):
+        monkeypatch.setattr(
+            "forge.api.adm.PROJECT_V1_URL", url + "/project/v1"
+        )
+        monkeypatch.setattr("forge.api.adm.DATA_V1_URL", url + "/data/v1")
+        assert await _ids(adm.aiter_projects()) == [
+            project["id"] for project in mock.projects
+        ]
+
+        folder_id = mock.top_folders["project-0"][0]["id"]
+        adm.app.requested.clear()
+        ids = await _ids(adm.aiter_folder_contents("b.project-0", folder_id))
+        # in order across the prefetched pages, and nothing after the last
+        assert ids == [content["id"] for content in mock.contents[folder_id]]
+        assert adm.app.requested == list(range(ADM.PREFETCH_PAGES + 1))
+
+    async with _serve(ADM, items=1, versions=ITEMS) as (mock, url, adm):
+        monkeypatch.setattr("forge.api.adm.DATA_V1_URL", url + "/data/v1")
+        item_id = next(iter(mock.versions))
+        ids = await _ids(adm.aiter_item_versions("b.project-0", item_id))
+        assert ids == [version["id"] for version in mock.versions[item_id]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("users", [450, 500, 650])
+async def test_ahq_streams(monkeypatch, users) -> None:
+    # a short last page, an empty one and a second round of prefetching
+    async with _serve(AHQ, users=users, fail=[2]) as (mock, url, ahq):
+        monkeypatch.setattr("forge.api.ahq.HQ_V1_URL", url + "/hq/v1")
+        ids = await _ids(ahq.aiter_users())
+        assert ids == [user["id"] for user in mock.users]
+        # the failed prefetched page is requested again
+        assert ahq.app.requested.count(2) == 1
+        last = users // AHQ.PAGE_LIMIT
+        rounds = -(-last // AHQ.PREFETCH_PAGES)
+        assert max(ahq.app.requested) == rounds * AHQ.PREFETCH_PAGES
+
+        assert await _ids(ahq.aiter_projects()) == [
+            project["id"] for project in mock.hq_projects
+        ]
+        assert await _ids(ahq.aiter_companies()) == [
+            company["id"] for company in mock.companies
+        ]
@@ -0,0 +1,220 @@
+import asyncio
+import multiprocessing
+import pytest
+import threading
+import time
+
+from types import SimpleNamespace
+
+from conftest import make_app
+from forge.api.adm import ADM
+from forge.api.ahq import AHQ
+from forge.utils import (
+    BandwidthLimiter,
+    FileBackend,
+    HTTPSemaphore,
+    LimiterStack,
+)
+from forge.utils.filelock import locked
+from forge.utils.semaphore import current_limiter
+
+
+async def _acquire(sema, times):
+    async with sema:
+        times.append(time.monotonic())
+
+
+def _acquire_in_process(path, queue):
+    sema = HTTPSemaphore(
+        value=10, interval=1, max_calls=20, name="x", backend=FileBackend(path)
+    )
+    times = []
+
+    async def main():
+        await asyncio.gather(*[_acquire(sema, times) for _ in range(3)])
+
+    asyncio.run(main())
+    queue.put([t - time.monotonic() + time.time() for t in times])
+
+
+@pytest.mark.asyncio
+async def test_rate() -> None:
+    sema = HTTPSemaphore(value=10, interval=1, max_calls=20)
+    times = []
+    await asyncio.gather(*[_acquire(sema, times) for _ in range(6)])
+    assert times[-1] - times[0] >= 5 * sema.period * 0.9
+
+
+@pytest.mark.asyncio
+async def test_burst() -> None:
+    sema = HTTPSemaphore(value=10, interval=1, max_calls=20, burst=4)
+    times = []
+    await asyncio.gather(*[_acquire(sema, times) for _ in range(6)])
+    assert times[3] - times[0] < sema.period
+    assert times[-1] - times[0] >= 2 * sema.period * 0.9
+
+
+def test_max_calls_per_interval() -> None:
+    ADM._set_rate_limits()
+    AHQ._set_rate_limits()
+    tables = list(ADM.semaphores.values()) + list(AHQ.semaphores.values())
+    for limiter in tables + [HTTPSemaphore(max_calls=50, burst=50)]:
+        sema = HTTPSemaphore(
+            interval=limiter.interval,
+            max_calls=limiter.max,
+            burst=limiter.burst,
+        )
+        delays = [sema.reserve() for _ in range(2 * sema.max)]
+        # the burst goes out at once, but not on top of a full interval
+        assert delays[min(sema.burst, sema.max - 1) - 1] == 0
+        admitted = sum(delay <= sema.interval for delay in delays)
+        assert sema.max - 1 <= admitted <= sema.max
+
+
+@pytest.mark.asyncio
+async def test_cancelled_acquire() -> None:
+    sema = HTTPSemaphore(value=10, interval=1, max_calls=20)
+    for _ in range(10):
+        sema.reserve()
+    task = asyncio.ensure_future(sema.acquire())
+    await asyncio.sleep(sema.period)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    # the slot the cancelled call booked goes to the next one
+    assert sema.reserve() <= 9 * sema.period
+    assert sema._value == sema.value
+
+
+@pytest.mark.asyncio
+async def test_adaptive() -> None:
+    sema = HTTPSemaphore(value=10, interval=1, max_calls=20)
+    sema.throttled(retry_after=0.2)
+    sema.throttled(retry_after=0.2)
+    assert sema.calls == 10
+    assert sema.reserve() >= 0.15
+
+    for _ in range(500):
+        sema.succeeded()
+    assert sema.calls == 20
+
+
+@pytest.mark.asyncio
+async def test_retry_after(monkeypatch) -> None:
+    sema = HTTPSemaphore(value=10, interval=60, max_calls=50, burst=5)
+    responses = [
+        SimpleNamespace(
+            status=429, headers={"Retry-After": "10"}, release=lambda: None
+        ),
+        SimpleNamespace(status=200, headers={}),
+    ]
+
+    async def request(*args, **kwargs):
+        return responses.pop(0)
+
+    slept = []
+
+    async def sleep(delay):
+        slept.append(delay)
+
+    app = make_app(retries=5)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    token = current_limiter.set(sema)
+    try:
+        res = await app._request(
+            method="GET", url="u", session=SimpleNamespace(request=request)
+        )
+    finally:
+        current_limiter.reset(token)
+
+    assert res.status == 200
+    # the retry and the next call wait out Retry-After despite the burst
+    assert 9.9 <= slept[0] <= 10.1
+    assert sema.reserve() >= 10
+
+
+def test_shared_between_processes(tmp_path) -> None:
+    path = str(tmp_path / "limits.json")
+    queue = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=_acquire_in_process, args=(path, queue))
+        for _ in range(3)
+    ]
+    for proc in procs:
+        proc.start()
+    times = sorted(t for _ in procs for t in queue.get(timeout=10))
+    for proc in procs:
+        proc.join()
+    # 9 calls at 20 per second, whatever process made them
+    assert times[-1] - times[0] >= 8 * 0.05 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_file_backend_off_loop(tmp_path) -> None:
+    path = str(tmp_path / "limits.json")
+    sema = HTTPSemaphore(
+        value=10, interval=1, max_calls=20, name="x", backend=FileBackend(path)
+    )
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with locked(path):
+            held.set()
+            release.wait(1)
+
+    threading.Thread(target=hold_lock).start()
+    held.wait()
+    task = asyncio.ensure_future(sema.acquire())
+    # the loop keeps running while another process holds the lock
+    await asyncio.sleep(0.1)
+    assert not task.done()
+    release.set()
+    assert await task
+    sema.release()
+
+
+def test_names(tmp_path) -> None:
+    first = HTTPSemaphore(value=10, interval=1, max_calls=20)
+    second = HTTPSemaphore(value=10, interval=1, max_calls=20)
+    first.reserve()
+    # unnamed limiters do not share a budget
+    assert second.reserve() == 0
+    assert first.backend is not HTTPSemaphore.backend
+
+    with pytest.raises(ValueError):
+        HTTPSemaphore(backend=FileBackend(str(tmp_path / "limits.json")))
+
+
+@pytest.mark.asyncio
+async def test_bandwidth() -> None:
+    limiter = BandwidthLimiter(1000)
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.consume(100) for _ in range(4)])
+    # the first 100 bytes go straight away
+    assert time.monotonic() - start >= 0.3 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_limiter_stack() -> None:
+    endpoint = HTTPSemaphore(value=10, interval=1, max_calls=20, name="e")
+    shared = asyncio.BoundedSemaphore(1)
+    endpoint.reserve()
+    async with LimiterStack(
+        ("e", endpoint), ("none", None), ("g", shared)
+    ) as stack:
+        assert shared.locked()
+        assert list(stack.waits) == ["e", "g"]
+        assert stack.waits["e"] >= endpoint.period * 0.9
+    assert not shared.locked()
+    assert LimiterStack.totals["e"] >= stack.waits["e"]
+
+    # layers already held are released when a later one is cancelled
+    await shared.acquire()
+    task = asyncio.ensure_future(
+        LimiterStack(("e", endpoint), ("g", shared)).__aenter__()
+    )
+    await asyncio.sleep(endpoint.period * 2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert endpoint._value == endpoint.value
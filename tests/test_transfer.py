@@ -0,0 +1,162 @@
+import os
+import pytest
+
+from types import SimpleNamespace
+
+from conftest import make_project
+from forge.forge_async import Item, Version
+from forge.utils import TransferError, TransferJournal
+
+STORAGE_ID = "urn:adsk.objects:os.object:target/object"
+NEW_STORAGE_ID = "urn:adsk.objects:os.object:target/new"
+
+
+class FakeOSS(object):
+    def __init__(self, payload):
+        self.payload = payload
+        self.got = []
+        self.put = {}
+        self.sessions = set()
+        self.failing = set()
+
+    async def get_object(self, bucket_key, object_name, byte_range=None):
+        self.got.append(byte_range)
+        if byte_range in self.failing:
+            raise ConnectionError("reset by peer")
+        return self.payload[byte_range[0] : byte_range[1] + 1]
+
+    async def put_object_chunk(
+        self, bucket_key, object_name, chunk, total_size, byte_range, sid
+    ):
+        self.put[byte_range] = chunk
+        self.sessions.add(sid)
+
+
+def _version(dm, size):
+    item = Item("model.rvt", "item", project=make_project(dm, "p"))
+    version = Version("model.rvt", 2, "version", item=item)
+    version.bucket_key, version.object_name = "source", "object"
+    version.storage_size = size
+    return version
+
+
+def _target(version, folder_id="target-folder"):
+    return SimpleNamespace(id=folder_id, project=version.project)
+
+
+@pytest.mark.asyncio
+async def test_transfer_local(tmp_path) -> None:
+    payload = os.urandom(1000)
+    dm = FakeOSS(payload)
+    version = _version(dm, len(payload))
+
+    assert await version._transfer_local(
+        _target(version), STORAGE_ID, 300, max_in_flight=2
+    )
+    assert b"".join(dm.put[r] for r in sorted(dm.put)) == payload
+    assert list(dm.put)[-1] == (900, 999)
+    assert len(dm.sessions) == 1
+
+    # a failed chunk is reported with its range, the others are kept
+    dm = FakeOSS(payload)
+    dm.failing.add((300, 599))
+    version = _version(dm, len(payload))
+    journal = TransferJournal(str(tmp_path / "journal.db"))
+    journal.start(version.id, STORAGE_ID, "session", 300, len(payload))
+    with pytest.raises(TransferError) as error:
+        await version._transfer_local(
+            _target(version), STORAGE_ID, 300, journal=journal
+        )
+    assert error.value.byte_range == (300, 599)
+    assert isinstance(error.value.__cause__, ConnectionError)
+    assert (900, 999) not in dm.put
+    assert journal.get(version.id)["ranges"] == {(0, 299), (600, 899)}
+
+
+@pytest.mark.asyncio
+async def test_resume(tmp_path) -> None:
+    payload = os.urandom(1000)
+    dm = FakeOSS(payload)
+    version = _version(dm, len(payload))
+    journal = TransferJournal(str(tmp_path / "journal.db"))
+    journal.start(version.id, STORAGE_ID, "session", 300, len(payload))
+    journal.complete(version.id, (0, 299))
+    journal.complete(version.id, (600, 899))
+
+    assert await version._transfer_local(
+        _target(version), STORAGE_ID, 300, journal=journal
+    )
+
+    # only the missing ranges are copied, the last one at the end
+    assert dm.got == [(300, 599), (900, 999)]
+    assert dm.put == {r: payload[r[0] : r[1] + 1] for r in dm.got}
+    assert len(journal.get(version.id)["ranges"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_resume_other_target(tmp_path, monkeypatch) -> None:
+    version = _version(FakeOSS(b""), 1000)
+    journal = TransferJournal(str(tmp_path / "journal.db"))
+    journal.start(
+        version.id, STORAGE_ID, "session", 300, 1000, target_id="other"
+    )
+    journal.complete(version.id, (0, 299))
+    transfers = []
+
+    async def get_details(self):
+        pass
+
+    async def get_versions():
+        pass
+
+    async def add_storage(name):
+        transfers.append("new storage")
+        return {"id": NEW_STORAGE_ID}
+
+    async def transfer_local(self, target_host, storage_id, *args, **kw):
+        transfers.append(storage_id)
+
+    monkeypatch.setattr(Version, "get_details", get_details)
+    monkeypatch.setattr(Version, "_transfer_local", transfer_local)
+    target = _target(version)
+    target._add_storage = add_storage
+
+    target_item = SimpleNamespace(
+        versions=[SimpleNamespace(number=1)], get_versions=get_versions
+    )
+    await version.transfer(target, target_item, journal=journal)
+
+    # the upload started for another folder is not reused
+    assert transfers == ["new storage", NEW_STORAGE_ID]
+    entry = journal.get(version.id)
+    assert entry["target_id"] == "target-folder"
+    assert entry["ranges"] == set()
+
+    # but is resumed on the next run into the same folder
+    await version.transfer(target, target_item, journal=journal)
+    assert transfers[2:] == [NEW_STORAGE_ID]
+
+
+@pytest.mark.asyncio
+async def test_version_exists(tmp_path, monkeypatch) -> None:
+    version = _version(FakeOSS(b""), 1000)
+    journal = TransferJournal(str(tmp_path / "journal.db"))
+
+    async def get_details(self):
+        pass
+
+    async def get_versions():
+        pass
+
+    monkeypatch.setattr(Version, "get_details", get_details)
+
+    # the previous run created the version before forgetting the transfer
+    journal.start(version.id, STORAGE_ID, "session", 300, 1000)
+    target_item = SimpleNamespace(
+        versions=[SimpleNamespace(number=1), SimpleNamespace(number=2)],
+        get_versions=get_versions,
+    )
+    assert await version.transfer(None, target_item, journal=journal) is (
+        target_item
+    )
+    assert journal.get(version.id) is None
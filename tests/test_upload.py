@@ -0,0 +1,71 @@
+import os
+import pytest
+
+from forge.api.adm import ADM
+from forge.api.dm import DM
+
+
+@pytest.mark.asyncio
+async def test_upload_object(tmp_path) -> None:
+    payload = os.urandom(1000)
+    filepath = tmp_path / "object.bin"
+    filepath.write_bytes(payload)
+    received = {}
+    sessions = set()
+    failures = [(300, 599)]
+
+    async def put_object_chunk(
+        bucket_key, object_name, object_bytes, total_size, byte_range, sid
+    ):
+        if byte_range in failures:
+            failures.remove(byte_range)
+            return 500, {"reason": "try again"}
+        received[byte_range] = object_bytes
+        sessions.add(sid)
+        if len(received) == 4:
+            return 200, {"size": total_size}
+        return 202, None
+
+    ADM._set_rate_limits()
+    adm = ADM.__new__(ADM)
+    adm._put_object_chunk = put_object_chunk
+
+    data = await adm.upload_object(
+        "bucket", "object", str(filepath), chunk_size=300
+    )
+
+    assert data == {"size": 1000}
+    assert len(sessions) == 1
+    assert b"".join(received[r] for r in sorted(received)) == payload
+
+
+def test_upload_object_sync(tmp_path) -> None:
+    payload = os.urandom(1000)
+    filepath = tmp_path / "object.bin"
+    filepath.write_bytes(payload)
+    received = {}
+    sessions = set()
+
+    def put_object_chunk(
+        bucket_key,
+        object_name,
+        object_bytes,
+        total_size,
+        byte_range,
+        sid,
+        retries=3,
+    ):
+        received[byte_range] = object_bytes
+        sessions.add(sid)
+        if len(received) == 4:
+            return {"size": total_size}
+
+    dm = DM.__new__(DM)
+    dm.put_object_chunk = put_object_chunk
+
+    data = dm.upload_object("bucket", "object", str(filepath), chunk_size=300)
+
+    assert data == {"size": 1000}
+    assert len(sessions) == 1
+    assert list(received) == [(0, 299), (300, 599), (600, 899), (900, 999)]
+    assert b"".join(received.values()) == payload